@@ -15,6 +15,7 @@ requirements = [
     'Click>=6.0',
     'Deprecated~=1.2.9',
     'networkx~=2.1',
+    'numpy>=1.17',
     'tabulate~=0.8.7',
 ]
 
@@ -45,6 +46,9 @@ setup(
         ],
     },
     install_requires=requirements,
+    extras_require={
+        'scipy': ['scipy'],
+    },
     license="Apache Software License 2.0",
     long_description=readme + '\n\n' + history,
     long_description_content_type='text/x-rst',
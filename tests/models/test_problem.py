@@ -39,3 +39,55 @@ def test_model_render(TestProblem, value, text, exc):
             print(problem.render())
     else:
         assert problem.render() == text
+
+
+def test_model_defaults():
+    class ListProblem(M.Problem):
+        items = F.DepotsField('ITEMS')
+        size = F.IntegerField('SIZE')
+
+    problem = ListProblem()
+    assert problem.size == 0
+    assert 'items' not in vars(problem)
+    assert problem.as_dict() == {}
+
+    # modifying the default makes it the value
+    problem.items.append(3)
+    assert problem.items == [3]
+    assert vars(problem)['items'] == [3]
+    assert problem.as_dict() == {'items': [3]}
+
+
+def test_model_fields_are_descriptors(TestProblem):
+    problem = TestProblem(foo=7)
+    assert 'foo' in vars(problem)
+    assert problem.foo == 7
+    assert problem.bar is None
+    assert 'bar' not in vars(problem)
+    with pytest.raises(AttributeError):
+        TestProblem.foo
+
+
+def test_model_record(TestProblem):
+    problem = TestProblem(foo=42)
+    record = problem.to_record()
+    assert type(record) is TestProblem.Record
+    assert record.problem_class is TestProblem
+    assert not hasattr(record, '__dict__')
+    assert record.foo == 42
+    assert record.bar is None
+    assert record.as_dict() == {'foo': 42}
+    assert record.as_keyword_dict() == {'FOO': 42}
+    assert record.render() == problem.render()
+    assert vars(record.to_problem()) == vars(TestProblem(foo=42))
+    assert record == TestProblem.Record(foo=42)
+    assert record != TestProblem.Record(foo=42, bar='answer')
+
+    with pytest.raises(AttributeError):
+        record.foo = 7
+    with pytest.raises(AttributeError):
+        del record.foo
+    with pytest.raises(AttributeError):
+        record.baz
+    with pytest.raises(TypeError):
+        TestProblem.Record(baz=3)
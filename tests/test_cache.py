@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from tsplib95 import cache
+
+
+def weight(i, j):
+    return i + 10 * j
+
+
+def test_weight_cache_counts_hits_and_misses():
+    wc = cache.WeightCache(weight, capacity=4)
+    assert wc(1, 2) == 21
+    assert wc(1, 2) == 21
+    assert wc(2, 1) == 12
+    assert (wc.hits, wc.misses) == (1, 2)
+    assert wc.hit_rate == pytest.approx(1 / 3)
+
+
+def test_weight_cache_symmetric_keys():
+    wc = cache.WeightCache(weight, capacity=4, symmetric=True)
+    assert wc(1, 2) == 21
+    assert wc(2, 1) == 21
+    assert len(wc) == 1
+
+
+@pytest.mark.parametrize('policy,kept', [
+    ('lru', {(1, 1), (3, 3)}),
+    ('fifo', {(2, 2), (3, 3)}),
+])
+def test_weight_cache_eviction(policy, kept):
+    wc = cache.WeightCache(weight, capacity=2, policy=policy)
+    wc(1, 1)
+    wc(2, 2)
+    wc(1, 1)
+    wc(3, 3)
+    assert set(wc.weights) == kept
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'policy': 'random'},
+    {'capacity': 0},
+])
+def test_weight_cache_bad_options(kwargs):
+    with pytest.raises(ValueError):
+        cache.WeightCache(weight, **kwargs)
+
+
+def test_weight_cache_clear():
+    wc = cache.WeightCache(weight)
+    wc(1, 2)
+    wc.clear()
+    assert len(wc) == 0
+    assert (wc.hits, wc.misses) == (0, 0)
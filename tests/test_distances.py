@@ -1,4 +1,7 @@
 # -*- coding: utf-8 -*-
+import random
+
+import numpy as np
 import pytest
 
 from tsplib95 import models
@@ -113,3 +116,87 @@ def test_verifcation_problems(read_problem_text, pfile, answer):
     problem_text = read_problem_text(pfile)
     problem = models.StandardProblem.parse(problem_text)
     assert problem.trace_canonical_tour() == answer
+
+
+def random_coordinates(rng, kind, n):
+    if kind == 'GEO':
+        # encoded DDD.MM values
+        def coord():
+            return [round(rng.uniform(-89, 89), 2),
+                    round(rng.uniform(-179, 179), 2)]
+    elif kind.startswith('XRAY'):
+        def coord():
+            return [rng.uniform(0, 360), rng.uniform(-90, 90),
+                    rng.uniform(-50, 50)]
+    else:
+        dimensions = 3 if kind.endswith('3D') else 2
+
+        def coord():
+            if rng.random() < 0.5:
+                return [rng.randint(-10000, 10000) for _ in range(dimensions)]
+            return [rng.uniform(-1000, 1000) for _ in range(dimensions)]
+
+    return [coord() for _ in range(n)]
+
+
+@pytest.mark.parametrize('kind', sorted(distances.TYPES))
+def test_array_types_match_scalar_types(kind):
+    rng = random.Random(kind)
+    coords = random_coordinates(rng, kind, 60)
+    # include some exact duplicates
+    coords += coords[:5]
+
+    scalar = distances.TYPES[kind]
+    vector = distances.ARRAY_TYPES[kind]
+
+    expected = [[scalar(a, b) for b in coords] for a in coords]
+    array = np.array(coords)
+
+    # many-to-many
+    result = vector(array[:, None], array[None, :])
+    assert result.tolist() == expected
+
+    # one-to-many
+    assert vector(array[3], array).tolist() == expected[3]
+
+    # paired
+    paired = vector(array, array[::-1])
+    assert paired.tolist() == [row[-i - 1] for i, row in enumerate(expected)]
+
+
+def test_array_types_cover_scalar_types():
+    assert set(distances.ARRAY_TYPES) == set(distances.TYPES)
+
+
+@pytest.mark.parametrize('func', [
+    distances.euclidean_array,
+    distances.manhattan_array,
+    distances.maximum_array,
+    distances.pseudo_euclidean_array,
+    distances.geographical_array,
+    distances.xray_array,
+])
+def test_array_dimension_mismatch(func):
+    with pytest.raises(ValueError):
+        func([[0, 1, 2]], [[0, 1]])
+
+
+def test_geographical_radians_matches_geographical():
+    rng = random.Random(29)
+    coords = random_coordinates(rng, 'GEO', 40)
+    radians = distances.geo_radians(coords).tolist()
+    for a, ra in zip(coords, radians):
+        for b, rb in zip(coords, radians):
+            expected = distances.geographical(a, b)
+            assert distances.geographical_radians(ra, rb) == expected
+
+
+def test_geo_problem_uses_cached_radians(read_problem_text):
+    problem = models.StandardProblem.parse(read_problem_text('data/gr666.tsp'))
+    problem.max_matrix_bytes = 0  # force weights to be computed on the fly
+    nodes = list(problem.get_nodes())[:50]
+    for a in nodes:
+        for b in nodes:
+            expected = distances.geographical(problem.node_coords[a],
+                                              problem.node_coords[b])
+            assert problem.get_weight(a, b) == expected
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+import networkx
+import numpy as np
+import pytest
+
+from tsplib95 import graphs
+from tsplib95 import models
+
+
+@pytest.fixture(params=['coordinates', 'explicit', 'edges', 'special'])
+def problem(request):
+    rng = np.random.RandomState(40)
+    kwargs = {'depots': [3], 'demands': {2: 7}, 'fixed_edges': [(4, 2)]}
+    if request.param == 'explicit':
+        weights = rng.randint(0, 50, size=(10, 10)).tolist()
+        kwargs.update(type='ATSP', dimension=10, edge_weight_type='EXPLICIT',
+                      edge_weight_format='FULL_MATRIX', edge_weights=weights)
+    else:
+        coords = rng.randint(0, 50, size=(10, 2)).tolist()
+        kwargs.update(dimension=10, edge_weight_type='EUC_2D',
+                      node_coords={i + 1: c for i, c in enumerate(coords)})
+    if request.param == 'edges':
+        kwargs.update(edge_data_format='EDGE_LIST',
+                      edge_data=[(1, 2), (2, 4), (4, 3), (5, 8), (9, 9)])
+    if request.param == 'special':
+        kwargs.update(edge_weight_type='SPECIAL',
+                      special=lambda a, b: a[0] * 3 + b[1])
+    return models.StandardProblem(**kwargs)
+
+
+@pytest.mark.parametrize('normalize', [False, True])
+def test_graph_view_matches_graph(problem, normalize):
+    G = problem.get_graph(normalize=normalize)
+    V = problem.get_graph_view(normalize=normalize)
+    V.row_cache_size = 2
+
+    assert type(V) is (graphs.ProblemGraph if problem.is_symmetric() else
+                       graphs.ProblemDiGraph)
+    assert V.graph == G.graph
+    assert list(V.nodes(data=True)) == list(G.nodes(data=True))
+    assert sorted(V.edges(data=True)) == sorted(G.edges(data=True))
+    assert V.number_of_edges() == G.number_of_edges()
+    assert dict(V.degree(weight='weight')) == dict(G.degree(weight='weight'))
+    for u, v in G.edges:
+        assert V.has_edge(u, v)
+        assert V.edges[u, v] == G.edges[u, v]
+    if V.is_directed():
+        for n in G:
+            assert dict(V.pred[n]) == dict(G.pred[n])
+    assert len(V._rows) <= 2
+
+
+def test_graph_view_missing(problem):
+    V = problem.get_graph_view()
+    assert 42 not in V
+    assert not V.has_edge(1, 42)
+    with pytest.raises(KeyError):
+        V[42]
+    if problem.edge_data_format:
+        assert not V.has_edge(1, 3)
+        with pytest.raises(KeyError):
+            V[1][3]
+
+
+def test_graph_view_is_read_only(problem):
+    V = problem.get_graph_view()
+    with pytest.raises(networkx.NetworkXError):
+        V.add_edge(1, 2)
+    with pytest.raises(networkx.NetworkXError):
+        V.remove_node(1)
+
+    copy = V.copy()
+    copy.add_edge(1, 42)
+    assert copy.has_edge(1, 42)
+    assert not V.has_edge(1, 42)
+
+
+def test_graph_view_algorithms(problem):
+    G = problem.get_graph()
+    V = problem.get_graph_view()
+    first, *some = list(G)[:4]
+    assert dict(networkx.shortest_path_length(V, first, weight='weight')) == \
+        dict(networkx.shortest_path_length(G, first, weight='weight'))
+    assert sorted(V.subgraph(some).edges(data=True)) == \
+        sorted(G.subgraph(some).edges(data=True))
+
+
+def csr_edges(csr):
+    edges = {}
+    for i in range(csr.num_nodes):
+        for j, w in zip(*csr.neighbors(i)):
+            edges[i, j.item()] = w.item()
+    return edges
+
+
+@pytest.mark.parametrize('directed', [None, True])
+def test_to_csr(problem, directed):
+    csr = problem.to_csr(directed=directed)
+    assert csr.nodes.tolist() == list(problem.get_nodes())
+    assert csr.indptr[-1] == len(csr.indices) == len(csr.weights)
+
+    positions = {n: i for i, n in enumerate(problem.get_nodes())}
+    G = problem.get_graph(normalize=True)
+    expected = {}
+    if directed or G.is_directed():
+        for a, b in problem.get_edges():
+            expected[positions[a], positions[b]] = problem.get_weight(a, b)
+    else:
+        for a, b, w in G.edges(data='weight'):
+            expected[a, b] = expected[b, a] = w
+    assert csr_edges(csr) == expected
+    for i in range(csr.num_nodes):
+        assert list(csr.neighbors(i)[0]) == sorted(csr.neighbors(i)[0])
+
+
+@pytest.mark.parametrize('edge_data_format,edge_data', [
+    ('EDGE_LIST', [(1, 2), (2, 3), (3, 1), (2, 1), (3, 3)]),
+    ('ADJ_LIST', {1: [2], 2: [3, 1], 3: [1, 3]}),
+])
+def test_to_csr_unweighted(edge_data_format, edge_data):
+    problem = models.StandardProblem(type='HCP', dimension=3,
+                                     edge_data_format=edge_data_format,
+                                     edge_data=edge_data)
+    csr = problem.to_csr()
+    assert csr.nodes.tolist() == [1, 2, 3]
+    assert csr.indptr.tolist() == [0, 2, 4, 7]
+    assert csr.indices.tolist() == [1, 2, 0, 2, 0, 1, 2]
+    assert csr.weights.tolist() == [1] * 7
+
+
+def test_csr_to_scipy(problem):
+    pytest.importorskip('scipy')
+    csr = problem.to_csr()
+    matrix = csr.to_scipy()
+    assert matrix.shape == (csr.num_nodes, csr.num_nodes)
+    for (i, j), w in csr_edges(csr).items():
+        assert matrix[i, j] == w
+
+
+def test_to_csr_hcp_file(read_problem_text):
+    text = read_problem_text('data/alb1000.hcp')
+    problem = models.StandardProblem.parse(text)
+    csr = problem.to_csr()
+    assert csr.num_nodes == 1000
+    assert csr.nodes.tolist() == list(range(1, 1001))
+    assert list(csr.neighbors(999)[0]) == [216, 455, 592]
+    assert csr.indptr[-1] == 2 * 1998
+    assert csr.weights.tolist() == [1] * 2 * 1998
+
+
+def test_csr_replace(problem):
+    csr = problem.to_csr()
+    doubled = csr._replace(weights=csr.weights * 2)
+    assert doubled.num_nodes == csr.num_nodes
+    assert doubled.weights.tolist() == (csr.weights * 2).tolist()
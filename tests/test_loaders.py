@@ -17,3 +17,24 @@ def test_parse(read_problem_text, filepath):
 def test_load(get_problem_filepath, filepath):
     path = get_problem_filepath(filepath)
     assert loaders.load(path)
+
+
+@pytest.mark.parametrize('filepath', [
+    ('data/gr666.tsp'),
+    ('data/gr666.opt.tour'),
+    ('data/pcb442.opt.tour'),
+])
+def test_load_validate(get_problem_filepath, filepath):
+    path = get_problem_filepath(filepath)
+    assert loaders.load(path, validate=True)
+
+
+def test_score_tours(get_problem_filepath):
+    problem_path = get_problem_filepath('data/pcb442.tsp')
+    tour_path = get_problem_filepath('data/pcb442.opt.tour')
+    problem = loaders.load(problem_path)
+    tours = loaders.load(tour_path).tours
+    expected = problem.trace_tours(tours)
+    scores = loaders.score_tours(problem_path, [tour_path, tour_path],
+                                 workers=2)
+    assert scores == [expected, expected]
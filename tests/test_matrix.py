@@ -178,3 +178,42 @@ def test_upper_diag_col(i, j, v):
 def test_lower_diag_col(i, j, v):
     m = matrix.LowerDiagCol(range(1, 7), 3)
     assert m[i, j] == v
+
+
+@pytest.mark.parametrize('kind', sorted(matrix.TYPES))
+@pytest.mark.parametrize('size', [1, 2, 5])
+@pytest.mark.parametrize('min_index', [0, 1])
+def test_to_array(kind, size, min_index):
+    Matrix = matrix.TYPES[kind]
+    if kind == 'FULL_MATRIX':
+        count = size * size
+    elif Matrix.has_diagonal:
+        count = size * (size + 1) // 2
+    else:
+        count = size * (size - 1) // 2
+    m = Matrix(range(1, count + 1), size, min_index=min_index)
+    indexes = range(min_index, min_index + size)
+    expected = [[m[i, j] for j in indexes] for i in indexes]
+    assert m.to_array().tolist() == expected
+
+
+@pytest.mark.parametrize('kind', sorted(matrix.TYPES))
+@pytest.mark.parametrize('min_index', [0, 1])
+def test_matrix_view(kind, min_index):
+    Matrix = matrix.TYPES[kind]
+    size = 6
+    count = size * size if kind == 'FULL_MATRIX' else size * (size + 1) // 2
+    if kind != 'FULL_MATRIX' and not Matrix.has_diagonal:
+        count = size * (size - 1) // 2
+    m = Matrix(range(1, count + 1), size, min_index=min_index)
+    keys = [min_index + k for k in [4, 1, 5]]
+    view = matrix.MatrixView(m, keys, min_index=7)
+    expected = [[m[a, b] for b in keys] for a in keys]
+    assert [[view[i, j] for j in range(7, 10)] for i in range(7, 10)] == \
+        expected
+    assert view.to_array().tolist() == expected
+    nested = matrix.MatrixView(view, [9, 7])
+    assert nested.to_array().tolist() == [[expected[2][2], expected[2][0]],
+                                          [expected[0][2], expected[0][0]]]
+    with pytest.raises(IndexError):
+        view[10, 7]
@@ -1,9 +1,14 @@
 # -*- coding: utf-8 -*-
+import pickle
 from unittest import mock
 
+import networkx
+import numpy as np
 import pytest
 
+from tsplib95 import exceptions
 from tsplib95 import models
+from tsplib95 import moves
 
 
 def SPECIAL(i, j):
@@ -200,6 +205,29 @@ def test_get_nodes(create_problem, nc, dd, edf, ed, dim, nodes, exc):
         assert list(problem.get_nodes()) == nodes
 
 
+def test_node_index_is_cached(create_problem):
+    problem = create_problem(edge_weight_type='EUC_2D',
+                             node_coords={1: [0, 0], 2: [3, 4], 5: [6, 8]})
+    index = problem.node_index
+    assert problem.node_index is index
+    assert index.tolist() == [1, 2, 5]
+    assert not index.contiguous
+    assert index.position(5) == 2
+
+    problem.node_coords = {4: [0, 0], 5: [3, 4]}
+    assert problem.node_index is not index
+    assert list(problem.get_nodes()) == [4, 5]
+    assert problem.node_index.contiguous
+    assert problem.get_weight(4, 5) == 5
+
+    problem.node_coords = {}
+    problem.dimension = 2
+    assert list(problem.get_nodes()) == [0, 1]
+    problem.edge_data_format = 'ADJ_LIST'
+    problem.edge_data = {3: [7], 8: []}
+    assert list(problem.get_nodes()) == [3, 7, 8]
+
+
 @pytest.mark.parametrize('nc,dd,edf,ed,dim,edges,exc', [
     ({}, {}, 'ADJ_LIST', {0: [1, 2]}, None, [(0, 1), (0, 2)], None),
     ({}, {}, 'EDGE_LIST', [(0, 1), (1, 2)], None, [(0, 1), (1, 2)], None),
@@ -261,8 +289,769 @@ def test_trace_tours(create_problem, tours):
     ]
 
 
+def test_trace_tours_iterators(read_problem_text):
+    text = read_problem_text('data/att532.tsp')
+    problem = models.StandardProblem.parse(text)
+    nodes = list(problem.get_nodes())
+    tours = [problem.get_nodes(), iter(nodes), (n for n in reversed(nodes))]
+    assert problem.trace_tours(tours) == [309636] * 3
+    assert problem.trace_tours_parallel([problem.get_nodes()],
+                                        workers=1) == [309636]
+
+
 def test_explicit_half_matrix_graph(read_problem_text):
     text = read_problem_text('data/gr17.tsp')
     problem = models.StandardProblem.parse(text)
     G = problem.get_graph()
     assert list(G.nodes) == list(range(17))
+
+
+@pytest.fixture
+def coordinate_problem(create_problem):
+    def create(typ='EUC_2D', **kwargs):
+        coords = {1: [0, 0], 2: [3, 4], 3: [6, 8], 5: [1.5, 2]}
+        kwargs.setdefault('node_coords', coords)
+        return create_problem(edge_weight_type=typ, dimension=4, **kwargs)
+    return create
+
+
+@pytest.mark.parametrize('typ', ['EUC_2D', 'CEIL_2D', 'ATT', 'GEO', 'MAN_2D'])
+def test_get_distance_matrix(coordinate_problem, typ):
+    problem = coordinate_problem(typ)
+    nodes = list(problem.get_nodes())
+    expected = [[problem.get_weight(a, b) for b in nodes] for a in nodes]
+
+    matrix = problem.get_distance_matrix()
+    assert matrix.tolist() == expected
+    assert problem.get_distance_matrix() is matrix
+
+    condensed = problem.get_distance_matrix(condensed=True)
+    assert len(condensed) == 10
+    assert [problem.get_weight(a, b) for a in nodes for b in nodes] == \
+        [w for row in expected for w in row]
+
+
+def test_get_distance_matrix_over_budget(coordinate_problem):
+    problem = coordinate_problem()
+    assert problem.get_distance_matrix(max_bytes=8) is None
+    assert problem.get_weight(1, 2) == 5
+
+
+def test_get_distance_matrix_fallback(read_problem_text):
+    problem = models.StandardProblem.parse(read_problem_text('data/gr17.tsp'))
+    matrix = problem.get_distance_matrix()
+    assert matrix.shape == (17, 17)
+    assert matrix[0, 1] == 633
+    assert problem.get_weight(0, 1) == 633
+
+
+def test_get_weight_builds_distance_matrix(coordinate_problem):
+    problem = coordinate_problem()
+    assert problem.get_weight(2, 3) == 5
+    assert problem.get_distance_matrix(max_bytes=0) is None
+
+    problem = coordinate_problem()
+    problem.auto_distance_matrix = True
+    assert problem.get_weight(2, 3) == 5
+    assert problem.get_distance_matrix(max_bytes=0) is not None
+
+    problem.max_matrix_bytes = 0
+    problem.node_coords = {1: [0, 0], 3: [0, 1]}
+    assert problem.get_weight(1, 3) == 1
+    assert problem.get_distance_matrix() is None
+
+
+def test_distance_matrix_cleared_on_new_coords(coordinate_problem):
+    problem = coordinate_problem()
+    assert problem.get_weight(1, 3) == 10
+    problem.node_coords = {1: [0, 0], 3: [0, 1]}
+    assert problem.get_weight(1, 3) == 1
+    assert problem.get_distance_matrix().shape == (2, 2)
+
+
+def test_condensed_requires_symmetry(create_problem):
+    problem = create_problem(edge_weight_type='SPECIAL', special=SPECIAL)
+    with pytest.raises(ValueError):
+        problem.get_distance_matrix(condensed=True)
+
+
+def test_weight_cache(coordinate_problem):
+    problem = coordinate_problem('GEO')
+    wc = problem.enable_weight_cache(capacity=2)
+    assert problem.weight_cache is wc
+    expected = problem.get_weight(1, 2)
+    assert problem.get_weight(2, 1) == expected
+    assert (wc.hits, wc.misses) == (1, 1)
+
+    problem.node_coords = {1: [0, 0], 2: [0, 1]}
+    assert len(wc) == 0
+    assert problem.get_weight(1, 2) == 112
+
+    problem.disable_weight_cache()
+    assert problem.weight_cache is None
+    assert problem.get_weight(1, 2) == 112
+
+
+@pytest.mark.parametrize('typ', [
+    'EUC_2D', 'CEIL_2D', 'ATT', 'MAN_2D', 'MAX_2D',
+])
+def test_get_neighbors(create_problem, typ):
+    rng = np.random.RandomState(31)
+    coords = rng.randint(0, 500, size=(80, 2)).tolist()
+    problem = create_problem(
+        edge_weight_type=typ,
+        node_coords={i + 1: c for i, c in enumerate(coords)},
+    )
+    neighbors, weights = problem.get_neighbors(5)
+    assert neighbors.shape == weights.shape == (80, 5)
+
+    for node, row, row_weights in zip(problem.get_nodes(), neighbors, weights):
+        others = sorted(problem.get_weight(node, other)
+                        for other in problem.get_nodes() if other != node)
+        assert row_weights.tolist() == others[:5]
+        assert [problem.get_weight(node, n) for n in row] == others[:5]
+
+
+@pytest.mark.parametrize('typ', ['GEO', 'SPECIAL', None])
+def test_get_neighbors_from_matrix(create_problem, typ):
+    problem = create_problem(edge_weight_type=typ,
+                             node_coords={1: [0, 0], 2: [1, 1], 3: [0, 3]},
+                             special=SPECIAL)
+    neighbors, weights = problem.get_neighbors(1)
+    assert neighbors.shape == weights.shape == (3, 1)
+    for node, (neighbor,), (weight,) in zip([1, 2, 3], neighbors, weights):
+        assert neighbor != node
+        assert problem.get_weight(node, neighbor) == weight
+
+
+def test_get_neighbors_over_budget(coordinate_problem):
+    problem = coordinate_problem('GEO')
+    problem.max_matrix_bytes = 0
+    with pytest.raises(ValueError):
+        problem.get_neighbors(1)
+
+
+def test_get_neighbors_explicit(read_problem_text):
+    problem = models.StandardProblem.parse(read_problem_text('data/gr17.tsp'))
+    neighbors, weights = problem.get_neighbors(3)
+    for node, row, row_weights in zip(problem.get_nodes(), neighbors, weights):
+        others = sorted((problem.get_weight(node, other), other)
+                        for other in problem.get_nodes() if other != node)
+        assert list(zip(row_weights.tolist(), row.tolist())) == others[:3]
+
+
+@pytest.mark.parametrize('direction,neighbors,weights', [
+    ('out', [[3, 2], [1, 3], [2, 1]], [[1, 5], [2, 6], [3, 7]]),
+    ('in', [[2, 3], [3, 1], [1, 2]], [[2, 7], [3, 5], [1, 6]]),
+])
+def test_get_neighbors_direction(create_problem, direction, neighbors,
+                                 weights):
+    problem = create_problem(
+        edge_weight_type='EXPLICIT',
+        edge_weight_format='FULL_MATRIX',
+        edge_weights=[[0, 5, 1], [2, 0, 6], [7, 3, 0]],
+        display_data={1: [0, 0], 2: [0, 0], 3: [0, 0]},
+    )
+    result = problem.get_neighbors(2, direction=direction)
+    assert result[0].tolist() == neighbors
+    assert result[1].tolist() == weights
+
+
+@pytest.fixture
+def grid_problem(create_problem):
+    def create(typ):
+        rng = np.random.RandomState(33)
+        coords = rng.randint(-300, 300, size=(120, 2)).tolist()
+        if typ == 'GEO':
+            # degrees and minutes in DDD.MM form
+            coords = np.array(coords)
+            minutes = np.abs(coords) % 10 * 6 / 100
+            coords = (np.fix(coords / 10) + np.sign(coords) * minutes).tolist()
+        return create_problem(
+            edge_weight_type=typ,
+            node_coords={i + 1: c for i, c in enumerate(coords)},
+        )
+    return create
+
+
+@pytest.mark.parametrize('typ', ['EUC_2D', 'ATT', 'CEIL_2D', 'MAN_2D', 'GEO'])
+def test_spatial_index_queries(grid_problem, typ):
+    problem = grid_problem(typ)
+    index = problem.get_spatial_index()
+    others = [n for n in problem.get_nodes() if n != 7]
+    weights = {n: problem.get_weight(7, n) for n in others}
+
+    nodes, found = index.nearest(7, 4)
+    assert found.tolist() == sorted(weights.values())[:4]
+    assert [weights[n] for n in nodes] == found.tolist()
+
+    radius = sorted(weights.values())[10]
+    nodes, found = index.within(7, radius)
+    expected = {n for n, w in weights.items() if w <= radius}
+    assert set(nodes.tolist()) == expected
+
+    point = problem.node_coords[7]
+    nodes, found = index.nearest(point, 1)
+    assert nodes.tolist() == [7]
+    assert found.tolist() == [problem.get_weight(7, 7)]
+
+    nodes, found = index.within(point, problem.get_weight(7, 7))
+    assert 7 in nodes.tolist()
+
+    size = 10 if typ == 'GEO' else 100
+    nodes = index.box([-size, -size], [size, size])
+    expected = [
+        n for n in problem.get_nodes()
+        if all(-size <= c <= size for c in problem.node_coords[n])
+    ]
+    assert nodes.tolist() == expected
+    assert 0 < len(expected) < len(problem.node_coords)
+
+
+def test_spatial_index_is_cached(grid_problem):
+    problem = grid_problem('EUC_2D')
+    index = problem.get_spatial_index()
+    assert problem.get_spatial_index('node_coords') is index
+
+    problem.node_coords = {1: [0, 0], 2: [3, 4]}
+    index = problem.get_spatial_index()
+    assert len(index) == 2
+    assert index.nearest(1, 1)[1].tolist() == [5]
+
+
+def test_spatial_index_display_data(create_problem):
+    problem = create_problem(display_data={1: [0, 0], 2: [1, 1]})
+    index = problem.get_spatial_index()
+    nodes, dists = index.nearest([0, 1], 2)
+    assert dists.tolist() == [1, 1]
+
+    problem.display_data = {1: [0, 0], 3: [0, 2]}
+    assert problem.get_spatial_index().box([0, 1], [0, 3]).tolist() == [3]
+
+
+@pytest.mark.parametrize('source', ['node_coords', 'edge_data'])
+def test_spatial_index_errors(create_problem, source):
+    with pytest.raises(ValueError):
+        create_problem().get_spatial_index(source)
+
+
+def scalar_trace(problem, tour):
+    return sum(problem.get_weight(a, b)
+               for a, b in zip(tour, tour[1:] + tour[:1]))
+
+
+@pytest.mark.parametrize('typ', ['EUC_2D', 'ATT', 'GEO', 'MAN_2D'])
+@pytest.mark.parametrize('budget', [0, 2 ** 20])
+def test_trace_tours_arrays(grid_problem, typ, budget):
+    problem = grid_problem(typ)
+    problem.max_matrix_bytes = budget
+    rng = np.random.RandomState(34)
+    nodes = list(problem.get_nodes())
+    tours = np.array([rng.permutation(nodes) for __ in range(6)])
+
+    expected = [scalar_trace(problem, tour) for tour in tours.tolist()]
+    assert problem.trace_tours(tours) == expected
+    assert problem.trace_tours(list(tours)) == expected
+    assert problem.trace_tours(tours.tolist()) == expected
+
+    # tours of varying lengths are fine too
+    assert problem.trace_tours([tours[0][:5], tours[1], []]) == [
+        scalar_trace(problem, tours[0][:5].tolist()), expected[1], 0,
+    ]
+
+
+@pytest.mark.parametrize('fmt,condensed', [
+    ('FULL_MATRIX', False),
+    ('UPPER_DIAG_ROW', True),
+])
+def test_trace_tours_float_matrix(create_problem, fmt, condensed):
+    rng = np.random.RandomState(34)
+    weights = rng.uniform(0, 1, size=(30, 30))
+    weights += weights.T
+    if fmt == 'FULL_MATRIX':
+        rows = weights.tolist()
+    else:
+        rows = [weights[i, i:].tolist() for i in range(30)]
+    problem = create_problem(
+        edge_weight_type='EXPLICIT',
+        edge_weight_format=fmt,
+        edge_weights=rows,
+        dimension=30,
+    )
+    problem.get_distance_matrix(condensed=condensed)
+    tours = [rng.permutation(30).tolist() for __ in range(5)]
+    expected = [scalar_trace(problem, tour) for tour in tours]
+    assert problem.trace_tours(tours) == expected
+
+
+def test_edge_weights_reuse_coordinates(grid_problem):
+    problem = grid_problem('EUC_2D')
+    weigher = problem._get_edge_weigher()
+    coords, __ = problem.get_array_metric()
+    problem.trace_tours([[1, 2, 3]])
+    problem.get_weights([1, 2], [3, 4])
+    assert problem._get_edge_weigher() is weigher
+    assert problem.get_array_metric()[0] is coords
+
+    problem.node_coords = {1: [0, 0], 2: [3, 4]}
+    assert problem._get_edge_weigher() is not weigher
+    assert problem.get_weights([1], [2]).tolist() == [5]
+    assert problem.trace_tours([[1, 2]]) == [10]
+
+
+def test_scalar_weights_with_gaps(create_problem):
+    problem = create_problem(
+        edge_weight_type='EUC_2D',
+        node_coords={1: [0, 0], 5: [3, 4], 9: [6, 8], 12: [0, 8]},
+    )
+    assert problem.get_weights(1, 5).item() == 5
+    tour = [1, 5, 9, 12]
+    delta = problem.move_deltas(tour, moves.TwoOpt(0, 2))
+    assert delta == problem.move_delta(tour, moves.TwoOpt(0, 2))
+
+
+@pytest.mark.parametrize('fmt,weights', [
+    ('FULL_MATRIX', [[0, 1, 2, 3], [4, 0, 5, 6], [7, 8, 0, 9], [1, 2, 3, 0]]),
+    ('UPPER_ROW', [[1, 2, 3], [4, 5], [6]]),
+    ('LOWER_DIAG_ROW', [[0], [1, 0], [2, 3, 0], [4, 5, 6, 0]]),
+])
+def test_explicit_weights_without_matrix(create_problem, fmt, weights):
+    problem = create_problem(edge_weight_type='EXPLICIT',
+                             edge_weight_format=fmt, edge_weights=weights,
+                             dimension=4)
+    nodes = list(problem.get_nodes())
+    tours = [nodes, nodes[::-1], [2, 0, 3, 1]]
+    expected = [sum(problem.get_weight(a, b) for a, b in zip(t, t[1:] + t[:1]))
+                for t in tours]
+    assert problem.trace_tours(tours) == expected
+    starts, ends = np.meshgrid(nodes, nodes, indexing='ij')
+    assert problem.get_weights(starts, ends).tolist() == \
+        [[problem.get_weight(a, b) for b in nodes] for a in nodes]
+    assert problem.get_weights(1, 2).item() == problem.get_weight(1, 2)
+    problem.to_csr()
+    list(problem.get_weighted_edges())
+    assert problem._distance_matrix is None
+
+    problem.auto_distance_matrix = True
+    problem._clear_caches()
+    assert problem.trace_tours(tours) == expected
+    assert problem._distance_matrix is not None
+
+
+def test_explicit_weights_of_subproblem(read_problem_text):
+    problem = models.StandardProblem.parse(read_problem_text('data/gr17.tsp'))
+    sub = problem.subproblem([16, 3, 9, 0])
+    tour = [0, 1, 2, 3]
+    parent = [sub.node_map[n] for n in tour]
+    assert sub.trace_tours([tour]) == problem.trace_tours([parent])
+    assert sub._distance_matrix is None
+    assert problem._distance_matrix is None
+
+
+def test_trace_tours_unknown_node(grid_problem):
+    problem = grid_problem('EUC_2D')
+    with pytest.raises(KeyError):
+        problem.trace_tours([[1, 2, 500]])
+
+
+@pytest.fixture
+def sop_problem(create_problem):
+    # node 2 must precede node 1, and node 0 must precede node 3
+    weights = [
+        [0, 5, 2, 7],
+        [3, 0, -1, 4],
+        [6, 1, 0, 2],
+        [-1, 8, 3, 0],
+    ]
+    return create_problem(
+        type='SOP',
+        dimension=4,
+        edge_weight_type='EXPLICIT',
+        edge_weight_format='FULL_MATRIX',
+        edge_weights=weights,
+    )
+
+
+@pytest.mark.parametrize('tour,message', [
+    ([0, 2, 1, 3], None),
+    ([2, 0, 1, 3], None),
+    ([0, 2, 1], 'node 3 is missing'),
+    ([0, 2, 1, 3, 4], 'node 4 at position 4 is not in the problem'),
+    ([0, 2, 2, 3], 'node 2 appears more than once, at positions 1 and 2'),
+    ([0, 1, 2, 3], 'node 2 must precede node 1'),
+    ([3, 2, 1, 0], 'node 0 must precede node 3'),
+])
+def test_validate_tour_sop(sop_problem, tour, message):
+    if message is None:
+        assert sop_problem.validate_tour(tour) is None
+    else:
+        with pytest.raises(exceptions.ValidationError, match=message):
+            sop_problem.validate_tour(tour)
+
+
+def test_validate_tour_sop_file(read_problem_text):
+    # the weight section of SOP files starts with the dimension
+    problem = models.StandardProblem.parse(read_problem_text('data/ESC07.sop'))
+    assert problem.get_weight(0, 8) == 1000000
+    assert problem.get_weight(1, 2) == 100
+    assert problem.get_weight(5, 1) == -1
+    assert problem.validate_tour([0, 1, 2, 3, 4, 6, 7, 5, 8]) is None
+    with pytest.raises(exceptions.ValidationError,
+                       match='node 4 must precede node 5'):
+        problem.validate_tour([0, 1, 2, 3, 5, 4, 6, 7, 8])
+
+
+@pytest.mark.parametrize('tour,valid', [
+    ([1, 2, 3, 5], True),
+    ([2, 1, 3, 5], True),
+    ([1, 3, 2, 5], False),
+    ([3, 5, 1, 2], True),
+])
+def test_validate_tour_fixed_edges(coordinate_problem, tour, valid):
+    problem = coordinate_problem(fixed_edges=[(2, 1), (3, 5)])
+    if valid:
+        problem.validate_tour(tour)
+    else:
+        with pytest.raises(exceptions.ValidationError,
+                           match=r'fixed edge \(2, 1\)'):
+            problem.validate_tour(tour)
+
+
+def test_validate_tour_fixed_edges_asymmetric(create_problem):
+    problem = create_problem(
+        type='ATSP',
+        dimension=3,
+        edge_weight_type='EXPLICIT',
+        edge_weight_format='FULL_MATRIX',
+        edge_weights=[[0, 1, 2], [3, 0, 4], [5, 6, 0]],
+        fixed_edges=[(1, 0)],
+    )
+    problem.validate_tour([1, 0, 2])
+    problem.validate_tour([0, 2, 1])
+    with pytest.raises(exceptions.ValidationError):
+        problem.validate_tour([0, 1, 2])
+
+
+def test_validate_tours_reports_first(grid_problem):
+    problem = grid_problem('EUC_2D')
+    rng = np.random.RandomState(37)
+    nodes = list(problem.get_nodes())
+    tours = rng.permutation(nodes)[None, :].repeat(8, axis=0)
+    problem.validate_tours(tours)
+
+    tours[5, 7] = tours[5, 3]
+    tours[6, 0] = 1000
+    with pytest.raises(exceptions.ValidationError,
+                       match=r'^tour 5: node \d+ appears more than once, '
+                             r'at positions 3 and 7$'):
+        problem.validate_tours(list(tours))
+    with pytest.raises(exceptions.ValidationError, match='^tour 2: node'):
+        problem.validate_tours([nodes, nodes, nodes[1:], tours[6]])
+
+
+def test_validate_problem(create_problem):
+    problem = create_problem(node_coords={1: [0, 0], 2: [1, 2, 3]})
+    with pytest.raises(exceptions.ValidationError, match='^node_coords: '):
+        problem.validate()
+
+    problem = create_problem(type='TOUR', dimension=3, tours=[[3, 1, 2]])
+    problem.validate()
+    problem.tours = [[3, 1, 2], [1, 2, 1]]
+    with pytest.raises(exceptions.ValidationError, match='^tour 1: '):
+        problem.validate()
+
+
+def naive_graph(problem, normalize=False):
+    G = networkx.Graph() if problem.is_symmetric() else networkx.DiGraph()
+    nodes = list(problem.get_nodes())
+    names = {n: (i if normalize else n) for i, n in enumerate(nodes)}
+    for n in nodes:
+        G.add_node(names[n], coord=problem.node_coords.get(n),
+                   display=problem.display_data.get(n),
+                   demand=problem.demands.get(n),
+                   is_depot=n in problem.depots)
+    for a, b in problem.get_edges():
+        G.add_edge(names[a], names[b], weight=problem.get_weight(a, b),
+                   is_fixed=(a, b) in problem.fixed_edges or
+                   (not G.is_directed() and (b, a) in problem.fixed_edges))
+    return G
+
+
+@pytest.mark.parametrize('kind', ['coordinates', 'explicit', 'edges'])
+@pytest.mark.parametrize('normalize', [False, True])
+@pytest.mark.parametrize('unique', [False, True])
+def test_get_graph_bulk(create_problem, kind, normalize, unique):
+    rng = np.random.RandomState(39)
+    kwargs = {'depots': [3, 5], 'demands': {2: 7}, 'fixed_edges': [(4, 2)]}
+    if kind == 'explicit':
+        weights = rng.randint(0, 50, size=(8, 8)).tolist()
+        kwargs.update(dimension=8, edge_weight_type='EXPLICIT',
+                      edge_weight_format='FULL_MATRIX', edge_weights=weights)
+    else:
+        coords = rng.randint(0, 50, size=(8, 2)).tolist()
+        kwargs.update(dimension=8, edge_weight_type='EUC_2D',
+                      node_coords={i + 1: c for i, c in enumerate(coords)})
+    if kind == 'edges':
+        kwargs.update(edge_data_format='EDGE_LIST',
+                      edge_data=[(1, 2), (2, 4), (4, 3), (5, 8), (2, 1)])
+    problem = create_problem(**kwargs)
+    problem.matrix_block_size = 10
+
+    G = problem.get_graph(normalize=normalize, unique=unique)
+    expected = naive_graph(problem, normalize=normalize)
+    assert type(G) is type(expected)
+    assert list(G.nodes(data=True)) == list(expected.nodes(data=True))
+    assert sorted(G.edges(data=True)) == sorted(expected.edges(data=True))
+
+
+@pytest.mark.parametrize('kind', ['coordinates', 'explicit', 'edges'])
+@pytest.mark.parametrize('unique', [False, True])
+@pytest.mark.parametrize('self_loops', [False, True])
+def test_get_edge_options(create_problem, kind, unique, self_loops):
+    rng = np.random.RandomState(42)
+    if kind == 'explicit':
+        weights = rng.randint(0, 50, size=(6, 6)).tolist()
+        problem = create_problem(dimension=6, edge_weight_type='EXPLICIT',
+                                 edge_weight_format='FULL_MATRIX',
+                                 edge_weights=weights)
+    else:
+        coords = rng.randint(0, 50, size=(6, 2)).tolist()
+        problem = create_problem(
+            dimension=6, edge_weight_type='EUC_2D',
+            node_coords={i + 1: c for i, c in enumerate(coords)})
+    if kind == 'edges':
+        problem.edge_data_format = 'EDGE_LIST'
+        problem.edge_data = [(1, 2), (3, 3), (2, 4), (2, 1), (4, 2), (5, 6)]
+
+    every = list(problem.get_edges())
+    expected = [(a, b) for a, b in every if self_loops or a != b]
+    if unique and problem.is_symmetric():
+        seen = set()
+        expected = [e for e in expected if not (frozenset(e) in seen or
+                                                seen.add(frozenset(e)))]
+        if kind != 'edges':
+            assert all(a <= b for a, b in expected)
+    edges = list(problem.get_edges(unique=unique, self_loops=self_loops))
+    assert edges == expected
+
+    blocks = list(problem.get_weighted_edges(unique=unique,
+                                             self_loops=self_loops,
+                                             chunk_size=2))
+    assert len(blocks) > 1
+    starts, ends, weights = map(np.concatenate, zip(*blocks))
+    assert list(zip(starts.tolist(), ends.tolist())) == expected
+    assert weights.tolist() == [problem.get_weight(a, b) for a, b in expected]
+
+    arrays = list(problem.get_edge_arrays(unique=unique,
+                                          self_loops=self_loops,
+                                          chunk_size=2))
+    assert all(np.array_equal(s, b[0]) and np.array_equal(e, b[1])
+               for (s, e), b in zip(arrays, blocks))
+
+
+def test_problem_record(create_problem):
+    problem = create_problem(name='tiny', type='TSP',
+                             edge_weight_type='EUC_2D',
+                             node_coords={1: [0, 0], 2: [3, 4], 3: [6, 8]})
+    record = problem.to_record()
+    assert record.name == 'tiny'
+    assert record.capacity == 0
+    assert record.depots == []
+    assert pickle.loads(pickle.dumps(record)) == record
+
+    copy = record.to_problem()
+    assert copy.as_dict() == problem.as_dict()
+    assert copy.trace_canonical_tour() == problem.trace_canonical_tour()
+
+
+def test_weights_are_created_lazily(create_problem):
+    problem = create_problem(edge_weight_type='EXPLICIT',
+                             edge_weight_format='FULL_MATRIX',
+                             edge_weights=[[0, 1, 2], [3, 0, 4], [5, 6, 0]])
+    assert problem._explicit_matrix is None
+    assert problem.get_weight(1, 2) == 4
+    assert problem._explicit_matrix is not None
+
+
+@pytest.mark.parametrize('name,value,weight', [
+    ('edge_weights', [[0, 7, 2], [3, 0, 4], [5, 6, 0]], 7),
+    ('edge_weight_format', 'UPPER_ROW', 0),
+    ('edge_weight_type', 'EUC_2D', 5),
+    ('node_coords', {0: [0, 0], 1: [6, 8], 2: [1, 1]}, 10),
+])
+def test_weights_follow_fields(create_problem, name, value, weight):
+    problem = create_problem(edge_weight_type='EXPLICIT',
+                             edge_weight_format='FULL_MATRIX',
+                             edge_weights=[[0, 1, 2], [3, 0, 4], [5, 6, 0]])
+    problem.get_distance_matrix()
+    assert problem.get_weight(0, 1) == 1
+    if name == 'edge_weight_type':
+        problem.node_coords = {0: [0, 0], 1: [3, 4], 2: [1, 1]}
+    elif name == 'node_coords':
+        problem.edge_weight_type = 'EUC_2D'
+    setattr(problem, name, value)
+    assert problem.get_weight(0, 1) == weight
+    assert problem.get_distance_matrix()[0, 1] == weight
+
+
+def test_special_follows_changes(create_problem):
+    problem = create_problem(edge_weight_type='SPECIAL',
+                             node_coords={0: [1], 1: [2], 2: [3]},
+                             special=lambda a, b: a[0] + b[0])
+    assert problem.get_weight(0, 1) == 3
+    problem.special = lambda a, b: a[0] * b[0]
+    assert problem.get_weight(1, 2) == 6
+    with pytest.raises(Exception, match='special'):
+        problem.special = None
+
+
+def special_manhattan(a, b):
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+
+@pytest.mark.parametrize('protocol', [2, pickle.HIGHEST_PROTOCOL])
+def test_pickle_problem(read_problem_text, protocol):
+    problem = models.StandardProblem.parse(read_problem_text('data/gr17.tsp'))
+    problem.tours = [list(range(17))]
+    problem.max_matrix_bytes = 1024
+    problem.get_distance_matrix()
+
+    copy = pickle.loads(pickle.dumps(problem, protocol=protocol))
+    assert copy.as_dict() == problem.as_dict()
+    assert copy.render() == problem.render()
+    assert copy.max_matrix_bytes == 1024
+    assert copy._distance_matrix is None
+    assert copy._explicit_matrix is None
+    assert copy.trace_tours(copy.tours) == problem.trace_tours(problem.tours)
+
+
+def test_pickle_problem_buffers(create_problem):
+    rng = np.random.RandomState(48)
+    coords = rng.random_sample((500, 2)).tolist()
+    problem = create_problem(dimension=500, edge_weight_type='SPECIAL',
+                             special=special_manhattan,
+                             node_coords=dict(enumerate(coords, 1)))
+    problem.get_weight(1, 2)
+
+    buffers = []
+    data = pickle.dumps(problem, protocol=5, buffer_callback=buffers.append)
+    assert buffers
+    assert len(data) < 1000
+    copy = pickle.loads(data, buffers=buffers)
+    assert copy.node_coords == problem.node_coords
+    assert copy.special is special_manhattan
+    assert copy.get_weight(3, 4) == problem.get_weight(3, 4)
+
+
+@pytest.mark.parametrize('name,value', [
+    ('node_coords', {1: [1, 2.5], 2: [3, 4]}),
+    ('fixed_edges', [(1, 2), (2, 3)]),
+    ('demands', {1: 3, 2: 0}),
+    ('depots', [1, 2]),
+    ('edge_weights', [[0, 1.5], [2.5, 0]]),
+])
+def test_pickle_keeps_values(create_problem, name, value):
+    problem = create_problem(**{name: value})
+    copy = pickle.loads(pickle.dumps(problem))
+    assert getattr(copy, name) == value
+    assert [type(v) for v in getattr(copy, name)] == \
+        [type(v) for v in value]
+    if isinstance(value, dict):
+        assert [type(v) for v in getattr(copy, name).values()] == \
+            [type(v) for v in value.values()]
+
+
+def test_derive_shares_weights(read_problem_text):
+    problem = models.StandardProblem.parse(read_problem_text('data/gr17.tsp'))
+    problem.max_matrix_bytes = 4096
+    matrix = problem.get_distance_matrix()
+
+    variant = problem.derive(fixed_edges=[(0, 1)], depots=[2])
+    assert type(variant) is models.StandardProblem
+    assert variant.fixed_edges == [(0, 1)]
+    assert variant.depots == [2]
+    assert problem.fixed_edges == []
+    assert variant.max_matrix_bytes == 4096
+    assert variant.edge_weights is problem.edge_weights
+    assert variant.node_index is problem.node_index
+    assert variant._explicit_matrix is problem._explicit_matrix
+    assert variant.get_distance_matrix() is matrix
+    assert variant.get_weight(0, 1) == problem.get_weight(0, 1)
+
+
+def test_derive_rebuilds_changed(create_problem):
+    problem = create_problem(
+        edge_weight_type='EUC_2D', display_data={1: [0, 0], 2: [1, 1]},
+        node_coords={1: [0, 0], 2: [3, 4], 3: [6, 8]})
+    problem.get_distance_matrix()
+    display = problem.get_spatial_index('display_data')
+    problem.get_spatial_index('node_coords')
+
+    variant = problem.derive(edge_weight_type='MAN_2D')
+    assert variant.node_index is problem.node_index
+    assert variant._distance_matrix is None
+    assert variant.get_weight(1, 2) == 7
+    assert problem.get_weight(1, 2) == 5
+    assert variant._spatial_indexes == {'display_data': display}
+
+    variant = problem.derive(node_coords={1: [0, 0], 5: [0, 1]})
+    assert list(variant.get_nodes()) == [1, 5]
+    assert variant.get_weight(1, 5) == 1
+
+    variant = problem.derive(edge_weight_type='SPECIAL',
+                             special=special_manhattan)
+    assert variant.get_weight(1, 3) == 14
+
+
+@pytest.mark.parametrize('fmt,weights', [
+    ('FULL_MATRIX', [[0, 1, 2, 3], [4, 0, 5, 6], [7, 8, 0, 9], [1, 2, 3, 0]]),
+    ('LOWER_ROW', [[1], [2, 3], [4, 5, 6]]),
+])
+def test_subproblem_explicit(create_problem, fmt, weights):
+    problem = create_problem(
+        edge_weight_type='EXPLICIT', edge_weight_format=fmt,
+        edge_weights=weights, dimension=4, depots=[3], fixed_edges=[(1, 3)])
+
+    sub = problem.subproblem([3, 1, 2])
+    assert sub.dimension == 3
+    assert list(sub.get_nodes()) == [0, 1, 2]
+    assert sub.node_map == {0: 3, 1: 1, 2: 2}
+    assert sub.depots == [0]
+    assert sub.fixed_edges == [[1, 0]]
+    assert sub._explicit_matrix.matrix is problem._explicit_matrix
+    for i in sub.get_nodes():
+        for j in sub.get_nodes():
+            expected = problem.get_weight(sub.node_map[i], sub.node_map[j])
+            assert sub.get_weight(i, j) == expected
+
+    upper = problem.is_symmetric()
+    rows = [[problem.get_weight(sub.node_map[i], sub.node_map[j])
+             for j in range(i if upper else 0, 3)]
+            for i in range(3)]
+    assert list(sub.edge_weights) == rows
+    assert sub.edge_weights[1:] == rows[1:]
+
+
+def test_subproblem_coordinates(create_problem):
+    problem = create_problem(
+        edge_weight_type='EUC_2D', demands={1: 0, 2: 4, 3: 5},
+        node_coords={1: [0, 0], 2: [3, 4], 3: [6, 8]},
+        tours=[[1, 2, 3]])
+    problem.get_distance_matrix()
+
+    sub = problem.subproblem([3, 2])
+    assert sub.node_coords == {1: [6, 8], 2: [3, 4]}
+    assert sub.demands == {1: 5, 2: 4}
+    assert sub.tours == []
+    assert sub.node_map == {1: 3, 2: 2}
+    assert sub.get_weight(1, 2) == 5
+    assert sub._distance_matrix is not None
+    assert sub.get_distance_matrix().tolist() == [[0, 5], [5, 0]]
+
+    tour = [sub.node_map[n] for n in [2, 1]]
+    assert tour == [2, 3]
+
+    with pytest.raises(KeyError):
+        problem.subproblem([1, 4])
+    with pytest.raises(ValueError):
+        problem.subproblem([1, 1])
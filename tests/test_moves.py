@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+from tsplib95 import models
+from tsplib95 import moves
+
+
+N = 12
+
+
+def apply_naively(tour, move):
+    tour = list(tour)
+    if isinstance(move, moves.TwoOpt):
+        tour[move.i + 1:move.j + 1] = tour[move.i + 1:move.j + 1][::-1]
+        return tour
+    if isinstance(move, moves.Swap):
+        tour[move.i], tour[move.j] = tour[move.j], tour[move.i]
+        return tour
+    if isinstance(move, moves.Insertion):
+        move = moves.OrOpt(move.i, 1, move.j)
+    segment = tour[move.i:move.i + move.length]
+    if move.reverse:
+        segment.reverse()
+    after = tour[move.j]
+    rest = tour[:move.i] + tour[move.i + move.length:]
+    at = rest.index(after) + 1
+    return rest[:at] + segment + rest[at:]
+
+
+def all_moves(n):
+    for i in range(n):
+        for j in range(i + 1, n):
+            yield moves.TwoOpt(i, j)
+    for i in range(n):
+        for j in range(n):
+            if i != j:
+                yield moves.Swap(i, j)
+            if (j - i) % n not in (0, n - 1):
+                yield moves.Insertion(i, j)
+    for length in (2, 3):
+        for i in range(n - length + 1):
+            for j in range(n):
+                if (j - i) % n > length - 1 and (j + 1 - i) % n:
+                    yield moves.OrOpt(i, length, j)
+                    yield moves.OrOpt(i, length, j, reverse=True)
+
+
+@pytest.fixture(params=['symmetric', 'asymmetric', 'coordinates'])
+def problem(request):
+    rng = np.random.RandomState(35)
+    if request.param == 'coordinates':
+        coords = rng.randint(0, 100, size=(N, 2)).tolist()
+        return models.StandardProblem(
+            dimension=N,
+            edge_weight_type='EUC_2D',
+            node_coords={i + 1: c for i, c in enumerate(coords)},
+        )
+    weights = rng.randint(1, 100, size=(N, N))
+    if request.param == 'symmetric':
+        weights = weights + weights.T
+    np.fill_diagonal(weights, 0)
+    return models.StandardProblem(
+        type='TSP' if request.param == 'symmetric' else 'ATSP',
+        dimension=N,
+        edge_weight_type='EXPLICIT',
+        edge_weight_format='FULL_MATRIX',
+        edge_weights=weights.tolist(),
+    )
+
+
+@pytest.fixture
+def tour(problem):
+    nodes = list(problem.get_nodes())
+    return np.random.RandomState(36).permutation(nodes).tolist()
+
+
+def test_move_delta(problem, tour):
+    cost = problem.trace_tours([tour])[0]
+    for move in all_moves(len(tour)):
+        expected = problem.trace_tours([apply_naively(tour, move)])[0] - cost
+        assert problem.move_delta(tour, move) == expected, move
+
+
+@pytest.mark.parametrize('kind', [moves.TwoOpt, moves.Swap, moves.Insertion,
+                                  moves.OrOpt])
+def test_move_deltas(problem, tour, kind):
+    batch = [m for m in all_moves(len(tour)) if type(m) is kind]
+    fields = [np.array(field) for field in zip(*batch)]
+    expected = [problem.move_delta(tour, move) for move in batch]
+    assert problem.move_deltas(tour, kind(*fields)).tolist() == expected
+
+
+def test_apply_keeps_cost(problem, tour):
+    evaluator = problem.get_move_evaluator(tour)
+    evaluator.cost
+    rng = np.random.RandomState(37)
+    candidates = list(all_moves(len(tour)))
+    for index in rng.randint(0, len(candidates), size=50):
+        move = candidates[index]
+        expected = apply_naively(tour, move)
+        delta = evaluator.delta(move)
+        assert evaluator.apply(move) == delta
+        assert tour == expected
+        assert evaluator.cost == problem.trace_tours([tour])[0]
+
+
+@pytest.mark.parametrize('move', [
+    moves.TwoOpt(3, 3),
+    moves.TwoOpt(5, 2),
+    moves.TwoOpt(0, N),
+    moves.Swap(4, 4),
+    moves.Insertion(4, 3),
+    moves.OrOpt(2, 3, 3),
+    moves.OrOpt(N - 1, 2, 3),
+])
+def test_invalid_move(problem, tour, move):
+    with pytest.raises(ValueError):
+        problem.move_delta(tour, move)
+
+
+def test_get_weights(problem):
+    nodes = np.array(list(problem.get_nodes()))
+    starts, ends = nodes[:, None], nodes[None, :]
+    expected = [[problem.get_weight(a, b) for b in nodes] for a in nodes]
+    assert problem.get_weights(starts, ends).tolist() == expected
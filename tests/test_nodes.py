@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+from tsplib95 import nodes
+
+
+@pytest.mark.parametrize('values,contiguous', [
+    (range(5), True),
+    ([3, 4, 5, 6], True),
+    ([1, 4, 5, 9], False),
+    ([], True),
+])
+def test_node_index(values, contiguous):
+    index = nodes.NodeIndex(values)
+    values = list(values)
+    assert index.contiguous is contiguous
+    assert len(index) == len(values)
+    assert list(index) == index.tolist() == values
+    assert not index.nodes.flags.writeable
+    for i, node in enumerate(values):
+        assert index.position(node) == i
+        assert node in index
+    assert index.positions(np.array(values[::-1])).tolist() == \
+        list(range(len(values)))[::-1]
+
+
+@pytest.mark.parametrize('values', [[3, 4, 5, 6], [1, 4, 5, 9]])
+def test_node_index_missing(values):
+    index = nodes.NodeIndex(values)
+    for node in [0, 2, 7, 10, 'a']:
+        assert node not in index
+    with pytest.raises(KeyError):
+        index.position(7)
+    with pytest.raises(KeyError, match='7'):
+        index.positions([[4, 5], [7, 9]])
+
+
+def test_node_index_positions_shape():
+    index = nodes.NodeIndex([2, 3, 5])
+    positions = index.positions([[5, 2], [3, 5]])
+    assert positions.tolist() == [[2, 0], [1, 2]]
+
+
+@pytest.mark.parametrize('values', [[1, 2, 3, 4], [1, 5, 9, 12]])
+def test_node_index_positions_scalar(values):
+    index = nodes.NodeIndex(values)
+    for node in (values[2], np.array(values[2]), np.int64(values[2])):
+        position = index.positions(node)
+        assert position.shape == ()
+        assert position.item() == 2
+    with pytest.raises(KeyError, match='7'):
+        index.positions(7)
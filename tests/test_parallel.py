@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from tsplib95 import distances
+from tsplib95 import models
+from tsplib95 import parallel
+
+
+@pytest.fixture
+def coords():
+    rng = np.random.RandomState(30)
+    return rng.uniform(0, 1000, size=(50, 2))
+
+
+@pytest.fixture
+def expected(coords):
+    return distances.euclidean_array(coords[:, None], coords[None, :])
+
+
+@pytest.mark.parametrize('workers,threads', [
+    (1, False),
+    (3, True),
+    (2, False),
+])
+def test_pairwise_weights(coords, expected, workers, threads):
+    progress = []
+    result = parallel.pairwise_weights(
+        coords,
+        distances.euclidean_array,
+        rows=7,
+        workers=workers,
+        threads=threads,
+        progress=lambda done, total: progress.append((done, total)),
+    )
+    assert np.array_equal(result, expected)
+    assert len(progress) == 8
+    assert progress[-1] == (50, 50)
+
+
+@pytest.mark.parametrize('threads', [True, False])
+def test_pairwise_weights_memmap(tmp_path, coords, expected, threads):
+    path = tmp_path / 'weights.npy'
+    result = parallel.pairwise_weights(coords, distances.euclidean_array,
+                                       out=path, rows=16, workers=2,
+                                       threads=threads)
+    assert np.array_equal(result, expected)
+    assert np.array_equal(np.load(path), expected)
+
+
+def test_pairwise_weights_into_array(coords, expected):
+    out = np.zeros((50, 50), dtype=np.int32)
+    result = parallel.pairwise_weights(coords, distances.euclidean_array,
+                                       out=out, rows=16, workers=2)
+    assert result is out
+    assert np.array_equal(out, expected)
+
+
+def test_pairwise_weights_wrong_shape(coords):
+    with pytest.raises(ValueError):
+        parallel.pairwise_weights(coords, distances.euclidean_array,
+                                  out=np.zeros((3, 3)))
+
+
+def test_compute_weights(read_problem_text):
+    problem = models.StandardProblem.parse(read_problem_text('data/gr666.tsp'))
+    nodes = list(problem.get_nodes())[:40]
+    problem.node_coords = {n: problem.node_coords[n] for n in nodes}
+    result = parallel.compute_weights(problem, workers=2, rows=8)
+    assert result.tolist() == [
+        [distances.geographical(problem.node_coords[a], problem.node_coords[b])
+         for b in nodes]
+        for a in nodes
+    ]
+
+
+def manhattan(start, end):
+    return sum(abs(e - s) for s, e in zip(start, end))
+
+
+manhattan.array = lambda start, end: np.abs(end - start).sum(axis=-1)
+
+
+def test_compute_weights_special():
+    problem = models.StandardProblem(
+        edge_weight_type='SPECIAL',
+        node_coords={1: [0, 0], 2: [1, 2], 3: [4, 4]},
+        special=manhattan,
+    )
+    result = parallel.compute_weights(problem, threads=True, workers=2)
+    assert result.tolist() == [[0, 3, 8], [3, 0, 5], [8, 5, 0]]
+    assert problem.get_distance_matrix().tolist() == result.tolist()
+
+
+def euclidean(start, end):
+    return sum((e - s) ** 2 for s, e in zip(start, end)) ** 0.5
+
+
+euclidean.array = lambda start, end: np.hypot(*(end - start).T).T
+
+
+def test_special_array_keeps_floats():
+    problem = models.StandardProblem(
+        edge_weight_type='SPECIAL',
+        node_coords={1: [0, 0], 2: [1.5, 0], 3: [1.5, 2]},
+        special=euclidean,
+    )
+    assert problem.get_weight(1, 2) == 1.5
+    assert problem.trace_tours([[1, 2, 3]]) == [6.0]
+    matrix = problem.get_distance_matrix()
+    assert matrix.dtype.kind == 'f'
+    assert matrix.tolist() == [[0, 1.5, 2.5], [1.5, 0, 2], [2.5, 2, 0]]
+    assert problem.get_weight(1, 3) == 2.5
+
+
+def test_compute_weights_keeps_floats():
+    problem = models.StandardProblem(
+        edge_weight_type='SPECIAL',
+        node_coords={1: [0, 0], 2: [1.5, 0], 3: [1.5, 2]},
+        special=euclidean,
+    )
+    result = parallel.compute_weights(problem)
+    assert result.dtype.kind == 'f'
+    assert result.tolist() == [[0, 1.5, 2.5], [1.5, 0, 2], [2.5, 2, 0]]
+    coords, func = problem.get_array_metric()
+    result = parallel.pairwise_weights(coords, func, rows=1, threads=True)
+    assert result[0, 1] == problem.get_weight(1, 2) == 1.5
+
+
+def test_compute_weights_requires_array_metric(read_problem_text):
+    problem = models.StandardProblem.parse(read_problem_text('data/gr17.tsp'))
+    with pytest.raises(ValueError):
+        parallel.compute_weights(problem)
+
+
+def special_product(a, b):
+    return int(a[0] * b[1]) % 7
+
+
+@pytest.fixture(params=['coordinates', 'explicit', 'special'])
+def problem(request):
+    rng = np.random.RandomState(38)
+    if request.param == 'explicit':
+        weights = rng.uniform(0, 10, size=(20, 20)).tolist()
+        return models.StandardProblem(
+            type='ATSP',
+            dimension=20,
+            edge_weight_type='EXPLICIT',
+            edge_weight_format='FULL_MATRIX',
+            edge_weights=weights,
+        )
+    coords = rng.uniform(0, 1000, size=(20, 2)).tolist()
+    problem = models.StandardProblem(
+        dimension=20,
+        edge_weight_type='EUC_2D',
+        node_coords={i + 1: c for i, c in enumerate(coords)},
+    )
+    if request.param == 'special':
+        problem.edge_weight_type = 'SPECIAL'
+        problem.special = special_product
+    return problem
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_trace_tours(problem, workers):
+    rng = np.random.RandomState(39)
+    nodes = list(problem.get_nodes())
+    tours = [rng.permutation(nodes).tolist() for __ in range(25)]
+    tours += [nodes[:5], nodes[3:], []]
+    expected = problem.trace_tours(tours)
+    result = problem.trace_tours_parallel(tours, workers=workers,
+                                          chunk_size=4)
+    assert result == expected
+
+
+@pytest.mark.parametrize('method', ['fork', 'spawn'])
+def test_trace_tours_start_method(problem, method):
+    if method not in multiprocessing.get_all_start_methods():
+        pytest.skip(f'requires the {method} start method')
+    nodes = list(problem.get_nodes())
+    tours = [nodes, nodes[::-1], nodes[:5]]
+    context = multiprocessing.get_context(method)
+    result = problem.trace_tours_parallel(tours, workers=2, chunk_size=1,
+                                          mp_context=context)
+    assert result == problem.trace_tours(tours)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_score_tours(tmp_path, problem, workers):
+    rng = np.random.RandomState(40)
+    nodes = list(problem.get_nodes())
+    paths, expected = [], []
+    for i in range(6):
+        tours = [rng.permutation(nodes).tolist() for __ in range(i % 3 + 1)]
+        lines = [' '.join(map(str, tour)) + ' -1' for tour in tours]
+        path = tmp_path / f'{i}.tour'
+        path.write_text('TYPE: TOUR\nTOUR_SECTION\n' + '\n'.join(lines) +
+                        '\n-1\nEOF\n')
+        paths.append(path)
+        expected.append(problem.trace_tours(tours))
+
+    result = parallel.score_tours(problem, paths, workers=workers,
+                                  chunk_size=2)
+    assert result == expected
+
+
+def test_tour_tracer_nodes():
+    weigher = lambda i, j: np.abs(i - j)  # noqa: E731
+    tracer = parallel.TourTracer([2, 5, 9], weigher)
+    assert tracer.trace(np.array([[2, 5, 9], [9, 2, 5]])) == [4, 4]
+    with pytest.raises(KeyError):
+        tracer.trace(np.array([[2, 5, 7]]))
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+import multiprocessing
+import pickle
+
+import numpy as np
+import pytest
+
+from tsplib95 import models
+from tsplib95 import shared
+
+
+def manhattan(a, b):
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+
+@pytest.fixture(params=['coordinates', 'explicit', 'special', 'big'])
+def problem(request):
+    rng = np.random.RandomState(47)
+    kwargs = {'name': 'shared', 'type': 'TSP', 'dimension': 12,
+              'tours': [list(range(1, 13)), list(range(12, 0, -1))]}
+    if request.param == 'explicit':
+        weights = rng.randint(0, 50, size=(12, 12)).tolist()
+        kwargs.update(type='ATSP', edge_weight_type='EXPLICIT',
+                      edge_weight_format='FULL_MATRIX', edge_weights=weights,
+                      tours=[list(range(12))])
+    else:
+        coords = rng.randint(0, 50, size=(12, 2)).tolist()
+        kwargs.update(edge_weight_type='EUC_2D',
+                      node_coords={i + 1: c for i, c in enumerate(coords)})
+    if request.param == 'special':
+        kwargs.update(edge_weight_type='SPECIAL', special=manhattan)
+    problem = models.StandardProblem(**kwargs)
+    if request.param == 'big':
+        problem.max_matrix_bytes = 0
+    return problem
+
+
+def summarize(handle):
+    problem = models.StandardProblem.attach(handle)
+    nodes = list(problem.get_nodes())
+    weights = [problem.get_weight(a, b) for a in nodes for b in nodes]
+    return weights, problem.trace_tours(problem.tours), problem.render()
+
+
+def expected(problem):
+    nodes = list(problem.get_nodes())
+    weights = [problem.get_weight(a, b) for a in nodes for b in nodes]
+    return weights, problem.trace_tours(problem.tours), problem.render()
+
+
+def test_share_and_attach(problem):
+    with problem.share() as handle:
+        assert ('matrix' in handle.specs) is (problem.max_matrix_bytes > 0)
+        copy = pickle.loads(pickle.dumps(handle))
+        attached = copy.attach()
+        assert attached._shared is copy
+        assert attached.as_dict() == problem.as_dict()
+        assert summarize(copy) == expected(problem)
+        if problem.node_coords:
+            assert not attached.node_coords.coords.flags.writeable
+        del attached
+        copy.close()
+    assert not handle._created
+
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(),
+                    reason='requires the fork start method')
+def test_share_with_workers(problem):
+    context = multiprocessing.get_context('fork')
+    with problem.share() as handle:
+        with context.Pool(2) as pool:
+            results = pool.map(summarize, [handle] * 3)
+    assert results == [expected(problem)] * 3
+
+
+def test_unlink_removes_segments(problem):
+    handle = problem.share()
+    names = [spec[0] for spec in handle.specs.values()]
+    handle.close()
+    handle.unlink()
+    for name in names:
+        with pytest.raises(FileNotFoundError):
+            shared._open(name)
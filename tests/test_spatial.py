@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+from tsplib95 import spatial
+
+
+def brute_force(points, k, norm):
+    deltas = np.abs(points[:, None] - points[None, :])
+    if norm == 1:
+        dists = deltas.sum(axis=-1)
+    elif norm == np.inf:
+        dists = deltas.max(axis=-1)
+    else:
+        dists = np.sqrt((deltas ** 2).sum(axis=-1))
+    np.fill_diagonal(dists, np.inf)
+    return np.sort(dists, axis=1)[:, :k]
+
+
+@pytest.mark.parametrize('dimensions', [2, 3])
+@pytest.mark.parametrize('norm', [1, 2, np.inf])
+def test_grid_index_neighbors(dimensions, norm):
+    rng = np.random.RandomState(31)
+    points = rng.uniform(0, 100, size=(300, dimensions))
+    # clustered points need larger searches
+    points[:50] = rng.uniform(0, 1, size=(50, dimensions))
+
+    index = spatial.GridIndex(points)
+    positions, dists = index.neighbors(6, norm=norm)
+    assert positions.shape == (300, 6)
+    assert not np.any(positions == np.arange(300)[:, None])
+    assert np.allclose(dists, brute_force(points, 6, norm))
+
+
+@pytest.mark.parametrize('points,k,count', [
+    ([[0, 0]], 3, 0),
+    ([[0, 0], [1, 1], [2, 2]], 5, 2),
+    ([[1, 1], [1, 1], [1, 1]], 1, 1),
+    ([[0, 0], [0, 5], [0, 9]], 1, 1),
+])
+def test_grid_index_small(points, k, count):
+    positions, dists = spatial.GridIndex(points).neighbors(k)
+    assert positions.shape == (len(points), count)
+
+
+def test_grid_index_requires_points():
+    with pytest.raises(ValueError):
+        spatial.GridIndex([])
+
+
+@pytest.fixture
+def points():
+    rng = np.random.RandomState(33)
+    return rng.uniform(0, 100, size=(200, 2))
+
+
+@pytest.mark.parametrize('point', [[50, 50], [0, 0], [-40, 130], [500, 500]])
+@pytest.mark.parametrize('norm', [1, 2, np.inf])
+def test_grid_index_nearest(points, point, norm):
+    index = spatial.GridIndex(points)
+    positions, dists = index.nearest(point, 5, norm=norm)
+    expected = np.sort(np.linalg.norm(points - point, ord=norm, axis=1))[:5]
+    assert np.allclose(dists, expected)
+    assert np.allclose(
+        np.linalg.norm(points[positions] - point, ord=norm, axis=1),
+        expected,
+    )
+
+
+@pytest.mark.parametrize('point,radius', [
+    ([50, 50], 10),
+    ([0, 0], 30),
+    ([-10, 50], 15),
+    ([50, 50], 0),
+])
+@pytest.mark.parametrize('norm', [1, 2, np.inf])
+def test_grid_index_within(points, point, radius, norm):
+    positions, dists = spatial.GridIndex(points).within(point, radius, norm)
+    all_dists = np.linalg.norm(points - point, ord=norm, axis=1)
+    assert sorted(positions) == list(np.flatnonzero(all_dists <= radius))
+    assert list(dists) == sorted(dists)
+
+
+@pytest.mark.parametrize('lower,upper', [
+    ([10, 20], [30, 25]),
+    ([-10, -10], [5, 200]),
+    ([150, 150], [160, 160]),
+    ([30, 30], [20, 20]),
+])
+def test_grid_index_box(points, lower, upper):
+    positions = spatial.GridIndex(points).box(lower, upper)
+    inside = np.all((points >= lower) & (points <= upper), axis=1)
+    assert list(positions) == list(np.flatnonzero(inside))
+
+
+def test_spatial_index_plain_distances(points):
+    nodes = np.arange(1, 201)
+    index = spatial.SpatialIndex(nodes, points)
+    found, dists = index.nearest(1, 3)
+    assert 1 not in found
+    assert np.allclose(dists, np.linalg.norm(points[found - 1] - points[0],
+                                             axis=1))
+
+    found, dists = index.within([50, 50], 10)
+    assert np.all(dists <= 10)
+
+    assert list(index.box([0, 0], [100, 100])) == list(nodes)
+
+
+def test_spatial_index_requires_metric_without_norm(points):
+    with pytest.raises(ValueError):
+        spatial.SpatialIndex(range(200), points, norm=None)
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+import tsplib95
+from tsplib95 import models
+from tsplib95 import moves
+from tsplib95 import tours
+
+
+@pytest.fixture
+def problem():
+    coords = {1: [0, 0], 2: [3, 4], 3: [6, 8], 4: [1.5, 2], 5: [9, 1]}
+    return models.StandardProblem(
+        dimension=5,
+        edge_weight_type='EUC_2D',
+        node_coords=coords,
+    )
+
+
+def test_tour_is_exported():
+    assert tsplib95.Tour is tours.Tour
+
+
+def test_tour_sequence():
+    tour = tours.Tour([3, 1, 4, 2])
+    assert len(tour) == 4
+    assert list(tour) == [3, 1, 4, 2]
+    assert tour[0] == 3
+    assert tour[1:3] == [1, 4]
+    assert 4 in tour
+    assert 5 not in tour
+    assert 0 not in tour
+    assert tour == tours.Tour([3, 1, 4, 2])
+    assert np.array(tour).tolist() == [3, 1, 4, 2]
+
+
+def test_tour_duplicates():
+    with pytest.raises(ValueError):
+        tours.Tour([1, 2, 1])
+
+
+def test_tour_queries():
+    tour = tours.Tour([3, 1, 4, 2])
+    assert tour.position(4) == 2
+    assert tour.next(4) == 2
+    assert tour.next(2) == 3
+    assert tour.prev(3) == 2
+    assert tour.prev(1) == 3
+    assert tour.between(1, 4, 2)
+    assert not tour.between(1, 3, 4)
+    assert tour.between(2, 3, 1)
+    assert not tour.between(2, 4, 1)
+    with pytest.raises(KeyError):
+        tour.position(7)
+
+
+@pytest.mark.parametrize('i,j,expected', [
+    (1, 3, [1, 4, 3, 2, 5, 6]),
+    (4, 1, [6, 5, 3, 4, 2, 1]),
+    (2, 2, [1, 2, 3, 4, 5, 6]),
+])
+def test_tour_reverse(i, j, expected):
+    tour = tours.Tour([1, 2, 3, 4, 5, 6])
+    tour.reverse(i, j)
+    assert tour.tolist() == expected
+    assert [tour.position(node) for node in tour] == list(range(6))
+
+
+def test_tour_cost(problem):
+    tour = tours.Tour([1, 3, 2, 5, 4], problem=problem)
+    assert tour.cost == problem.trace_tours([[1, 3, 2, 5, 4]])[0]
+    tour.reverse(1, 2)
+    assert tour.cost == problem.trace_tours([[1, 2, 3, 5, 4]])[0]
+    with pytest.raises(ValueError):
+        tours.Tour([1, 2]).cost
+
+
+def test_tour_field(problem):
+    problem.tours = [[1, 2, 3, 4, 5], [5, 4, 3, 2, 1]]
+    loaded = tours.Tour.from_field(problem.tours, problem=problem)
+    assert [t.cost for t in loaded] == problem.trace_tours(problem.tours)
+    assert problem.trace_tours(loaded) == problem.trace_tours(problem.tours)
+
+    problem.tours = loaded
+    assert tours.Tour.to_field(loaded) == [[1, 2, 3, 4, 5], [5, 4, 3, 2, 1]]
+    assert 'TOUR_SECTION:\n1 2 3 4 5 -1\n5 4 3 2 1 -1\n-1' in \
+        problem.render()
+
+
+def test_tour_with_moves(problem):
+    tour = tours.Tour([1, 2, 3, 4, 5], problem=problem)
+    evaluator = problem.get_move_evaluator(tour)
+    cost = tour.cost
+    delta = evaluator.apply(moves.OrOpt(1, 2, 4))
+    assert tour.tolist() == [1, 4, 5, 2, 3]
+    assert tour.position(2) == 3
+    assert tour.cost == cost + delta
+    assert tour.cost == problem.trace_tours([[1, 4, 5, 2, 3]])[0]
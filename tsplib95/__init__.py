@@ -8,12 +8,20 @@ __version__ = '0.7.1'
 
 
 from . import bisep  # noqa: F401
+from . import cache  # noqa: F401
 from . import distances  # noqa: F401
 from . import exceptions  # noqa: F401
 from . import fields  # noqa: F401
+from . import graphs  # noqa: F401
 from . import loaders  # noqa: F401
 from . import matrix  # noqa: F401
 from . import models  # noqa: F401
+from . import moves  # noqa: F401
+from . import nodes  # noqa: F401
+from . import parallel  # noqa: F401
+from . import shared  # noqa: F401
+from . import spatial  # noqa: F401
+from . import tours  # noqa: F401
 from . import transformers  # noqa: F401
 from . import utils  # noqa: F401
 
@@ -21,6 +29,7 @@ from . import utils  # noqa: F401
 parse = loaders.parse
 load = loaders.load
 read = loaders.read
+Tour = tours.Tour
 
 # legacy
 load_problem = loaders.load_problem
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+import collections
+
+
+__all__ = [
+    'WeightCache',
+]
+
+
+class WeightCache:
+    """Bounded cache for an edge weight function.
+
+    The cache is called like the weight function it wraps. Once it holds
+    ``capacity`` weights, adding another evicts one according to the
+    ``policy``:
+
+    * ``'lru'`` - evict the least recently used weight
+    * ``'fifo'`` - evict the oldest weight
+
+    For symmetric weight functions, ``(i, j)`` and ``(j, i)`` share a single
+    entry.
+
+    :param callable func: weight function that accepts two nodes
+    :param int capacity: maximum number of weights to hold
+    :param str policy: eviction policy
+    :param bool symmetric: whether the weight function is symmetric
+    """
+
+    #: Names of the supported eviction policies
+    POLICIES = ('lru', 'fifo')
+
+    def __init__(self, func, capacity=2 ** 20, policy='lru', symmetric=False):
+        if policy not in self.POLICIES:
+            raise ValueError(f'unknown eviction policy: {repr(policy)}')
+        if capacity < 1:
+            raise ValueError('capacity must be at least 1')
+        self.func = func
+        self.capacity = capacity
+        self.policy = policy
+        self.symmetric = symmetric
+        self.weights = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        return (f'<{self.__class__.__qualname__}(policy={repr(self.policy)}, '
+                f'size={len(self)}, capacity={self.capacity}, '
+                f'hits={self.hits}, misses={self.misses})>')
+
+    def __len__(self):
+        return len(self.weights)
+
+    def __call__(self, start, end):
+        key = (start, end)
+        if self.symmetric and end < start:
+            key = (end, start)
+
+        weights = self.weights
+        try:
+            weight = weights[key]
+        except KeyError:
+            pass
+        else:
+            self.hits += 1
+            if self.policy == 'lru':
+                weights.move_to_end(key)
+            return weight
+
+        self.misses += 1
+        weight = self.func(start, end)
+        weights[key] = weight
+        if len(weights) > self.capacity:
+            weights.popitem(last=False)
+        return weight
+
+    @property
+    def hit_rate(self):
+        """Fraction of lookups that were hits."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self):
+        """Remove all cached weights and reset the counters."""
+        self.weights.clear()
+        self.hits = 0
+        self.misses = 0
@@ -2,6 +2,8 @@
 import functools
 import math
 
+import numpy as np
+
 from . import utils
 
 
@@ -11,8 +13,20 @@ __all__ = [
     'manhattan',
     'maximum',
     'geographical',
+    'geographical_radians',
     'pseudo_euclidean',
     'xray',
+    'ARRAY_TYPES',
+    'NORMS',
+    'NORM_SCALES',
+    'euclidean_array',
+    'manhattan_array',
+    'maximum_array',
+    'geographical_array',
+    'geographical_radians_array',
+    'geo_radians',
+    'pseudo_euclidean_array',
+    'xray_array',
 ]
 
 
@@ -91,10 +105,28 @@ def geographical(start, end, round=utils.nint, radius=6378.388):
 
     start = utils.RadianGeo(start)
     end = utils.RadianGeo(end)
+    return geographical_radians((start.lat, start.lng), (end.lat, end.lng),
+                                radius=radius)
+
+
+def geographical_radians(start, end, radius=6378.388):
+    """Return the geographical distance between start and end in radians.
+
+    This is the same as :func:`geographical` but takes latitude and longitude
+    already converted into radians (see :func:`geo_radians`), which avoids
+    converting the same coordinates over and over again.
+
+    :param tuple start: latitude and longitude in radians
+    :param tuple end: latitude and longitude in radians
+    :param float radius: the radius of the Earth
+    :return: rounded distance
+    """
+    start_lat, start_lng = start
+    end_lat, end_lng = end
 
-    q1 = math.cos(start.lng - end.lng)
-    q2 = math.cos(start.lat - end.lat)
-    q3 = math.cos(start.lat + end.lat)
+    q1 = math.cos(start_lng - end_lng)
+    q2 = math.cos(start_lat - end_lat)
+    q3 = math.cos(start_lat + end_lat)
     distance = radius * math.acos(0.5 * ((1 + q1) * q2 - (1 - q1) * q3)) + 1
 
     return int(distance)
@@ -164,3 +196,224 @@ TYPES = {
     'XRAY1': xray,
     'XRAY2': functools.partial(xray, sx=1.25, sy=1.5, sz=1.15),
 }
+
+
+def _coordinate_arrays(start, end, dimensions=None):
+    # helper to accept anything array-like and check the dimensionality of
+    # the coordinates, which is always the size of the last axis
+    start = np.asarray(start, dtype=float)
+    end = np.asarray(end, dtype=float)
+    if start.shape[-1:] != end.shape[-1:]:
+        raise ValueError('dimension mismatch between start and end')
+    if dimensions and start.shape[-1:] != (dimensions,):
+        raise ValueError(f'start and end must be {dimensions}-dimensional')
+    return start, end
+
+
+def _abs_deltas(start, end):
+    # one array of absolute deltas per dimension
+    return [np.abs(end[..., k] - start[..., k]) for k in range(end.shape[-1])]
+
+
+def _square_sum(start, end):
+    # summed dimension by dimension to match the order of the scalar sum
+    total = 0
+    for k in range(end.shape[-1]):
+        delta = end[..., k] - start[..., k]
+        total = total + delta * delta
+    return total
+
+
+def euclidean_array(start, end, round=utils.nint_array):
+    """Return the Euclidean distances between arrays of coordinates.
+
+    This is the array counterpart of :func:`euclidean`. The coordinates are
+    given along the last axis and all other axes are broadcast together, so
+    the following are all supported:
+
+    * paired: ``start`` and ``end`` both of shape ``(n, d)``
+    * one-to-many: ``start`` of shape ``(d,)`` and ``end`` of shape ``(n, d)``
+    * many-to-many: ``start[:, None]`` and ``end[None, :]``
+
+    If ``round=utils.ceil_array`` is passed, this is suitable for CEIL_2D
+    problems as well.
+
+    :param start: array of *n*-dimensional coordinates
+    :param end: array of *n*-dimensional coordinates
+    :param callable round: function to use to round the results
+    :return: rounded distances
+    :rtype: :class:`numpy.ndarray`
+    """
+    start, end = _coordinate_arrays(start, end)
+    distance = np.sqrt(_square_sum(start, end))
+    return round(distance)
+
+
+def manhattan_array(start, end, round=utils.nint_array):
+    """Return the Manhattan distances between arrays of coordinates.
+
+    This is the array counterpart of :func:`manhattan`. See
+    :func:`euclidean_array` for how the coordinates are broadcast.
+
+    :param start: array of *n*-dimensional coordinates
+    :param end: array of *n*-dimensional coordinates
+    :param callable round: function to use to round the results
+    :return: rounded distances
+    :rtype: :class:`numpy.ndarray`
+    """
+    start, end = _coordinate_arrays(start, end)
+    distance = 0
+    for delta in _abs_deltas(start, end):
+        distance = distance + delta
+    return round(distance)
+
+
+def maximum_array(start, end, round=utils.nint_array):
+    """Return the Maximum distances between arrays of coordinates.
+
+    This is the array counterpart of :func:`maximum`. See
+    :func:`euclidean_array` for how the coordinates are broadcast.
+
+    :param start: array of *n*-dimensional coordinates
+    :param end: array of *n*-dimensional coordinates
+    :param callable round: function to use to round the results
+    :return: rounded distances
+    :rtype: :class:`numpy.ndarray`
+    """
+    start, end = _coordinate_arrays(start, end)
+    distance = functools.reduce(np.maximum, _abs_deltas(start, end))
+    return round(distance)
+
+
+def geographical_array(start, end, round=utils.nint_array, radius=6378.388):
+    """Return the geographical distances between arrays of coordinates.
+
+    This is the array counterpart of :func:`geographical`. See
+    :func:`euclidean_array` for how the coordinates are broadcast.
+
+    :param start: array of 2-dimensional coordinates
+    :param end: array of 2-dimensional coordinates
+    :param callable round: function to use to round the results
+    :param float radius: the radius of the Earth
+    :return: rounded distances
+    :rtype: :class:`numpy.ndarray`
+    """
+    start, end = _coordinate_arrays(start, end, dimensions=2)
+    return geographical_radians_array(geo_radians(start), geo_radians(end),
+                                      radius=radius)
+
+
+def geographical_radians_array(start, end, radius=6378.388):
+    """Return the geographical distances between arrays of radians.
+
+    This is the array counterpart of :func:`geographical_radians`. See
+    :func:`euclidean_array` for how the coordinates are broadcast.
+
+    :param start: array of latitudes and longitudes in radians
+    :param end: array of latitudes and longitudes in radians
+    :param float radius: the radius of the Earth
+    :return: rounded distances
+    :rtype: :class:`numpy.ndarray`
+    """
+    start, end = _coordinate_arrays(start, end, dimensions=2)
+    start_lat, start_lng = start[..., 0], start[..., 1]
+    end_lat, end_lng = end[..., 0], end[..., 1]
+
+    q1 = np.cos(start_lng - end_lng)
+    q2 = np.cos(start_lat - end_lat)
+    q3 = np.cos(start_lat + end_lat)
+    distance = radius * np.arccos(0.5 * ((1 + q1) * q2 - (1 - q1) * q3)) + 1
+
+    return np.trunc(distance).astype(np.int64)
+
+
+def geo_radians(coords):
+    """Convert GEO coordinates into latitudes and longitudes in radians.
+
+    Each component is converted exactly as :class:`~tsplib95.utils.RadianGeo`
+    would convert it.
+
+    :param coords: array of 2-dimensional GEO coordinates
+    :return: array of latitudes and longitudes in radians
+    :rtype: :class:`numpy.ndarray`
+    """
+    coords = np.asarray(coords, dtype=float)
+    degrees = np.trunc(coords)
+    minutes = coords - degrees
+    return np.radians(degrees + minutes * 5 / 3)
+
+
+def pseudo_euclidean_array(start, end, round=utils.nint_array):
+    """Return the pseudo-Euclidean distances between arrays of coordinates.
+
+    This is the array counterpart of :func:`pseudo_euclidean`. See
+    :func:`euclidean_array` for how the coordinates are broadcast.
+
+    :param start: array of *n*-dimensional coordinates
+    :param end: array of *n*-dimensional coordinates
+    :param callable round: function to use to round the results
+    :return: rounded distances
+    :rtype: :class:`numpy.ndarray`
+    """
+    start, end = _coordinate_arrays(start, end)
+    value = np.sqrt(_square_sum(start, end) / 10)
+
+    distance = round(value)
+    return np.where(distance < value, distance + 1, distance)
+
+
+def xray_array(start, end, sx=1.0, sy=1.0, sz=1.0, round=utils.nint_array):
+    """Return x-ray crystallography distances between arrays of coordinates.
+
+    This is the array counterpart of :func:`xray`. See
+    :func:`euclidean_array` for how the coordinates are broadcast.
+
+    :param start: array of 3-dimensional coordinates
+    :param end: array of 3-dimensional coordinates
+    :param float sx: x motor speed
+    :param float sy: y motor speed
+    :param float sz: z motor speed
+    :return: distances
+    :rtype: :class:`numpy.ndarray`
+    """
+    start, end = _coordinate_arrays(start, end, dimensions=3)
+    dx, dy, dz = _abs_deltas(start, end)
+    dx = np.minimum(dx, np.abs(dx - 360))
+
+    distance = np.maximum(np.maximum(dx / sx, dy / sy), dz / sz)
+    return round(100.0 * distance)
+
+
+#: Map of distance function types to array distance functions
+ARRAY_TYPES = {
+    'EUC_2D': euclidean_array,
+    'EUC_3D': euclidean_array,
+    'MAX_2D': maximum_array,
+    'MAX_3D': maximum_array,
+    'MAN_2D': manhattan_array,
+    'MAN_3D': manhattan_array,
+    'CEIL_2D': functools.partial(euclidean_array, round=utils.ceil_array),
+    'GEO': geographical_array,
+    'ATT': pseudo_euclidean_array,
+    'XRAY1': xray_array,
+    'XRAY2': functools.partial(xray_array, sx=1.25, sy=1.5, sz=1.15),
+}
+
+
+#: Map of distance function types to the norms they measure before rounding
+NORMS = {
+    'EUC_2D': 2,
+    'EUC_3D': 2,
+    'MAX_2D': np.inf,
+    'MAX_3D': np.inf,
+    'MAN_2D': 1,
+    'MAN_3D': 1,
+    'CEIL_2D': 2,
+    'ATT': 2,
+}
+
+#: Map of distance function types to the factor by which their norms exceed
+#: the distance before rounding (all others are 1)
+NORM_SCALES = {
+    'ATT': math.sqrt(10),
+}
@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+import collections
+import collections.abc
+
+import networkx
+import numpy as np
+
+from . import nodes as N
+
+
+__all__ = [
+    'ProblemGraph',
+    'ProblemDiGraph',
+    'create_graph_view',
+    'CSRGraph',
+]
+
+
+class _Nodes(collections.abc.Mapping):
+    # node attributes computed from the problem on demand
+    def __init__(self, view):
+        self.view = view
+
+    def __getitem__(self, name):
+        node = self.view._node_of(name)
+        problem = self.view.problem
+        return {
+            'coord': problem.node_coords.get(node),
+            'display': problem.display_data.get(node),
+            'demand': problem.demands.get(node),
+            'is_depot': node in self.view._depots,
+        }
+
+    def __iter__(self):
+        return iter(self.view._names)
+
+    def __len__(self):
+        return len(self.view._names)
+
+    def __contains__(self, name):
+        return name in self.view._index
+
+
+class _Adjacency(collections.abc.Mapping):
+    # maps each node to its neighbors, or to its predecessors when reversed
+    def __init__(self, view, reverse=False):
+        self.view = view
+        self.reverse = reverse
+
+    def __getitem__(self, name):
+        if name not in self.view._index:
+            raise KeyError(name)
+        return _Neighbors(self.view, name, self.reverse)
+
+    def __iter__(self):
+        return iter(self.view._names)
+
+    def __len__(self):
+        return len(self.view._names)
+
+    def __contains__(self, name):
+        return name in self.view._index
+
+
+class _Neighbors(collections.abc.Mapping):
+    # maps each neighbor of a node to the data of the edge that joins them
+    def __init__(self, view, name, reverse):
+        self.view = view
+        self.name = name
+        self.reverse = reverse
+
+    def _edge(self, other):
+        if self.reverse:
+            return other, self.name
+        return self.name, other
+
+    def __getitem__(self, other):
+        if other not in self.view._index or \
+                not self.view._is_edge(*self._edge(other)):
+            raise KeyError(other)
+        return self.view._edge_data(*self._edge(other))
+
+    def __iter__(self):
+        return iter(self.view._neighbors_of(self.name, self.reverse))
+
+    def __len__(self):
+        return len(self.view._neighbors_of(self.name, self.reverse))
+
+    def __contains__(self, other):
+        return other in self.view._index and \
+            self.view._is_edge(*self._edge(other))
+
+    def items(self):
+        return _NeighborItems(self)
+
+
+class _NeighborItems(collections.abc.ItemsView):
+    # weighs all of the edges of a node together
+    def __iter__(self):
+        neighbors = self._mapping
+        view = neighbors.view
+        others = view._neighbors_of(neighbors.name, neighbors.reverse)
+        weights = view._weights_of(neighbors.name, others, neighbors.reverse)
+        for other, weight in zip(others, weights):
+            yield other, view._make_edge_data(*neighbors._edge(other), weight)
+
+
+class _GraphView:
+    # state and behavior shared by the graph view classes, named so as not
+    # to clash with the networkx graph interface
+    _directed = False
+
+    #: Number of rows of weights cached by the view
+    row_cache_size = 16
+
+    def _setup(self, problem, normalize):
+        self.problem = problem
+        self._nodes = problem.node_index.tolist()
+        if normalize:
+            self._index = N.NodeIndex(range(len(self._nodes)))
+        else:
+            self._index = problem.node_index
+        self._names = self._index.tolist()
+        self._depots = set(problem.depots)
+        self._rows = collections.OrderedDict()
+        self._weigher = problem._get_edge_weigher()
+        names = dict(zip(self._nodes, self._names))
+
+        # sparse problems list their edges
+        self._succ_names = self._pred_names = None
+        if problem.edge_data_format in ('EDGE_LIST', 'ADJ_LIST'):
+            self._succ_names = collections.defaultdict(dict)
+            self._pred_names = collections.defaultdict(dict)
+            for a, b in problem.get_edges():
+                self._add_edge_names(names[a], names[b])
+
+        self._fixed = set()
+        for a, b in problem.fixed_edges:
+            if a in names and b in names:
+                self._fixed.add((names[a], names[b]))
+                if not self._directed:
+                    self._fixed.add((names[b], names[a]))
+
+        self.graph.update({
+            'name': problem.name,
+            'comment': problem.comment,
+            'type': problem.type,
+            'dimension': problem.dimension,
+            'capacity': problem.capacity,
+        })
+
+    def _add_edge_names(self, u, v):
+        for a, b in [(u, v)] if self._directed else [(u, v), (v, u)]:
+            self._succ_names[a][b] = None
+            self._pred_names[b][a] = None
+
+    def _node_of(self, name):
+        return self._nodes[self._index.position(name)]
+
+    def _is_edge(self, u, v):
+        if self._succ_names is None:
+            return True
+        return v in self._succ_names.get(u, ())
+
+    def _neighbors_of(self, name, reverse=False):
+        if self._succ_names is None:
+            return self._names
+        names = self._pred_names if reverse else self._succ_names
+        return list(names.get(name, ()))
+
+    def _make_edge_data(self, u, v, weight):
+        return {'weight': weight, 'is_fixed': (u, v) in self._fixed}
+
+    def _edge_data(self, u, v):
+        weight = self.problem.get_weight(self._node_of(u), self._node_of(v))
+        return self._make_edge_data(u, v, weight)
+
+    def _weights_of(self, name, others, reverse=False):
+        # weights of the edges between a node and others
+        if self._succ_names is None:
+            return self._row(name, reverse)
+        get_weight = self.problem.get_weight
+        node = self._node_of(name)
+        others = [self._node_of(other) for other in others]
+        if reverse:
+            return [get_weight(other, node) for other in others]
+        return [get_weight(node, other) for other in others]
+
+    def _row(self, name, reverse):
+        # weights of the edges between a node and every node
+        key = (name, reverse)
+        if key in self._rows:
+            self._rows.move_to_end(key)
+            return self._rows[key]
+
+        position = self._index.position(name)
+        if self._weigher is not None:
+            fixed = np.full(len(self._names), position)
+            others = np.arange(len(self._names))
+            pair = (others, fixed) if reverse else (fixed, others)
+            row = self._weigher(*pair).tolist()
+        else:
+            get_weight = self.problem.get_weight
+            node = self._nodes[position]
+            if reverse:
+                row = [get_weight(other, node) for other in self._nodes]
+            else:
+                row = [get_weight(node, other) for other in self._nodes]
+
+        self._rows[key] = row
+        if len(self._rows) > self.row_cache_size:
+            self._rows.popitem(last=False)
+        return row
+
+
+class ProblemGraph(_GraphView, networkx.Graph):
+    """Read-only undirected graph view of a problem.
+
+    The view implements the networkx graph interface without storing any
+    edges. Nodes and edges and their data are computed from the problem as
+    they are accessed, using the same attributes as
+    :meth:`~tsplib95.models.StandardProblem.get_graph`. The weights of all
+    edges of a node are computed together, and the most recently used rows of
+    weights are cached. Memory use grows with the number of nodes rather than
+    the number of edges.
+
+    Since the data is computed on demand, changes to node or edge attribute
+    dictionaries are not kept. Adding or removing nodes or edges raises
+    :class:`networkx.NetworkXError`.
+
+    :param problem: problem to view
+    :type problem: :class:`~tsplib95.models.StandardProblem`
+    :param bool normalize: rename nodes to be zero-indexed
+    """
+
+    def __init__(self, problem=None, normalize=False):
+        # networkx creates empty graphs of the same class for copies
+        super().__init__()
+        if problem is None:
+            return
+        self._setup(problem, normalize)
+        self._node = _Nodes(self)
+        self._adj = _Adjacency(self)
+        networkx.freeze(self)
+
+
+class ProblemDiGraph(_GraphView, networkx.DiGraph):
+    """Read-only directed graph view of a problem.
+
+    This is the directed counterpart of :class:`ProblemGraph`.
+
+    :param problem: problem to view
+    :type problem: :class:`~tsplib95.models.StandardProblem`
+    :param bool normalize: rename nodes to be zero-indexed
+    """
+
+    _directed = True
+
+    def __init__(self, problem=None, normalize=False):
+        super().__init__()
+        if problem is None:
+            return
+        self._setup(problem, normalize)
+        self._node = _Nodes(self)
+        self._adj = self._succ = _Adjacency(self)
+        self._pred = _Adjacency(self, reverse=True)
+        networkx.freeze(self)
+
+
+def create_graph_view(problem, normalize=False):
+    """Return a read-only networkx graph view of a problem.
+
+    Symmetric problems get a :class:`ProblemGraph` and all others get a
+    :class:`ProblemDiGraph`.
+
+    :param problem: problem to view
+    :type problem: :class:`~tsplib95.models.StandardProblem`
+    :param bool normalize: rename nodes to be zero-indexed
+    :return: graph view
+    :rtype: :class:`networkx.Graph`
+    """
+    cls = ProblemGraph if problem.is_symmetric() else ProblemDiGraph
+    return cls(problem, normalize=normalize)
+
+
+class CSRGraph(collections.namedtuple('CSRGraph',
+                                      'indptr indices weights nodes')):
+    """Adjacency of a problem in compressed sparse row (CSR) form.
+
+    Nodes are numbered by their position in ``nodes``, as with
+    ``get_graph(normalize=True)``. The neighbors of node *i* are
+    ``indices[indptr[i]:indptr[i + 1]]`` in increasing order, and the
+    weights of the edges to them are the same slice of ``weights``.
+    """
+
+    __slots__ = ()
+
+    @property
+    def num_nodes(self):
+        """Number of nodes."""
+        return len(self.nodes)
+
+    def neighbors(self, i):
+        """Return the neighbors of the node at position *i*.
+
+        :param int i: node position
+        :return: neighbor positions and edge weights
+        :rtype: tuple
+        """
+        start, end = self.indptr[i], self.indptr[i + 1]
+        return self.indices[start:end], self.weights[start:end]
+
+    def to_scipy(self):
+        """Return the adjacency as a SciPy sparse matrix.
+
+        :return: sparse matrix
+        :rtype: :class:`scipy.sparse.csr_matrix`
+        :raises ImportError: if SciPy is not installed
+        """
+        try:
+            from scipy import sparse
+        except ImportError:
+            error = 'SciPy is required for sparse matrices'
+            raise ImportError(error) from None
+        n = self.num_nodes
+        return sparse.csr_matrix((self.weights, self.indices, self.indptr),
+                                 shape=(n, n))
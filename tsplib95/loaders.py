@@ -2,44 +2,76 @@
 from deprecated.sphinx import deprecated
 
 from . import models
+from . import parallel
 
 
-def load(filepath, problem_class=None, special=None):
+def load(filepath, problem_class=None, special=None, validate=False):
     """Load a problem at the given filepath.
 
     :param str filepath: path to a TSPLIB problem file
     :param type problem_class: special/custom problem class
     :param callable special: special/custom distance function
+    :param bool validate: whether to validate the problem
     :return: problem instance
     :rtype: :class:`~Problem`
     """
     with open(filepath) as f:
-        return read(f, special=special, problem_class=problem_class)
+        return read(f, special=special, problem_class=problem_class,
+                    validate=validate)
 
 
-def read(f, problem_class=None, special=None):
+def read(f, problem_class=None, special=None, validate=False):
     """Read a problem from a file-like object.
 
     :param file f: file-like object
     :param type problem_class: special/custom problem class
     :param callable special: special/custom distance function
+    :param bool validate: whether to validate the problem
     :return: problem instance
     :rtype: :class:`~Problem`
     """
-    return parse(f.read(), special=special, problem_class=problem_class)
+    return parse(f.read(), special=special, problem_class=problem_class,
+                 validate=validate)
 
 
-def parse(text, problem_class=None, special=None):
+def parse(text, problem_class=None, special=None, validate=False):
     """Load a problem from raw text.
 
+    If ``validate`` is true, the problem is validated before it is returned
+    (see :meth:`~tsplib95.models.Problem.validate`).
+
     :param str text: text of a TSPLIB problem
     :param type problem_class: special/custom problem class
     :param callable special: special/custom distance function
+    :param bool validate: whether to validate the problem
     :return: problem instance
     :rtype: :class:`~Problem`
+    :raises ValidationError: if validation fails
     """
     Problem = problem_class or models.StandardProblem
-    return Problem.parse(text, special=special)
+    problem = Problem.parse(text, special=special)
+    if validate:
+        problem.validate()
+    return problem
+
+
+def score_tours(problem_path, tour_paths, workers=None, problem_class=None,
+                special=None):
+    """Load a problem and return the weights of the tours in many files.
+
+    The tour files are loaded and traced by a pool of worker processes (see
+    :func:`~tsplib95.parallel.score_tours`).
+
+    :param str problem_path: path to a TSPLIB problem file
+    :param list tour_paths: paths to TSPLIB tour files
+    :param int workers: number of workers (defaults to the number of CPUs)
+    :param type problem_class: special/custom problem class
+    :param callable special: special/custom distance function
+    :return: the weights of the tours in each file
+    :rtype: list
+    """
+    problem = load(problem_path, problem_class=problem_class, special=special)
+    return parallel.score_tours(problem, tour_paths, workers=workers)
 
 
 ###############################################################################
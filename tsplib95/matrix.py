@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+import numpy as np
+
 from . import utils
 
 
@@ -55,6 +57,32 @@ class Matrix:
         """
         raise NotImplementedError()
 
+    def to_array(self, dtype=None):
+        """Return the whole matrix as a square array.
+
+        Element (i,j) of the array is the element at row ``i + min_index`` and
+        column ``j + min_index`` of the matrix.
+
+        :param dtype: data type of the array
+        :return: square array
+        :rtype: :class:`numpy.ndarray`
+        """
+        i, j = np.indices((self.size, self.size))
+        numbers = np.asarray(self.numbers, dtype=dtype)
+        return numbers[self.get_array_index(i, j)]
+
+    def get_array_index(self, i, j):
+        """Return the linear indices for arrays of rows and columns.
+
+        This is the array counterpart of :func:`get_index`.
+
+        :param i: array of rows
+        :param j: array of columns
+        :return: array of linear indices
+        :rtype: :class:`numpy.ndarray`
+        """
+        return self.get_index(i, j)
+
 
 class FullMatrix(Matrix):
     """A complete square matrix.
@@ -85,6 +113,24 @@ class HalfMatrix(Matrix):
         i, j = self._fix_indices(i, j)
         return super().value_at(i, j)
 
+    def to_array(self, dtype=None):
+        if not self.numbers:
+            # only possible when the matrix is nothing but a diagonal
+            return np.zeros((self.size, self.size), dtype=dtype or int)
+        array = super().to_array(dtype=dtype)
+        if not self.has_diagonal:
+            np.fill_diagonal(array, 0)
+        return array
+
+    def get_array_index(self, i, j):
+        diagonal = i == j
+        i, j = self._fix_array_indices(i, j)
+        index = self._get_array_index(i, j)
+        if not self.has_diagonal:
+            # there is no element for the diagonal
+            index[diagonal] = 0
+        return index
+
 
 class UpperDiagRow(HalfMatrix):
     """Upper-triangular matrix that includes the diagonal.
@@ -102,10 +148,20 @@ class UpperDiagRow(HalfMatrix):
             j -= 1
         return i, j
 
+    def _fix_array_indices(self, i, j):
+        i, j = np.minimum(i, j), np.maximum(i, j)
+        if not self.has_diagonal:
+            j = j - 1
+        return i, j
+
     def get_index(self, i, j):
         n = self.size - int(not self.has_diagonal)
         return utils.integer_sum(n, n - i) + (j - i)
 
+    def _get_array_index(self, i, j):
+        n = self.size - int(not self.has_diagonal)
+        return n * (n + 1) // 2 - (n - i) * (n - i + 1) // 2 + (j - i)
+
 
 class LowerDiagRow(HalfMatrix):
     """Lower-triangular matrix that includes the diagonal.
@@ -123,9 +179,18 @@ class LowerDiagRow(HalfMatrix):
             i -= 1
         return i, j
 
+    def _fix_array_indices(self, i, j):
+        i, j = np.maximum(i, j), np.minimum(i, j)
+        if not self.has_diagonal:
+            i = i - 1
+        return i, j
+
     def get_index(self, i, j):
         return utils.integer_sum(i) + j
 
+    def _get_array_index(self, i, j):
+        return i * (i + 1) // 2 + j
+
 
 class UpperRow(UpperDiagRow):
     """Upper-triangular matrix that does not include the diagonal.
@@ -165,6 +230,57 @@ class LowerDiagCol(UpperDiagRow):
     pass
 
 
+class MatrixView(Matrix):
+    """A square matrix made of some of the rows and columns of another.
+
+    Row (and column) *i* of the view is row (and column) ``keys[i -
+    min_index]`` of the other matrix. The elements are not copied; the view
+    looks them up in the other matrix.
+
+    :param matrix: the other matrix
+    :type matrix: :class:`Matrix`
+    :param list keys: rows of the other matrix, in order
+    :param int min_index: the minimum index
+    """
+
+    def __init__(self, matrix, keys, min_index=0):
+        self.matrix = matrix
+        self.keys = [int(key) for key in keys]
+        self.numbers = matrix.numbers
+        self.size = len(self.keys)
+        self.min_index = min_index
+
+    def value_at(self, i, j):
+        i -= self.min_index
+        j -= self.min_index
+        if not self.is_valid_row_column(i, j):
+            raise IndexError(f'({i}, {j}) is out of bonuds')
+        return self.matrix.value_at(self.keys[i], self.keys[j])
+
+    @property
+    def has_diagonal(self):
+        """True if the other matrix has elements for its diagonal."""
+        return getattr(self.matrix, 'has_diagonal', True)
+
+    def get_array_index(self, i, j):
+        keys = np.array(self.keys, dtype=np.int64) - self.matrix.min_index
+        return self.matrix.get_array_index(keys[i], keys[j])
+
+    def to_array(self, dtype=None):
+        if not self.numbers:
+            return np.zeros((self.size, self.size), dtype=dtype or int)
+        # gather only the elements of the view rather than converting all of
+        # the numbers of the other matrix
+        i, j = np.indices((self.size, self.size))
+        numbers = self.numbers
+        index = self.get_array_index(i, j).ravel().tolist()
+        array = np.array([numbers[k] for k in index], dtype=dtype)
+        array = array.reshape(self.size, self.size)
+        if not self.has_diagonal:
+            np.fill_diagonal(array, 0)
+        return array
+
+
 TYPES = {
     'FULL_MATRIX': FullMatrix,
     'UPPER_DIAG_ROW': UpperDiagRow,
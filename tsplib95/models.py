@@ -1,12 +1,23 @@
 # -*- coding: utf-8 -*-
+import collections
+import collections.abc
 import itertools
 import re
 
 import networkx
+import numpy as np
 
+from . import cache
+from . import exceptions
 from . import fields as F
+from . import graphs
 from . import matrix
+from . import moves
+from . import nodes as N
 from . import distances
+from . import parallel
+from . import shared
+from . import spatial
 from . import utils
 
 
@@ -67,9 +78,295 @@ class FileMeta(type):
             # set the final value on the new class
             setattr(new_class, key, data)
 
+        # fields defined here provide their defaults through descriptors,
+        # while values that have been set are found in the instance __dict__
+        for name, field in current['fields_by_name'].items():
+            setattr(new_class, name, _FieldDescriptor(name, field))
+
+        # each class gets a compact record type with a slot for each field
+        new_class.Record = type(f'{class_name}Record', (ProblemRecord,), {
+            '__slots__': tuple(new_class.fields_by_name),
+            '__module__': new_class.__module__,
+            '__qualname__': f'{new_class.__qualname__}.Record',
+            'problem_class': new_class,
+        })
+
         return new_class
 
 
+class _FieldDescriptor:
+    # provides the default value of a field until a value is set, at which
+    # point the value is found in the instance __dict__ instead; defaults
+    # that are modified in place become the value on the next access
+    def __init__(self, name, field):
+        self.name = name
+        self.field = field
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            # fields are not class attributes
+            raise AttributeError(self.name)
+
+        # return a single default object
+        name = self.name
+        defaults = instance._defaults
+        default = self.field.get_default_value()
+        if name in defaults and defaults[name] != default:
+            # if the default has been altered, set it as the value
+            setattr(instance, name, defaults[name])
+        else:
+            # we don't have a default yet, save this one
+            defaults[name] = default
+        return defaults[name]
+
+
+# field values packed into arrays: numbers, rows of numbers, or either one
+# keyed by integers
+_Packed = collections.namedtuple('_Packed', 'keys values offsets')
+
+
+def _pack_numbers(numbers):
+    # return the numbers as an array if they are all ints or all floats,
+    # using the smallest integer type that holds them
+    kinds = set(map(type, numbers))
+    if kinds == {float}:
+        return np.fromiter(numbers, dtype=np.float64, count=len(numbers))
+    if kinds != {int}:
+        return None
+    try:
+        array = np.fromiter(numbers, dtype=np.int64, count=len(numbers))
+    except OverflowError:
+        return None
+    return array.astype(np.result_type(np.min_scalar_type(array.min()),
+                                       np.min_scalar_type(array.max())))
+
+
+def _pack(value):
+    # pack a field value into arrays, or return None if that would change it
+    keys = None
+    if isinstance(value, collections.abc.Mapping):
+        keys = _pack_numbers(list(value))
+        if keys is None or keys.dtype.kind not in 'iu':
+            return None
+        items = list(value.values())
+    elif isinstance(value, collections.abc.Sequence) and \
+            not isinstance(value, (str, tuple)):
+        items = list(value)
+    else:
+        return None
+
+    if items and all(type(item) is list for item in items):
+        offsets = np.zeros(len(items) + 1, dtype=np.int64)
+        np.cumsum([len(item) for item in items], out=offsets[1:])
+        values = _pack_numbers(list(itertools.chain.from_iterable(items)))
+    else:
+        offsets = None
+        values = _pack_numbers(items)
+    if values is None:
+        return None
+    return _Packed(keys, values, offsets)
+
+
+def _unpack(packed):
+    # restore a field value packed by _pack
+    items = packed.values.tolist()
+    if packed.offsets is not None:
+        offsets = packed.offsets.tolist()
+        items = [items[a:b] for a, b in zip(offsets, offsets[1:])]
+    if packed.keys is None:
+        return items
+    return dict(zip(packed.keys.tolist(), items))
+
+
+class _MatrixRows(collections.abc.Sequence):
+    # rows of numbers of a matrix, from the diagonal on if upper, computed
+    # as they are needed
+    def __init__(self, matrix, upper=False):
+        self.matrix = matrix
+        self.upper = upper
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self[r] for r in range(len(self))[row]]
+        if not 0 <= row < len(self):
+            raise IndexError(row)
+        m = self.matrix.min_index
+        first = row if self.upper else 0
+        return [self.matrix[row + m, column + m]
+                for column in range(first, self.matrix.size)]
+
+    def __len__(self):
+        return self.matrix.size
+
+
+class ProblemRecord:
+    """Compact, read-only record of the field values of a problem.
+
+    Each problem class has its own record type, available as its ``Record``
+    attribute, that stores the value of each field in a slot. Records have
+    no instance ``__dict__`` and none of the caches of a problem, so they
+    take far less memory. They are meant for keeping many problems, or just
+    their headers, in memory at once.
+
+    Fields are accessed by name just like on a problem, and fields without a
+    value return their default value. Values cannot be set or deleted, though
+    mutable values can still be changed in place.
+
+    Create records with :meth:`Problem.to_record` and turn them back into
+    problems with :meth:`to_problem`.
+
+    :param data: name-value data
+    :raises TypeError: if a name is not the name of a field
+    """
+
+    __slots__ = ()
+
+    #: Problem class of the record
+    problem_class = None
+
+    def __init__(self, **data):
+        fields = self.problem_class.fields_by_name
+        for name, value in data.items():
+            if name not in fields:
+                raise TypeError(f'unknown field: {repr(name)}')
+            object.__setattr__(self, name, value)
+
+    def __getattr__(self, name):
+        # only called for unset slots and unknown attributes
+        try:
+            field = self.problem_class.fields_by_name[name]
+        except KeyError:
+            raise AttributeError(name) from None
+        return field.get_default_value()
+
+    def __setattr__(self, name, value):
+        raise AttributeError('records are read-only')
+
+    def __delattr__(self, name):
+        raise AttributeError('records are read-only')
+
+    def __getstate__(self):
+        return self.as_name_dict()
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.as_name_dict() == other.as_name_dict()
+
+    __hash__ = None
+
+    def __repr__(self):
+        values = ', '.join(f'{name}={repr(value)}'
+                           for name, value in self.as_name_dict().items())
+        return f'{self.__class__.__qualname__}({values})'
+
+    def as_dict(self, by_keyword=False):
+        """Return the values that have been set as a dictionary.
+
+        :param bool by_keyword: use keywords (True) or names (False) or keys
+        :return: problem data
+        :rtype: dict
+        """
+        data = {}
+        for name, field in self.problem_class.fields_by_name.items():
+            try:
+                value = object.__getattribute__(self, name)
+            except AttributeError:
+                continue
+            data[field.keyword if by_keyword else name] = value
+        return data
+
+    def as_name_dict(self):
+        """Return the values that have been set by field name.
+
+        :return: problem data
+        :rtype: dict
+        """
+        return self.as_dict(by_keyword=False)
+
+    def as_keyword_dict(self):
+        """Return the values that have been set by field keyword.
+
+        :return: problem data
+        :rtype: dict
+        """
+        return self.as_dict(by_keyword=True)
+
+    def to_problem(self, **options):
+        """Return a problem with the values of the record.
+
+        Any keyword options are passed to the problem class constructor.
+
+        :param options: any keyword arguments to pass to the constructor
+        :return: problem instance
+        :rtype: :class:`Problem`
+        """
+        return self.problem_class(**self.as_name_dict(), **options)
+
+    def render(self):
+        """Render the record as problem text.
+
+        :return: problem text
+        :rtype: str
+        """
+        return self.to_problem().render()
+
+
+class _MatrixWeigher:
+    # weighs arrays of edges given as node positions using a full matrix
+    def __init__(self, matrix):
+        self.matrix = matrix
+
+    def __call__(self, a, b):
+        return self.matrix[a, b]
+
+
+class _CondensedWeigher:
+    # weighs arrays of edges using the upper triangle of a symmetric matrix
+    def __init__(self, matrix, n):
+        self.matrix = matrix
+        self.n = n
+
+    def __call__(self, a, b):
+        a, b = np.minimum(a, b), np.maximum(a, b)
+        return self.matrix[a * self.n - a * (a - 1) // 2 + b - a]
+
+
+class _ExplicitWeigher:
+    # weighs arrays of edges by looking them up in the numbers of an explicit
+    # matrix, given the row of the matrix for each node position
+    def __init__(self, explicit, rows):
+        self.explicit = explicit
+        self.rows = rows
+        self.numbers = np.asarray(explicit.numbers)
+        self.has_diagonal = getattr(explicit, 'has_diagonal', True)
+
+    def __call__(self, a, b):
+        a, b = np.broadcast_arrays(a, b)
+        i, j = self.rows[a.ravel()], self.rows[b.ravel()]
+        if not len(self.numbers):
+            # only possible when the matrix is nothing but a diagonal
+            return np.zeros(a.shape, dtype=np.int64)
+        weights = self.numbers[self.explicit.get_array_index(i, j)]
+        if not self.has_diagonal:
+            weights[i == j] = 0
+        return weights.reshape(a.shape)
+
+
+class _CoordinateWeigher:
+    # weighs arrays of edges using an array distance function
+    def __init__(self, coords, func):
+        self.coords = coords
+        self.func = func
+
+    def __call__(self, a, b):
+        return self.func(self.coords[a], self.coords[b])
+
+
 class Problem(metaclass=FileMeta):
     """Base class for all problems.
 
@@ -78,10 +375,10 @@ class Problem(metaclass=FileMeta):
 
     def __init__(self, **data):
         super().__init__()
+        self._defaults = {}
         # every keyword argument becomes an attribute
         for name, value in data.items():
             setattr(self, name, value)
-        self._defaults = {}
 
     @classmethod
     def parse(cls, text, **options):
@@ -154,34 +451,55 @@ class Problem(metaclass=FileMeta):
     def __str__(self):
         return self.render()
 
-    def __getattribute__(self, name):
-        # check for a value like normal
-        try:
-            attrs = object.__getattribute__(self, '__dict__')
-            return attrs[name]
-        except KeyError:
-            pass
+    def __getstate__(self):
+        # field values made of numbers are packed into arrays, which pickle
+        # as compact buffers (out-of-band with protocol 5)
+        state = {}
+        for name, value in self.as_name_dict().items():
+            packed = _pack(value)
+            state[name] = value if packed is None else packed
+        # along with any other public attributes
+        for name, value in self.__dict__.items():
+            if not name.startswith('_') and name not in state:
+                state[name] = value
+        return state
+
+    def __setstate__(self, state):
+        # derived state is rebuilt the same way as for a new problem
+        data = {}
+        for name, value in state.items():
+            data[name] = _unpack(value) if isinstance(value, _Packed) else \
+                value
+        self.__init__(**data)
 
-        # value missing, so try to return the default
-        # for the correpsonding field
-        try:
-            cls = object.__getattribute__(self, '__class__')
-            field = cls.fields_by_name[name]
-        except KeyError:
-            pass
-        else:
-            # return a single default object
-            default = field.get_default_value()
-            if name in self._defaults and self._defaults[name] != default:
-                # if the default has been altered, set it as the value
-                setattr(self, name, self._defaults[name])
-            else:
-                # we don't have a default yet, save this one
-                self._defaults[name] = default
-            return self._defaults[name]
+    def derive(self, **changes):
+        """Return a new problem with some of the values changed.
 
-        # not a field, so punt to the super implementation
-        return super().__getattribute__(name)
+        The new problem is of the same class and has the same field values
+        and public attributes, except for those given as keyword arguments.
+        Unchanged values are shared with this problem rather than copied, so
+        neither problem should modify them in place.
+
+        :param changes: new values by name
+        :return: problem instance
+        :rtype: :class:`Problem`
+        """
+        data = self.as_name_dict()
+        for name, value in self.__dict__.items():
+            if not name.startswith('_') and name not in data:
+                data[name] = value
+        data.update(changes)
+        return self.__class__(**data)
+
+    def to_record(self):
+        """Return a compact, read-only record of the field values.
+
+        See :class:`ProblemRecord`.
+
+        :return: record of the problem
+        :rtype: :class:`ProblemRecord`
+        """
+        return self.Record(**self.as_name_dict())
 
     def as_dict(self, by_keyword=False):
         """Return the problem data as a dictionary.
@@ -241,7 +559,18 @@ class Problem(metaclass=FileMeta):
         fp.write(self.render())
 
     def validate(self):
-        pass
+        """Validate the problem data.
+
+        Each field validates its own value.
+
+        :raises ValidationError: if any value fails validation
+        """
+        for name, value in self.as_name_dict().items():
+            field = self.__class__.fields_by_name[name]
+            try:
+                field.validate(value)
+            except exceptions.ValidationError as e:
+                raise e.amend(name)
 
 
 class StandardProblem(Problem):
@@ -299,11 +628,201 @@ class StandardProblem(Problem):
 
     tours = F.ToursField('TOUR_SECTION')
 
+    #: Default memory budget (in bytes) for :meth:`get_distance_matrix`
+    max_matrix_bytes = 2 ** 25
+
+    #: Whether the first weight requested builds the distance matrix
+    auto_distance_matrix = False
+
+    #: Number of weights computed at once when building the distance matrix
+    matrix_block_size = 2 ** 20
+
+    # fields that determine the edge weights
+    _weight_fields = {
+        'node_coords',
+        'edge_weights',
+        'edge_weight_type',
+        'edge_weight_format',
+        'dimension',
+    }
+
+    # fields that refer to individual nodes
+    _node_data_fields = {
+        'node_coords',
+        'display_data',
+        'demands',
+        'depots',
+        'fixed_edges',
+        'edge_data',
+        'edge_weights',
+        'tours',
+    }
+
+    # fields that determine the nodes
+    _node_fields = {
+        'node_coords',
+        'display_data',
+        'edge_data',
+        'edge_data_format',
+        'demands',
+        'dimension',
+    }
+
     def __init__(self, special=None, **data):
         super().__init__(**data)
+        self._node_index = None
         self._wfunc = None
+        self._base_wfunc = None
+        self._distance_matrix = None
+        self._weight_cache = None
+        self._geo_radians = None
+        self._coordinate_array = None
+        self._edge_weigher = None
+        self._explicit_matrix = None
+        self._spatial_indexes = {}
+        self._shared = None
         self.special = special
 
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if '_base_wfunc' not in self.__dict__:
+            return
+        # cached nodes and weights are stale once their data changes
+        if name in self._node_fields:
+            self._node_index = None
+        if name in self._weight_fields:
+            self._reset_wfunc()
+        elif name == 'display_data':
+            self._spatial_indexes.pop(name, None)
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state['special'] = self.special
+        return state
+
+    def derive(self, **changes):
+        """Return a new problem with some of the values changed.
+
+        Besides sharing the unchanged values (see :meth:`Problem.derive`),
+        the new problem shares whatever this problem has computed from them
+        and that the changes leave intact: the node index, the explicit
+        matrix, the distance matrix, and the spatial indexes. Anything else
+        is computed again when needed. For example, variants of a problem
+        with other fixed edges or depots share its weights entirely::
+
+            >>> variant = problem.derive(fixed_edges=[(1, 2)])
+
+        The special function can be changed too.
+
+        :param changes: new values by name
+        :return: problem instance
+        :rtype: :class:`StandardProblem`
+        """
+        changes.setdefault('special', self.special)
+        problem = super().derive(**changes)
+        problem._shared = self._shared
+
+        same_nodes = self._node_fields.isdisjoint(changes)
+        same_weights = same_nodes and \
+            self._weight_fields.isdisjoint(changes) and \
+            changes['special'] is self.special
+        if same_nodes:
+            problem._node_index = self._node_index
+        if same_weights:
+            problem._explicit_matrix = self._explicit_matrix
+            problem._geo_radians = self._geo_radians
+            problem._coordinate_array = self._coordinate_array
+            if self._distance_matrix is not None:
+                problem._use_distance_matrix(*self._distance_matrix)
+        for source, index in self._spatial_indexes.items():
+            # indexes of node coordinates depend on the weights as well
+            if same_weights or (source == 'display_data' and
+                                source not in changes):
+                problem._spatial_indexes[source] = index
+        return problem
+
+    def subproblem(self, nodes):
+        """Return the problem restricted to some of its nodes.
+
+        The nodes of the new problem are numbered consecutively from the
+        first node of this problem, in the order given. Its ``node_map``
+        attribute maps each of its nodes back to the node of this problem,
+        which converts its tours into tours of this problem::
+
+            >>> sub = problem.subproblem([12, 3, 7])
+            >>> [sub.node_map[n] for n in tour]
+
+        Node coordinates, display data, and demands are copied for the given
+        nodes only, and the depots, fixed edges, and edge data are limited to
+        them. Tours are dropped. For explicit problems, the weights are a
+        :class:`~tsplib95.matrix.MatrixView` of the weights of this problem,
+        listed in full (or upper triangular) rows that are only computed as
+        they are needed. A cached distance matrix is used to fill in the
+        distance matrix of the new problem.
+
+        :param list nodes: nodes to keep
+        :return: problem instance
+        :rtype: :class:`StandardProblem`
+        :raises KeyError: if a node is not in the problem
+        :raises ValueError: if a node is given more than once
+        """
+        index = self.node_index
+        nodes = [int(n) for n in nodes]
+        positions = index.positions(np.array(nodes, dtype=np.int64))
+        if len(set(nodes)) != len(nodes):
+            raise ValueError('each node can only be given once')
+        first = int(index.nodes[0]) if len(index) else 0
+        labels = dict(zip(nodes, range(first, first + len(nodes))))
+
+        data = {name: value for name, value in self.as_name_dict().items()
+                if name not in self._node_data_fields}
+        data['dimension'] = len(nodes)
+        for name in ('node_coords', 'display_data', 'demands'):
+            values = getattr(self, name)
+            if values:
+                data[name] = {labels[n]: values[n] for n in nodes
+                              if n in values}
+        if self.depots:
+            data['depots'] = [labels[n] for n in self.depots if n in labels]
+        if self.fixed_edges:
+            data['fixed_edges'] = [[labels[a], labels[b]]
+                                   for a, b in self.fixed_edges
+                                   if a in labels and b in labels]
+        if self.edge_data_format == 'ADJ_LIST':
+            data['edge_data'] = {
+                labels[a]: [labels[b] for b in ends if b in labels]
+                for a, ends in self.edge_data.items() if a in labels
+            }
+        elif self.edge_data_format == 'EDGE_LIST':
+            data['edge_data'] = [[labels[a], labels[b]]
+                                 for a, b in self._get_edge_array().tolist()
+                                 if a in labels and b in labels]
+
+        view = None
+        if self.is_explicit():
+            view = matrix.MatrixView(self._get_explicit_matrix(), nodes,
+                                     min_index=first)
+            upper = self.is_symmetric()
+            data['edge_weight_format'] = 'UPPER_DIAG_ROW' if upper else \
+                'FULL_MATRIX'
+            data['edge_weights'] = _MatrixRows(view, upper=upper)
+
+        node_map = {label: node for node, label in labels.items()}
+        problem = self.__class__(special=self.special, node_map=node_map,
+                                 **data)
+        problem._shared = self._shared
+        if view is not None:
+            problem._explicit_matrix = view
+        if self._distance_matrix is not None:
+            weights, condensed = self._distance_matrix
+            if condensed:
+                weigher = _CondensedWeigher(weights, len(index))
+            else:
+                weigher = _MatrixWeigher(weights)
+            weights = weigher(positions[:, None], positions[None, :])
+            problem._use_distance_matrix(np.ascontiguousarray(weights), False)
+        return problem
+
     @property
     def special(self):
         """Special distance function.
@@ -315,8 +834,42 @@ class StandardProblem(Problem):
 
     @special.setter
     def special(self, func):
+        if func is None and self.is_special():
+            raise Exception('missing needed special weight function')
         self._special = func
-        self._wfunc = self._create_wfunc(special=func)
+        self._reset_wfunc()
+
+    @property
+    def weight_cache(self):
+        """Weight cache used by :meth:`get_weight` (None if disabled)."""
+        return self._weight_cache
+
+    def enable_weight_cache(self, capacity=2 ** 20, policy='lru'):
+        """Cache the weights computed by :meth:`get_weight`.
+
+        This is intended for problems too large for
+        :meth:`get_distance_matrix` that use a costly distance or special
+        function. At most ``capacity`` weights are kept and the ``policy``
+        decides which weight to evict when the cache is full. See
+        :class:`~tsplib95.cache.WeightCache` for the available policies.
+
+        Problems with explicit or no edge weights are not cached, and a cached
+        distance matrix always takes precedence over the weight cache.
+
+        :param int capacity: maximum number of weights to cache
+        :param str policy: eviction policy
+        :return: weight cache
+        :rtype: :class:`~tsplib95.cache.WeightCache`
+        """
+        self._weight_cache = cache.WeightCache(None, capacity=capacity,
+                                               policy=policy)
+        self._reset_wfunc()
+        return self._weight_cache
+
+    def disable_weight_cache(self):
+        """Stop caching the weights computed by :meth:`get_weight`."""
+        self._weight_cache = None
+        self._reset_wfunc()
 
     def get_weight(self, start, end):
         """Return the weight of the edge between start and end.
@@ -324,6 +877,12 @@ class StandardProblem(Problem):
         This method provides a single way to obtain edge weights regardless of
         whether the problem uses an explicit matrix or a distance function.
 
+        Weights are computed one at a time unless a distance matrix is cached
+        (see :meth:`get_distance_matrix`). When :attr:`auto_distance_matrix`
+        is set, the first weight requested from a problem with an array
+        distance function builds the distance matrix, provided it fits in
+        :attr:`max_matrix_bytes`.
+
         :param int start: starting node index
         :param int end: ending node index
         :return: weight of the edge between start and end
@@ -331,6 +890,437 @@ class StandardProblem(Problem):
         """
         return self._wfunc(start, end)
 
+    def get_weights(self, starts, ends):
+        """Return the weights of many edges at once.
+
+        The starting and ending nodes are given as arrays that broadcast
+        together. Whenever the problem has explicit weights, a distance matrix
+        (see :meth:`get_distance_matrix`), or an array distance function, the
+        weights are looked up or computed together. The results are the same
+        as those of :meth:`get_weight` either way.
+
+        :param starts: array of starting node indices
+        :param ends: array of ending node indices
+        :return: weight of each edge
+        :rtype: :class:`numpy.ndarray`
+        """
+        starts, ends = np.broadcast_arrays(starts, ends)
+        weigher = self._get_edge_weigher() if starts.size else None
+        if weigher is None:
+            weights = [self.get_weight(i, j)
+                       for i, j in zip(starts.flat, ends.flat)]
+            return np.array(weights).reshape(starts.shape)
+        index = self.node_index
+        return weigher(index.positions(starts), index.positions(ends))
+
+    def get_distance_matrix(self, dtype=None, max_bytes=None,
+                            condensed=False, workers=1):
+        """Return the weights of all edges as a matrix.
+
+        The matrix is computed once and cached on the problem. Rows and columns
+        follow the order of :meth:`get_nodes` rather than the node indices
+        themselves. While the matrix is cached, :meth:`get_weight` looks
+        weights up in it instead of computing them.
+
+        Problems that use one of the :data:`~tsplib95.distances.ARRAY_TYPES`
+        (or a special function with an array counterpart) are computed in
+        vectorized blocks, optionally spread over several threads; all others
+        are filled in using :meth:`get_weight`. For symmetric problems, a
+        ``condensed`` matrix
+        contains only the upper triangle (including the diagonal) row by row,
+        which takes about half the memory.
+
+        If the matrix would take more than ``max_bytes`` the problem declines
+        to build it and ``None`` is returned instead. Weights are then
+        computed on the fly as usual.
+
+        :param dtype: data type of the matrix (defaults to the type of the
+                      weights)
+        :param int max_bytes: memory budget in bytes (defaults to
+                              :attr:`max_matrix_bytes`)
+        :param bool condensed: return the condensed upper triangle
+        :param int workers: number of threads used to compute the matrix
+        :return: weight matrix or None if over budget
+        :rtype: :class:`numpy.ndarray`
+        :raises ValueError: if ``condensed`` and the problem is not symmetric
+        """
+        if condensed and not self.is_symmetric():
+            raise ValueError('only symmetric problems can be condensed')
+
+        cached = self._distance_matrix
+        if cached is not None:
+            matrix, is_condensed = cached
+            if is_condensed == condensed and dtype in (None, matrix.dtype):
+                return matrix
+
+        if max_bytes is None:
+            max_bytes = self.max_matrix_bytes
+
+        nodes = self.node_index.tolist()
+        n = len(nodes)
+        size = n * (n + 1) // 2 if condensed else n * n
+        itemsize = np.dtype(dtype or np.int64).itemsize
+        if size * itemsize > max_bytes:
+            return None
+
+        if self.is_explicit():
+            matrix = self._build_matrix_from_explicit(nodes, dtype, condensed)
+        elif self._get_array_wfunc() is None:
+            matrix = self._build_matrix_from_weights(nodes, dtype, condensed)
+        else:
+            matrix = self._build_matrix_from_coords(nodes, dtype, condensed,
+                                                    workers)
+        self._use_distance_matrix(matrix, condensed)
+        return matrix
+
+    def _use_distance_matrix(self, matrix, condensed):
+        # cache the matrix and look weights up in it from now on
+        matrix.flags.writeable = False
+        self._distance_matrix = matrix, condensed
+        self._edge_weigher = None
+        self._wfunc = self._create_matrix_wfunc(self.node_index, matrix,
+                                                condensed)
+
+    def share(self, max_bytes=None):
+        """Put the arrays of the problem in shared memory.
+
+        The node coordinates, edge weights, and tours are copied into shared
+        memory segments, along with the distance matrix if it is cached or
+        fits in ``max_bytes`` (see :meth:`get_distance_matrix`). The other
+        fields and the special function travel with the returned handle, so
+        the special function must be picklable to send the handle to other
+        processes.
+
+        Other processes call :meth:`attach` (or
+        :meth:`~tsplib95.shared.SharedProblem.attach`) on the handle to get a
+        problem that uses the shared arrays without copying them::
+
+            def work(handle):
+                problem = tsplib95.models.StandardProblem.attach(handle)
+                ...
+
+            with problem.share() as handle:
+                pool.map(work, [handle] * n)
+
+        :param int max_bytes: memory budget in bytes for the distance matrix
+        :return: handle to the shared problem
+        :rtype: :class:`~tsplib95.shared.SharedProblem`
+        """
+        arrays = {'node_coords', 'edge_weights', 'tours'}
+        fields = {name: value for name, value in self.as_name_dict().items()
+                  if name not in arrays}
+        handle = shared.SharedProblem(self.__class__, fields,
+                                      special=self.special)
+        try:
+            nodes = self.node_index.tolist()
+        except ValueError:
+            nodes = None
+        else:
+            handle.put('nodes', self.node_index.nodes)
+
+        if self.node_coords:
+            try:
+                coords = np.array([self.node_coords[n] for n in nodes])
+            except ValueError:
+                # coordinates of different dimensions cannot be shared
+                fields['node_coords'] = self.node_coords
+            else:
+                handle.put('node_coords', coords)
+        if self.edge_weights:
+            handle.put_rows('edge_weights', self.edge_weights)
+        if self.tours:
+            handle.put_rows('tours', self.tours)
+
+        if self._distance_matrix is None and nodes is not None and \
+                self.is_weighted():
+            self.get_distance_matrix(max_bytes=max_bytes)
+        if self._distance_matrix is not None:
+            matrix, handle.condensed = self._distance_matrix
+            handle.put('matrix', matrix)
+        return handle
+
+    @classmethod
+    def attach(cls, handle):
+        """Create a problem from a handle to a shared problem.
+
+        See :meth:`share`.
+
+        :param handle: handle to a shared problem
+        :type handle: :class:`~tsplib95.shared.SharedProblem`
+        :return: problem instance
+        :rtype: :class:`StandardProblem`
+        """
+        return handle.attach()
+
+    def get_array_metric(self):
+        """Return the node coordinates as an array and their distance function.
+
+        The coordinates follow the order of :meth:`get_nodes` and the
+        distance function is an array distance function that accepts them,
+        such as those in :data:`~tsplib95.distances.ARRAY_TYPES`. GEO
+        coordinates are returned already converted to radians.
+
+        :return: coordinates and array distance function
+        :rtype: tuple
+        :raises ValueError: if the problem has no array distance function
+        """
+        if self._get_array_wfunc() is None:
+            raise ValueError('problem has no array distance function')
+        return self._get_node_coordinates()
+
+    def _get_array_wfunc(self):
+        # return the array distance function, if any, for the problem
+        if self.is_explicit() or not self.node_coords:
+            return None
+        if self.is_special():
+            return getattr(self.special, 'array', None)
+        return distances.ARRAY_TYPES.get(self.edge_weight_type)
+
+    def _get_coordinate_array(self, nodes):
+        # return the coordinates of the nodes as an array along with the
+        # array distance function that accepts them
+        coords = np.array([self.node_coords[n] for n in nodes], dtype=float)
+        if self.edge_weight_type == 'GEO':
+            # convert to radians just once rather than once per distance
+            coords = distances.geo_radians(coords)
+            return coords, distances.geographical_radians_array
+        return coords, self._get_array_wfunc()
+
+    def _get_node_coordinates(self):
+        # coordinates of the nodes in node order, built once since they are
+        # needed for every array of weights computed from them
+        if self._coordinate_array is None:
+            nodes = self.node_index.tolist()
+            coords, afunc = self._get_coordinate_array(nodes)
+            coords.flags.writeable = False
+            self._coordinate_array = coords, afunc
+        return self._coordinate_array
+
+    def _get_geo_radians(self):
+        # map of node to latitude and longitude in radians
+        if self._geo_radians is None:
+            nodes = list(self.node_coords)
+            radians, __ = self._get_coordinate_array(nodes)
+            self._geo_radians = dict(zip(nodes, radians.tolist()))
+        return self._geo_radians
+
+    def _build_matrix_from_coords(self, nodes, dtype, condensed, workers):
+        coords, afunc = self._get_node_coordinates()
+        n = len(nodes)
+        rows = max(1, self.matrix_block_size // max(n, 1))
+
+        if not condensed:
+            return parallel.pairwise_weights(coords, afunc, dtype=dtype,
+                                             rows=rows, workers=workers,
+                                             threads=True)
+
+        matrix = np.empty(0, dtype=dtype or np.int64)
+        offset = 0
+        for start in range(0, n, rows):
+            block = afunc(coords[start:start + rows, None], coords[None, :])
+            if start == 0:
+                # the weights keep the type computed by the distance function
+                size = n * (n + 1) // 2
+                matrix = np.empty(size, dtype=dtype or block.dtype)
+            for r, row in enumerate(block, start):
+                matrix[offset:offset + n - r] = row[r:]
+                offset += n - r
+        return matrix
+
+    def _build_matrix_from_explicit(self, nodes, dtype, condensed):
+        explicit = self._get_explicit_matrix()
+        rows = np.array(nodes) - explicit.min_index
+        if not np.array_equal(rows, np.arange(explicit.size)):
+            # the nodes do not line up with the rows of the matrix
+            return self._build_matrix_from_weights(nodes, dtype, condensed)
+
+        array = explicit.to_array(dtype=dtype)
+        if condensed:
+            return array[np.triu_indices(len(nodes))]
+        return array
+
+    def _build_matrix_from_weights(self, nodes, dtype, condensed):
+        wfunc = self._build_wfunc()
+        if condensed:
+            weights = [wfunc(a, b) for i, a in enumerate(nodes)
+                       for b in nodes[i:]]
+        else:
+            weights = [[wfunc(a, b) for b in nodes] for a in nodes]
+        return np.array(weights, dtype=dtype)
+
+    @staticmethod
+    def _create_matrix_wfunc(index, matrix, condensed):
+        position = index.position
+
+        if not condensed:
+            def lookup(start, end):
+                return matrix[position(start), position(end)].item()
+            return lookup
+
+        n = len(index)
+
+        def lookup_condensed(start, end):
+            i, j = position(start), position(end)
+            if i > j:
+                i, j = j, i
+            return matrix[i * n - i * (i - 1) // 2 + j - i].item()
+
+        return lookup_condensed
+
+    def _reset_wfunc(self):
+        # the weight function is created again when it is next needed
+        self._base_wfunc = None
+        self._explicit_matrix = None
+        self._clear_caches()
+
+    def _build_wfunc(self):
+        # create the weight function now and return it, unless it has been
+        # replaced by another
+        if self._base_wfunc is None:
+            self._base_wfunc = self._create_wfunc(special=self._special)
+            if self._wfunc == self._lazy_wfunc:
+                self._wfunc = self._base_wfunc
+        return self._wfunc
+
+    def _lazy_wfunc(self, start, end):
+        # stands in for the weight function until the first weight
+        return self._build_wfunc()(start, end)
+
+    def _clear_caches(self):
+        self._distance_matrix = None
+        self._geo_radians = None
+        self._coordinate_array = None
+        self._edge_weigher = None
+        self._spatial_indexes.pop('node_coords', None)
+        self._wfunc = self._base_wfunc or self._lazy_wfunc
+        if self._weight_cache is not None:
+            self._weight_cache.clear()
+
+    def get_neighbors(self, k, direction='out'):
+        """Return the *k* nearest neighbors of every node.
+
+        Row *i* of the results holds the neighbors of the *i*-th node of
+        :meth:`get_nodes` along with their weights, ordered by increasing
+        weight. Nodes are never their own neighbors, and if there are fewer
+        than *k* other nodes then all of them are returned.
+
+        Problems whose distance function measures a norm of the coordinates
+        (see :data:`~tsplib95.distances.NORMS`) place the nodes in a
+        :class:`~tsplib95.spatial.GridIndex`, which avoids computing the
+        weight of every pair of nodes. All other problems select the *k*
+        smallest weights of each row of the distance matrix (see
+        :meth:`get_distance_matrix`), which for explicit problems is taken
+        directly from the edge weights.
+
+        For asymmetric problems, ``direction='in'`` selects the *k* cheapest
+        edges entering each node (the columns of the matrix) instead of the
+        *k* cheapest edges leaving it (the rows).
+
+        :param int k: number of neighbors
+        :param str direction: either "out" or "in"
+        :return: neighbors and weights, each an array of shape (n, k)
+        :rtype: tuple
+        :raises ValueError: if the distance matrix exceeds its memory budget
+        """
+        if direction not in ('out', 'in'):
+            raise ValueError(f'unknown direction: {repr(direction)}')
+
+        nodes = self.node_index.nodes
+        norm = distances.NORMS.get(self.edge_weight_type)
+        if norm is None or self._get_array_wfunc() is None:
+            matrix = self.get_distance_matrix()
+            if matrix is None:
+                raise ValueError('distance matrix exceeds its memory budget')
+            if direction == 'in':
+                matrix = matrix.T
+            positions, weights = self._select_neighbors(matrix, k)
+            return nodes[positions], weights
+
+        index = self.get_spatial_index('node_coords')
+        positions, dists = index.grid.neighbors(k, norm=norm)
+
+        # order by the rounded weights, breaking ties by true distance
+        coords, afunc = index.coords, index.metric
+        weights = afunc(coords[:, None], coords[positions])
+        order = np.lexsort((dists, weights), axis=-1)
+        positions = np.take_along_axis(positions, order, 1)
+        weights = np.take_along_axis(weights, order, 1)
+        return nodes[positions], weights
+
+    def get_spatial_index(self, source=None):
+        """Return a spatial index of the nodes.
+
+        The index is built from either the node coordinates or the display
+        data, as given by ``source``. By default the node coordinates are used
+        if the problem has any and the display data otherwise. Indexes of
+        node coordinates use the weights of the problem; indexes of display
+        data use plain Euclidean distances. Query points are given in the
+        same units as the coordinates, even for GEO problems.
+
+        Each index is built once and cached on the problem until the
+        coordinates it was built from are reassigned.
+
+        :param str source: either "node_coords" or "display_data"
+        :return: spatial index
+        :rtype: :class:`~tsplib95.spatial.SpatialIndex`
+        :raises ValueError: if the source has no coordinates
+        """
+        if source is None:
+            source = 'node_coords' if self.node_coords else 'display_data'
+        if source not in ('node_coords', 'display_data'):
+            raise ValueError(f'unknown coordinate source: {repr(source)}')
+
+        index = self._spatial_indexes.get(source)
+        if index is not None:
+            return index
+
+        coords = getattr(self, source)
+        if not coords:
+            raise ValueError(f'problem has no {source}')
+
+        nodes = sorted(coords)
+        metric = self._get_array_wfunc() if source == 'node_coords' else None
+        if metric is None:
+            array = np.array([coords[n] for n in nodes], dtype=float)
+            index = spatial.SpatialIndex(nodes, array)
+        else:
+            array, metric = self._get_node_coordinates()
+            typ = self.edge_weight_type
+            norm = None if self.is_special() else distances.NORMS.get(typ)
+            scale = distances.NORM_SCALES.get(typ, 1.0)
+            # GEO coordinates are indexed in radians
+            transform = distances.geo_radians if typ == 'GEO' else None
+            index = spatial.SpatialIndex(nodes, array, metric=metric,
+                                         norm=norm, scale=scale,
+                                         transform=transform)
+
+        self._spatial_indexes[source] = index
+        return index
+
+    def _select_neighbors(self, matrix, k):
+        # k smallest weights of each row, excluding the diagonal
+        n = len(matrix)
+        k = max(0, min(k, n - 1))
+        positions = np.empty((n, k), dtype=np.int64)
+        weights = np.empty((n, k), dtype=matrix.dtype)
+        if k == 0:
+            return positions, weights
+
+        rows = max(1, self.matrix_block_size // n)
+        for start in range(0, n, rows):
+            block = matrix[start:start + rows].astype(float)
+            index = np.arange(len(block))
+            block[index, index + start] = np.inf
+            part = np.argpartition(block, k - 1, axis=1)[:, :k]
+            part.sort(axis=1)
+            values = np.take_along_axis(block, part, 1)
+            order = np.argsort(values, axis=1, kind='stable')
+            part = np.take_along_axis(part, order, 1)
+            positions[start:start + rows] = part
+            weights[start:start + rows] = np.take_along_axis(
+                matrix[start:start + rows], part, 1)
+        return positions, weights
+
     def is_explicit(self):
         """Check whether the problem specifies edge weights explicitly.
 
@@ -419,17 +1409,156 @@ class StandardProblem(Problem):
 
             weights = p.trace_tours(tours)
 
+        Tours can also be given as arrays, including a single 2-D array with
+        one tour per row. Whenever the problem has explicit weights, a distance
+        matrix (see :meth:`get_distance_matrix`), or an array distance
+        function, the weights of all tours of the same length are computed
+        together using vectorized lookups. The results are the same either
+        way.
+
         :param list tours: one or more lists of node indices
         :return: one weight for each given tour
         :rtype: list
         """
-        solutions = []
-        for tour in tours:
-            edges = utils.pairwise(tour)
-            weight = sum(self.get_weight(i, j) for i, j in edges)
-            solutions.append(weight)
+        tours = [utils.sized(tour) for tour in tours]
+        tracer = self.get_tour_tracer()
+        if tracer is None:
+            solutions = []
+            for tour in tours:
+                edges = utils.pairwise(tour)
+                weight = sum(self.get_weight(i, j) for i, j in edges)
+                solutions.append(weight)
+            return solutions
+
+        # trace tours of the same length together
+        by_length = {}
+        for i, tour in enumerate(tours):
+            by_length.setdefault(len(tour), []).append(i)
+
+        solutions = [0] * len(tours)
+        for length, indexes in by_length.items():
+            if not length:
+                continue
+            rows = max(1, self.matrix_block_size // length)
+            for start in range(0, len(indexes), rows):
+                chunk = indexes[start:start + rows]
+                array = np.array([tours[i] for i in chunk])
+                for i, weight in zip(chunk, tracer.trace(array)):
+                    solutions[i] = weight
         return solutions
 
+    def trace_tours_parallel(self, tours, workers=None, chunk_size=None,
+                             mp_context=None):
+        """Return the weights of the given tours using worker processes.
+
+        This is the parallel counterpart of :meth:`trace_tours` and returns
+        the same results. See :func:`~tsplib95.parallel.trace_tours` for
+        details.
+
+        :param list tours: one or more lists of node indices
+        :param int workers: number of workers (defaults to the number of CPUs)
+        :param int chunk_size: number of tours sent to a worker at once
+        :param mp_context: multiprocessing context used to start the workers
+        :return: one weight for each given tour
+        :rtype: list
+        """
+        return parallel.trace_tours(self, tours, workers=workers,
+                                    chunk_size=chunk_size,
+                                    mp_context=mp_context)
+
+    def get_move_evaluator(self, tour):
+        """Return an object that evaluates moves on the given tour.
+
+        The evaluator computes the change in cost of 2-opt, Or-opt, swap, and
+        insertion moves in constant time each, and keeps its state up to date
+        as moves are applied. Use it instead of :meth:`move_delta` to
+        evaluate many moves on the same tour.
+
+        :param tour: list or array of node indices
+        :return: move evaluator for the tour
+        :rtype: :class:`~tsplib95.moves.MoveEvaluator`
+        """
+        return moves.MoveEvaluator(self, tour)
+
+    def move_delta(self, tour, move):
+        """Return the change in the weight of a tour caused by a move.
+
+        Moves refer to the positions of nodes within the tour::
+
+            delta = p.move_delta(tour, moves.TwoOpt(3, 10))
+
+        :param tour: list or array of node indices
+        :param move: one of the moves in :mod:`tsplib95.moves`
+        :return: change in weight
+        """
+        return self.get_move_evaluator(tour).delta(move)
+
+    def move_deltas(self, tour, move):
+        """Return the changes in the weight of a tour caused by many moves.
+
+        The fields of the move are arrays, one element per move::
+
+            i, j = np.triu_indices(len(tour), 1)
+            deltas = p.move_deltas(tour, moves.TwoOpt(i, j))
+
+        :param tour: list or array of node indices
+        :param move: one of the moves in :mod:`tsplib95.moves`
+        :return: change in weight for each move
+        :rtype: :class:`numpy.ndarray`
+        """
+        return self.get_move_evaluator(tour).deltas(move)
+
+    def get_tour_tracer(self):
+        """Return an object that computes the weights of arrays of tours.
+
+        The tracer holds the weight data it needs and can be sent to other
+        processes. Problems without explicit weights, a distance matrix (see
+        :meth:`get_distance_matrix`), or an array distance function have no
+        tracer.
+
+        :return: tour tracer or None
+        :rtype: :class:`~tsplib95.parallel.TourTracer`
+        """
+        weigher = self._get_edge_weigher()
+        if weigher is None:
+            return None
+        return parallel.TourTracer(self.node_index, weigher)
+
+    def _get_edge_weigher(self):
+        # return a function that computes the weights of arrays of edges
+        # given as node positions, or None if there is no such function
+        if self._edge_weigher is None:
+            self._edge_weigher = self._create_edge_weigher()
+        return self._edge_weigher
+
+    def _create_edge_weigher(self):
+        if self._distance_matrix is None and self.is_explicit() and \
+                self.auto_distance_matrix:
+            self.get_distance_matrix()
+
+        if self._distance_matrix is not None:
+            matrix, condensed = self._distance_matrix
+            if not condensed:
+                return _MatrixWeigher(matrix)
+            return _CondensedWeigher(matrix, len(self.node_index))
+
+        if self.is_explicit():
+            # look weights up in the explicit matrix rather than building and
+            # caching the distance matrix behind the caller's back
+            explicit = self._get_explicit_matrix()
+            nodes = self.node_index.nodes
+            if nodes.dtype.kind not in 'iu':
+                return None
+            rows = nodes.astype(np.int64) - explicit.min_index
+            if len(rows) and (rows.min() < 0 or rows.max() >= explicit.size):
+                return None
+            return _ExplicitWeigher(explicit, rows)
+
+        if self._get_array_wfunc() is not None:
+            return _CoordinateWeigher(*self._get_node_coordinates())
+
+        return None
+
     def trace_canonical_tour(self):
         """Return the weight of the canonical tour.
 
@@ -439,8 +1568,186 @@ class StandardProblem(Problem):
         :return: weight of the canonical tour
         :rtype: float
         """
-        nodes = list(self.get_nodes())
-        return self.trace_tours([nodes])[0]
+        return self.trace_tours([self.node_index.nodes])[0]
+
+    def validate(self):
+        """Validate the problem data.
+
+        Besides validating the value of each field, this validates any tours
+        using :meth:`validate_tours`. Tour files (of type ``TOUR``) only give
+        a dimension, so their tours must visit nodes 1 through DIMENSION.
+
+        :raises ValidationError: if any value fails validation
+        """
+        super().validate()
+        if not self.tours:
+            return
+        nodes = None
+        if self.type == 'TOUR':
+            if self.dimension:
+                nodes = range(1, self.dimension + 1)
+            else:
+                nodes = sorted(set().union(*self.tours))
+        self._validate_tours(self.tours, nodes=nodes)
+
+    def validate_tour(self, tour):
+        """Check that a tour is a valid solution to the problem.
+
+        A valid tour visits every node exactly once, uses every fixed edge
+        (see ``fixed_edges``), and for SOP problems, visits the nodes in an
+        order that respects the precedence constraints. A ``-1`` in row *i*
+        and column *j* of the weight matrix of an SOP problem means that node
+        *j* must precede node *i*.
+
+        The error describes the first violation found.
+
+        :param tour: list or array of node indices
+        :raises ValidationError: if the tour is not valid
+        """
+        self._validate_tours([tour], label=False)
+
+    def validate_tours(self, tours):
+        """Check that each tour is a valid solution to the problem.
+
+        This is the same as calling :meth:`validate_tour` on each tour, but
+        all tours of the same length are checked together using arrays.
+        The error names the first invalid tour by its index.
+
+        :param list tours: one or more lists of node indices
+        :raises ValidationError: if any tour is not valid
+        """
+        self._validate_tours(tours)
+
+    def _validate_tours(self, tours, nodes=None, label=True):
+        tours = [utils.sized(tour) for tour in tours]
+        if nodes is None:
+            nodes = self.node_index.nodes
+        else:
+            nodes = np.array(list(nodes))
+        fixed = self._get_fixed_edges(nodes)
+        precedences = self._get_precedences()
+
+        # tours of the wrong length are invalid, the rest are checked together
+        invalid = []
+        by_length = {}
+        for i, tour in enumerate(tours):
+            if len(tour) != len(nodes):
+                invalid.append(i)
+            else:
+                by_length.setdefault(len(tour), []).append(i)
+
+        for length, indexes in by_length.items():
+            rows = max(1, self.matrix_block_size // max(length, 1))
+            for start in range(0, len(indexes), rows):
+                chunk = indexes[start:start + rows]
+                array = np.array([tours[i] for i in chunk]).reshape(
+                    len(chunk), length)
+                bad = self._find_invalid_tours(array, nodes, fixed,
+                                               precedences)
+                invalid.extend(np.asarray(chunk)[bad].tolist())
+
+        if invalid:
+            index = min(invalid)
+            error = self._describe_invalid_tour(list(tours[index]), nodes,
+                                                fixed, precedences)
+            if label:
+                error = f'tour {index}: {error}'
+            raise exceptions.ValidationError(error)
+
+    def _get_fixed_edges(self, nodes):
+        # fixed edges as pairs of positions in nodes
+        if not self.fixed_edges:
+            return np.empty((0, 2), dtype=np.int64)
+        edges = np.array(self.fixed_edges).reshape(-1, 2)
+        positions = np.searchsorted(nodes, edges).clip(0, len(nodes) - 1)
+        if np.any(nodes[positions] != edges):
+            error = 'fixed edges refer to nodes not in the problem'
+            raise exceptions.ValidationError(error)
+        return positions
+
+    def _get_precedences(self):
+        # pairs of positions in get_nodes() such that the node at the second
+        # position must precede the node at the first
+        if self.type != 'SOP' or not self.is_explicit():
+            return np.empty((0, 2), dtype=np.int64)
+        cached = self._distance_matrix
+        if cached is not None and not cached[1]:
+            matrix = cached[0]
+        else:
+            matrix = self._get_explicit_matrix().to_array()
+        return np.argwhere(matrix == -1)
+
+    def _find_invalid_tours(self, tours, nodes, fixed, precedences):
+        # return a mask of the invalid rows in a 2-D array of tours, each of
+        # which has one element per node
+        count, n = tours.shape
+        positions = np.searchsorted(nodes, tours).clip(0, max(n - 1, 0))
+        bad = np.any(nodes[positions] != tours, axis=1)
+
+        # every node must be visited exactly once
+        rows = np.arange(count)[:, None]
+        visits = np.bincount((positions + rows * n).ravel(),
+                             minlength=count * n)
+        bad |= np.any(visits.reshape(count, n) != 1, axis=1)
+
+        # where each node is visited
+        order = np.zeros((count, n), dtype=np.int64)
+        order[rows, positions] = np.arange(n)
+
+        if len(fixed):
+            steps = order[:, fixed[:, 1]] - order[:, fixed[:, 0]]
+            used = steps % n == 1
+            if self.is_symmetric():
+                used |= -steps % n == 1
+            bad |= ~np.all(used, axis=1)
+
+        if len(precedences):
+            after, before = precedences[:, 0], precedences[:, 1]
+            bad |= np.any(order[:, before] > order[:, after], axis=1)
+
+        return bad
+
+    def _describe_invalid_tour(self, tour, nodes, fixed, precedences):
+        known = set(nodes.tolist())
+        visited = {}
+        for i, node in enumerate(tour):
+            if node not in known:
+                return f'node {node} at position {i} is not in the problem'
+            if node in visited:
+                return (f'node {node} appears more than once, at positions '
+                        f'{visited[node]} and {i}')
+            visited[node] = i
+
+        for node in nodes.tolist():
+            if node not in visited:
+                return f'node {node} is missing'
+
+        n = len(tour)
+        for a, b in nodes[fixed].tolist():
+            step = visited[b] - visited[a]
+            if step % n != 1 and (-step % n != 1 or not self.is_symmetric()):
+                return f'fixed edge ({a}, {b}) is not in the tour'
+
+        for after, before in nodes[precedences].tolist():
+            if visited[before] > visited[after]:
+                return f'node {before} must precede node {after}'
+
+        return 'tour is invalid'
+
+    @property
+    def node_index(self):
+        """Index of the nodes of the problem.
+
+        The index is built from the same data as :meth:`get_nodes` the first
+        time it is needed and kept until any of the fields that define the
+        nodes is assigned a new value. Changes made to the value of a field in
+        place are not noticed.
+
+        :raises ValueError: if the nodes are undefined
+        """
+        if self._node_index is None:
+            self._node_index = N.NodeIndex(self._find_nodes())
+        return self._node_index
 
     def get_nodes(self):
         """Return an iterator over the nodes.
@@ -448,56 +1755,60 @@ class StandardProblem(Problem):
         This method provides a single way to obtain the nodes of a problem
         regardless of how it is specified. However, if the nodes are not
         specified, the EDGE_DATA_FORMAT is not set, and DIMENSION has no value,
-        then nodes are undefined.
+        then nodes are undefined. The nodes come from :attr:`node_index`.
 
         :return: nodes
         :rtype: iter
         :raises ValueError: if the nodes are undefined
         """
+        return iter(self.node_index)
+
+    def _find_nodes(self):
+        # return the sorted nodes from whichever data defines them
         if self.node_coords:
-            return iter(sorted(self.node_coords))
+            return sorted(self.node_coords)
 
         if self.display_data:
-            return iter(sorted(self.display_data))
+            return sorted(self.display_data)
 
-        if self.edge_data_format == 'EDGE_LIST':
-            nodes = set()
-            for a, b in self.edge_data:
-                nodes.update({a, b})
-            return iter(sorted(nodes))
-
-        if self.edge_data_format == 'ADJ_LIST':
-            nodes = set()
-            for a, ends in self.edge_data.items():
-                nodes.update({a, *ends})
-            return iter(sorted(nodes))
+        if self.edge_data_format in ('EDGE_LIST', 'ADJ_LIST'):
+            nodes = np.unique(self._get_edge_array())
+            if self.edge_data_format == 'ADJ_LIST':
+                # nodes without any edges are listed too
+                starts = np.array(list(self.edge_data), dtype=np.int64)
+                nodes = np.union1d(nodes, starts)
+            return nodes.tolist()
 
         if self.demands:
-            return iter(sorted(self.demands))
+            return sorted(self.demands)
 
         try:
-            return iter(range(self.dimension))
+            return range(self.dimension)
         except Exception:
             raise ValueError('undefined nodes')
 
-    def get_edges(self):
+    def get_edges(self, unique=False, self_loops=True):
         """Return an iterator over the edges.
 
         This method provides a single way to obtain the edges of a problem
         regardless of how it is specified. If the EDGE_DATA_FORMAT is not set
         and the nodes are undefined, then the edges are also undefined.
 
+        For symmetric problems, ``unique=True`` yields each edge in only one
+        direction: for complete problems, from each node to itself and the
+        nodes after it, and otherwise in the first direction listed. Edges
+        from a node to itself are skipped with ``self_loops=False``. To
+        process the edges in blocks of arrays, see :meth:`get_edge_arrays`
+        and :meth:`get_weighted_edges`.
+
+        :param bool unique: for symmetric problems, only one direction
+        :param bool self_loops: include edges from a node to itself
         :return: edges
         :rtype: iter
         :raises ValueError: if the nodes and therefore the edges are undefined
         """
-        if self.edge_data_format == 'EDGE_LIST':
-            yield from self.edge_data
-        elif self.edge_data_format == 'ADJ_LIST':
-            for i, adj in self.edge_data.items():
-                yield from ((i, j) for j in adj)
-        else:
-            yield from itertools.product(self.get_nodes(), self.get_nodes())
+        for starts, ends in self.get_edge_arrays(unique, self_loops):
+            yield from zip(starts.tolist(), ends.tolist())
 
     def get_display(self, i):
         """Return the display data for node at index *i*.
@@ -516,7 +1827,7 @@ class StandardProblem(Problem):
             # TODO: raise an exception instead
             return None
 
-    def get_graph(self, normalize=False):
+    def get_graph(self, normalize=False, unique=True):
         """Return a networkx graph instance representing the problem.
 
         The metadata of the problem is associated with the graph itself.
@@ -544,12 +1855,22 @@ class StandardProblem(Problem):
         returned. Optionally, the nodes can be renamed to be sequential and
         zero-indexed.
 
+        The edges are added in blocks whose weights are computed together
+        (see :meth:`get_weights`). An undirected graph holds a single edge
+        between two nodes, so by default each undirected edge of a complete
+        problem is only added once. Pass ``unique=False`` to add both
+        orientations, in which case the weight of the second wins. Either
+        way, an undirected edge is fixed if it appears in ``fixed_edges`` in
+        either orientation.
+
         :param bool normalize: rename nodes to be zero-indexed
+        :param bool unique: add each undirected edge only once
         :return: graph
         :rtype: :class:`networkx.Graph`
         """
         # directed graphs are fundamentally different
-        G = networkx.Graph() if self.is_symmetric() else networkx.DiGraph()
+        symmetric = self.is_symmetric()
+        G = networkx.Graph() if symmetric else networkx.DiGraph()
 
         # add basic graph metadata
         G.graph['name'] = self.name
@@ -559,33 +1880,215 @@ class StandardProblem(Problem):
         G.graph['capacity'] = self.capacity
 
         # set up a map from original node name to new node name
-        nodes = list(self.get_nodes())
+        index = self.node_index
+        nodes = index.tolist()
         if normalize:
             names = {n: i for i, n in enumerate(nodes)}
         else:
             names = {n: n for n in nodes}
 
         # add every node with some associated metadata
-        for n in nodes:
-            is_depot = n in self.depots
-            G.add_node(names[n], coord=self.node_coords.get(n),
-                       display=self.display_data.get(n),
-                       demand=self.demands.get(n),
-                       is_depot=is_depot)
-
-        # add every edge with some associated metadata
-        for a, b in self.get_edges():
-            weight = self.get_weight(a, b)
-            is_fixed = (a, b) in self.fixed_edges
-            G.add_edge(names[a], names[b], weight=weight, is_fixed=is_fixed)
+        depots = set(self.depots)
+        G.add_nodes_from((names[n], {
+            'coord': self.node_coords.get(n),
+            'display': self.display_data.get(n),
+            'demand': self.demands.get(n),
+            'is_depot': n in depots,
+        }) for n in nodes)
+
+        # add every edge with some associated metadata, block by block
+        for starts, ends, weights in self.get_weighted_edges(unique=unique):
+            if normalize:
+                starts = index.positions(starts)
+                ends = index.positions(ends)
+            data = ({'weight': w, 'is_fixed': False}
+                    for w in weights.tolist())
+            G.add_edges_from(zip(starts.tolist(), ends.tolist(), data))
+
+        # mark the few fixed edges afterwards
+        for a, b in self.fixed_edges:
+            if a in names and b in names and G.has_edge(names[a], names[b]):
+                G.edges[names[a], names[b]]['is_fixed'] = True
 
         # return the graph object
         return G
 
+    def get_graph_view(self, normalize=False):
+        """Return a read-only networkx graph view of the problem.
+
+        Unlike :meth:`get_graph`, the view does not store the edges. Nodes,
+        edges, and their data are computed from the problem whenever they are
+        accessed, so memory use grows with the number of nodes rather than
+        the number of edges. This suits algorithms that only look at a
+        fraction of the edges of a large complete graph. See
+        :class:`~tsplib95.graphs.ProblemGraph` for details.
+
+        :param bool normalize: rename nodes to be zero-indexed
+        :return: graph view
+        :rtype: :class:`networkx.Graph`
+        """
+        return graphs.create_graph_view(self, normalize=normalize)
+
+    def to_csr(self, directed=None):
+        """Return the adjacency of the problem in compressed sparse row form.
+
+        Problems with EDGE_DATA are converted in one pass over their edges
+        without building any graph, which makes this well suited to large
+        sparse problems such as HCP instances. Complete problems include
+        every pair of nodes. Nodes are numbered by their position in
+        :meth:`get_nodes`, just like ``get_graph(normalize=True)``.
+
+        Unless ``directed`` is given, symmetric problems list every edge in
+        both directions, just like an undirected graph. An edge listed more
+        than once appears only once. Unweighted problems give every edge a
+        weight of 1.
+
+        Use :meth:`~tsplib95.graphs.CSRGraph.to_scipy` to convert the result
+        into a SciPy sparse matrix.
+
+        :param bool directed: list edges only in the given direction
+        :return: adjacency arrays and the nodes
+        :rtype: :class:`~tsplib95.graphs.CSRGraph`
+        """
+        if directed is None:
+            directed = not self.is_symmetric()
+        index = self.node_index
+        nodes = index.nodes
+        n = len(nodes)
+
+        if self.edge_data_format in ('EDGE_LIST', 'ADJ_LIST'):
+            edges = self._get_edge_array()
+            rows = index.positions(edges[:, 0])
+            cols = index.positions(edges[:, 1])
+        else:
+            rows, cols = np.divmod(np.arange(n * n), n)
+
+        weigher = self._get_edge_weigher()
+        if not self.is_weighted():
+            weights = np.ones(len(rows), dtype=np.int64)
+        elif weigher is not None:
+            weights = weigher(rows, cols)
+        else:
+            pairs = zip(nodes[rows].tolist(), nodes[cols].tolist())
+            weights = np.array([self.get_weight(a, b) for a, b in pairs])
+
+        if not directed:
+            loops = rows == cols
+            rows, cols = (np.concatenate([rows, cols[~loops]]),
+                          np.concatenate([cols, rows[~loops]]))
+            weights = np.concatenate([weights, weights[~loops]])
+
+        # sort by row then column, keeping the last of any repeated edges
+        order = np.lexsort((np.arange(len(rows)), cols, rows))
+        rows, cols, weights = rows[order], cols[order], weights[order]
+        last = np.ones(len(rows), dtype=bool)
+        last[:-1] = (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])
+        rows, cols, weights = rows[last], cols[last], weights[last]
+
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+        return graphs.CSRGraph(indptr, cols, weights, nodes)
+
+    def _get_edge_array(self):
+        # edges listed by the edge data as an array of pairs of nodes
+        if self.edge_data_format == 'ADJ_LIST':
+            starts = [[a] * len(ends) for a, ends in self.edge_data.items()]
+            ends = list(self.edge_data.values())
+            return np.stack([
+                np.fromiter(itertools.chain.from_iterable(starts), np.int64),
+                np.fromiter(itertools.chain.from_iterable(ends), np.int64),
+            ], axis=1)
+        if isinstance(self.edge_data, dict):
+            # an edge list that ends with a single -1, as in the TSPLIB HCP
+            # files, parses as one long adjacency list of the first node
+            nodes = itertools.chain.from_iterable(
+                [a, *ends] for a, ends in self.edge_data.items())
+            return np.fromiter(nodes, np.int64).reshape(-1, 2)
+        return np.array(self.edge_data, dtype=np.int64).reshape(-1, 2)
+
+    def get_edge_arrays(self, unique=False, self_loops=True, chunk_size=None):
+        """Return an iterator over blocks of edges as arrays.
+
+        Each block is a pair of arrays holding the starting and ending nodes
+        of its edges. Together, the blocks hold the same edges in the same
+        order as :meth:`get_edges` given the same options. Each block holds
+        about ``chunk_size`` edges, which defaults to
+        :attr:`matrix_block_size`.
+
+        :param bool unique: for symmetric problems, only one direction
+        :param bool self_loops: include edges from a node to itself
+        :param int chunk_size: number of edges per block
+        :return: blocks of starting and ending nodes
+        :rtype: iter
+        """
+        for starts, ends, __ in self._get_edge_blocks(unique, self_loops,
+                                                      chunk_size):
+            yield starts, ends
+
+    def get_weighted_edges(self, unique=False, self_loops=True,
+                           chunk_size=None):
+        """Return an iterator over blocks of edges and their weights.
+
+        This is like :meth:`get_edge_arrays`, except that each block also
+        includes an array of the weights of its edges, which are computed
+        together whenever possible (see :meth:`get_weights`)::
+
+            for starts, ends, weights in problem.get_weighted_edges():
+                ...
+
+        :param bool unique: for symmetric problems, only one direction
+        :param bool self_loops: include edges from a node to itself
+        :param int chunk_size: number of edges per block
+        :return: blocks of starting nodes, ending nodes, and weights
+        :rtype: iter
+        """
+        weigher = self._get_edge_weigher()
+        for starts, ends, positions in self._get_edge_blocks(
+                unique, self_loops, chunk_size):
+            if weigher is not None and positions is not None:
+                weights = weigher(*positions)
+            else:
+                weights = self.get_weights(starts, ends)
+            yield starts, ends, weights
+
+    def _get_edge_blocks(self, unique, self_loops, chunk_size):
+        # yield blocks of edges as arrays of starting and ending nodes, along
+        # with their positions in get_nodes() when they are known
+        size = chunk_size or self.matrix_block_size
+        unique = unique and self.is_symmetric()
+
+        if self.edge_data_format in ('EDGE_LIST', 'ADJ_LIST'):
+            edges = self._get_edge_array()
+            if not self_loops:
+                edges = edges[edges[:, 0] != edges[:, 1]]
+            if unique:
+                # keep the first direction listed for each edge
+                __, first = np.unique(np.sort(edges, axis=1), axis=0,
+                                      return_index=True)
+                edges = edges[np.sort(first)]
+            for first in range(0, len(edges), size):
+                starts, ends = edges[first:first + size].T
+                yield starts, ends, None
+            return
+
+        nodes = self.node_index.nodes
+        n = len(nodes)
+        rows = max(1, size // max(n, 1))
+        for first in range(0, n, rows):
+            a, b = np.meshgrid(np.arange(first, min(first + rows, n)),
+                               np.arange(n), indexing='ij')
+            if unique:
+                keep = b >= a if self_loops else b > a
+            else:
+                keep = True if self_loops else b != a
+            a, b = (a[keep], b[keep]) if keep is not True else \
+                (a.ravel(), b.ravel())
+            yield nodes[a], nodes[b], (a, b)
+
     def _create_wfunc(self, special=None):
         # explicit problems ignore the special function
         if self.is_explicit():
-            matrix = self._create_explicit_matrix()
+            matrix = self._get_explicit_matrix()
             return lambda i, j: matrix[i, j]
 
         if self.is_special():
@@ -602,14 +2105,49 @@ class StandardProblem(Problem):
 
         # Wrap whatever distance function we have so that it takes node
         # indexes instead of directly taking coordinates.
-        def adapter(i, j):
-            return wfunc(self.node_coords[i], self.node_coords[j])
-
-        return adapter
+        if wfunc is distances.geographical:
+            # GEO coordinates are converted to radians once per problem
+            def adapter(i, j):
+                radians = self._get_geo_radians()
+                return distances.geographical_radians(radians[i], radians[j])
+        else:
+            def adapter(i, j):
+                return wfunc(self.node_coords[i], self.node_coords[j])
+
+        if self._weight_cache is not None:
+            self._weight_cache.func = adapter
+            self._weight_cache.symmetric = self.is_symmetric()
+            return self._weight_cache
+
+        if self.edge_weight_type not in distances.ARRAY_TYPES and \
+                not hasattr(wfunc, 'array'):
+            return adapter
+
+        # If asked to, the first weight requested builds the distance matrix
+        # when it fits in the default budget; otherwise the adapter is used
+        # from then on.
+        def materialize(i, j):
+            self._wfunc = adapter
+            if self.auto_distance_matrix and self.node_coords:
+                self.get_distance_matrix()
+            return self._wfunc(i, j)
+
+        return materialize
+
+    def _get_explicit_matrix(self):
+        # the explicit matrix is created when it is first needed
+        if self._explicit_matrix is None:
+            self._explicit_matrix = self._create_explicit_matrix()
+        return self._explicit_matrix
 
     def _create_explicit_matrix(self):
         # instantiate the right matrix class for the problem
-        m = min(self.get_nodes())
+        m = min(self.node_index)
         Matrix = matrix.TYPES[self.edge_weight_format]
         weights = list(itertools.chain(*self.edge_weights))
-        return Matrix(weights, self.dimension, min_index=m)
+        n = self.dimension
+        if Matrix is matrix.FullMatrix and len(weights) == n * n + 1 and \
+                weights[0] == n:
+            # SOP files repeat the dimension at the start of the section
+            weights = weights[1:]
+        return Matrix(weights, n, min_index=m)
@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+import collections
+
+import numpy as np
+
+from . import tours
+
+
+__all__ = [
+    'TwoOpt',
+    'OrOpt',
+    'Swap',
+    'Insertion',
+    'MoveEvaluator',
+]
+
+
+class TwoOpt(collections.namedtuple('TwoOpt', 'i j')):
+    """Reverse the segment of a tour from position *i + 1* through *j*.
+
+    This replaces the edges leaving positions *i* and *j* with an edge from
+    position *i* to *j* and an edge from position *i + 1* to *j + 1*.
+    Requires ``0 <= i < j < n``.
+    """
+
+    __slots__ = ()
+
+
+class OrOpt(collections.namedtuple('OrOpt', 'i length j reverse')):
+    """Move a segment of a tour to after position *j*.
+
+    The segment starts at position *i* and contains *length* nodes. It must
+    not wrap around the end of the tour, and position *j* must lie outside
+    the segment and not immediately before it. If *reverse* is true, the
+    segment is also reversed.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, i, length, j, reverse=False):
+        return super().__new__(cls, i, length, j, reverse)
+
+
+class Swap(collections.namedtuple('Swap', 'i j')):
+    """Swap the nodes at positions *i* and *j* of a tour."""
+
+    __slots__ = ()
+
+
+class Insertion(collections.namedtuple('Insertion', 'i j')):
+    """Move the node at position *i* of a tour to after position *j*.
+
+    This is the same as an :class:`OrOpt` move of a single node.
+    """
+
+    __slots__ = ()
+
+
+def _require(condition, message):
+    if not np.all(condition):
+        raise ValueError(message)
+
+
+class MoveEvaluator:
+    """Computes the change in cost caused by moves on a tour.
+
+    Each move is evaluated in constant time by looking at the few edges it
+    replaces. For asymmetric problems, reversing a segment also changes the
+    direction of every edge within it. Its cost is found in constant time
+    using running sums of the weights along the tour in both directions,
+    which are computed once and updated as moves are applied.
+
+    Moves given to :meth:`deltas` may hold arrays of positions instead of
+    single positions, in which case the changes for all of them are computed
+    at once.
+
+    :param problem: problem that provides the weights
+    :type problem: :class:`~tsplib95.models.StandardProblem`
+    :param tour: list, array, or :class:`~tsplib95.tours.Tour` of nodes
+    """
+
+    def __init__(self, problem, tour):
+        self.problem = problem
+        self.tour = tour
+        self.symmetric = problem.is_symmetric()
+        self._cost = None
+        self._array = None
+        self._forward = None
+        self._backward = None
+
+    def __len__(self):
+        return len(self.tour)
+
+    @property
+    def cost(self):
+        """Cost of the tour, kept up to date as moves are applied."""
+        if self._cost is None:
+            self._cost = self.problem.trace_tours([self.tour])[0]
+        return self._cost
+
+    @property
+    def array(self):
+        """Array of the nodes of the tour."""
+        if self._array is None:
+            self._array = np.asarray(self.tour)
+        return self._array
+
+    def _sums(self):
+        # running sums of the weights along the tour in each direction,
+        # where element k is the sum of the first k edges
+        if self._forward is None:
+            nodes = self.array
+            weights = self.problem.get_weights
+            self._forward = self._running_sum(weights(nodes[:-1], nodes[1:]))
+            self._backward = self._running_sum(weights(nodes[1:], nodes[:-1]))
+        return self._forward, self._backward
+
+    @staticmethod
+    def _running_sum(weights):
+        sums = np.zeros(len(weights) + 1, dtype=np.result_type(weights, 0))
+        np.cumsum(weights, out=sums[1:])
+        return sums
+
+    def _reversal(self, first, last):
+        # change in cost of the edges within a reversed segment
+        if self.symmetric:
+            return 0
+        forward, backward = self._sums()
+        return (backward[last] - backward[first]) - \
+            (forward[last] - forward[first])
+
+    def delta(self, move):
+        """Return the change in cost caused by a single move.
+
+        :param move: a move
+        :return: change in cost
+        """
+        result = self._delta(move, lambda i: self.tour[i],
+                             self.problem.get_weight)
+        return result.item() if isinstance(result, np.generic) else result
+
+    def deltas(self, move):
+        """Return the changes in cost caused by a batch of moves.
+
+        The fields of the move are arrays of positions (or other values) that
+        broadcast together.
+
+        :param move: a move with array fields
+        :return: changes in cost
+        :rtype: :class:`numpy.ndarray`
+        """
+        move = type(move)(*(np.asarray(field) for field in move))
+        return np.asarray(self._delta(move, self.array.__getitem__,
+                                      self.problem.get_weights))
+
+    def _delta(self, move, node, weight):
+        n = len(self.tour)
+        if isinstance(move, TwoOpt):
+            i, j = move
+            _require((0 <= i) & (i < j) & (j < n), 'requires 0 <= i < j < n')
+            a, b, c, d = node(i), node(i + 1), node(j), node((j + 1) % n)
+            delta = weight(a, c) + weight(b, d) - weight(a, b) - weight(c, d)
+            return delta + self._reversal(i + 1, j)
+
+        if isinstance(move, Insertion):
+            move = OrOpt(move.i, 1, move.j)
+        if isinstance(move, OrOpt):
+            return self._or_opt(move, node, weight)
+
+        if isinstance(move, Swap):
+            return self._swap(move, node, weight)
+
+        raise TypeError(f'unknown move: {repr(move)}')
+
+    def _or_opt(self, move, node, weight):
+        n = len(self.tour)
+        i, length, j, reverse = move
+        e = i + length - 1
+        _require((length >= 1) & (i >= 0) & (e < n),
+                 'segment must lie within the tour')
+        outside = ((j - i) % n > length - 1) & ((j + 1 - i) % n != 0)
+        _require(outside & (0 <= j) & (j < n),
+                 'j must lie outside the segment and not just before it')
+
+        p, s0, s1, q = node((i - 1) % n), node(i), node(e), node((e + 1) % n)
+        x, y = node(j), node((j + 1) % n)
+        removed = weight(p, s0) + weight(s1, q) + weight(x, y)
+        kept = weight(p, q) + weight(x, s0) + weight(s1, y) - removed
+        if not np.any(reverse):
+            return kept
+        flipped = weight(p, q) + weight(x, s1) + weight(s0, y) - removed
+        flipped = flipped + self._reversal(i, e)
+        return np.where(reverse, flipped, kept) if np.ndim(reverse) else \
+            flipped
+
+    def _swap(self, move, node, weight):
+        n = len(self.tour)
+        i, j = move
+        _require((0 <= i) & (i < n) & (0 <= j) & (j < n) & (i != j),
+                 'requires distinct positions within the tour')
+
+        # adjacent swaps only replace three edges
+        backward = (i - j) % n == 1
+        i, j = np.where(backward, j, i), np.where(backward, i, j)
+        if not np.ndim(move.i) and not np.ndim(move.j):
+            i, j = i.item(), j.item()
+        adjacent = (j - i) % n == 1
+
+        a, b, c, d = node((i - 1) % n), node(i), node(j), node((j + 1) % n)
+        close = weight(a, c) + weight(c, b) + weight(b, d) - \
+            weight(a, b) - weight(b, c) - weight(c, d)
+        if np.all(adjacent):
+            return close
+
+        pj, nj, ni = node((j - 1) % n), d, node((i + 1) % n)
+        far = weight(a, c) + weight(c, ni) + weight(pj, b) + weight(b, nj) - \
+            weight(a, b) - weight(b, ni) - weight(pj, c) - weight(c, nj)
+        return np.where(adjacent, close, far) if np.ndim(adjacent) else far
+
+    def apply(self, move):
+        """Apply a single move to the tour and return its change in cost.
+
+        The tour is updated in place if it is a list, an array, or a
+        :class:`~tsplib95.tours.Tour`.
+
+        :param move: a move
+        :return: change in cost
+        """
+        delta = self.delta(move)
+        tour = list(self.tour)
+
+        if isinstance(move, TwoOpt):
+            i, j = move
+            tour[i + 1:j + 1] = tour[i + 1:j + 1][::-1]
+            first = i + 1
+        elif isinstance(move, Swap):
+            i, j = move
+            tour[i], tour[j] = tour[j], tour[i]
+            first = min(i, j)
+        else:
+            if isinstance(move, Insertion):
+                move = OrOpt(move.i, 1, move.j)
+            i, length, j, reverse = move
+            segment = tour[i:i + length]
+            if reverse:
+                segment.reverse()
+            rest = tour[:i] + tour[i + length:]
+            at = j + 1 if j < i else j + 1 - length
+            tour = rest[:at] + segment + rest[at:]
+            first = min(i, at)
+
+        self._update(tour, first, delta)
+        if self._cost is not None:
+            self._cost += delta
+        return delta
+
+    def _update(self, tour, first, delta):
+        if isinstance(self.tour, tours.Tour):
+            same = self.tour.problem is self.problem
+            self.tour._update(first, tour[first:], delta if same else None)
+        elif isinstance(self.tour, list):
+            self.tour[:] = tour
+        elif isinstance(self.tour, np.ndarray):
+            self.tour[:] = tour
+        else:
+            self.tour = tour
+        self._array = None
+
+        # only the running sums past the first changed position are stale
+        if self._forward is not None:
+            start = max(first - 1, 0)
+            nodes = self.array[start:]
+            weights = self.problem.get_weights
+            for sums, (a, b) in ((self._forward, (nodes[:-1], nodes[1:])),
+                                 (self._backward, (nodes[1:], nodes[:-1]))):
+                np.cumsum(weights(a, b), out=sums[start + 1:])
+                sums[start + 1:] += sums[start]
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+import numbers
+
+import numpy as np
+
+
+__all__ = [
+    'NodeIndex',
+]
+
+
+class NodeIndex:
+    """Immutable index of the nodes of a problem.
+
+    The index holds the nodes as a sorted array and maps each node to its
+    position within it in constant time. When the nodes are consecutive
+    integers, a position is simply the node less the first node. Otherwise
+    positions are looked up in a dictionary built the first time it is
+    needed, or found by binary search for arrays of nodes.
+
+    :param nodes: sorted, distinct nodes
+    """
+
+    def __init__(self, nodes):
+        if isinstance(nodes, range) and nodes.step == 1:
+            array = np.arange(nodes.start, nodes.stop, dtype=np.int64)
+        elif isinstance(nodes, np.ndarray):
+            array = nodes.view()
+        else:
+            array = np.array(list(nodes))
+        array.flags.writeable = False
+        self.nodes = array
+
+        # consecutive integers need no lookup table
+        self.offset = None
+        if array.dtype.kind in 'iu' and len(array):
+            first = int(array[0])
+            if int(array[-1]) - first == len(array) - 1:
+                self.offset = first
+        self._positions = None
+
+    @property
+    def contiguous(self):
+        """Whether the nodes are consecutive integers."""
+        return self.offset is not None or not len(self.nodes)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __iter__(self):
+        return iter(self.nodes.tolist())
+
+    def __contains__(self, node):
+        try:
+            self.position(node)
+        except (KeyError, TypeError):
+            return False
+        return True
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.nodes.tolist()})'
+
+    def tolist(self):
+        """Return the nodes as a list.
+
+        :return: sorted nodes
+        :rtype: list
+        """
+        return self.nodes.tolist()
+
+    def position(self, node):
+        """Return the position of a node.
+
+        :param node: node
+        :return: position of the node
+        :rtype: int
+        :raises KeyError: if the node is not in the index
+        """
+        if self.offset is not None:
+            if isinstance(node, numbers.Integral):
+                position = node - self.offset
+                if 0 <= position < len(self.nodes):
+                    return int(position)
+            raise KeyError(node)
+
+        if self._positions is None:
+            self._positions = {n: i for i, n in enumerate(self)}
+        return self._positions[node]
+
+    def positions(self, nodes):
+        """Return the positions of an array of nodes.
+
+        :param nodes: array of nodes of any shape
+        :return: position of each node
+        :rtype: :class:`numpy.ndarray`
+        :raises KeyError: if any node is not in the index
+        """
+        nodes = np.asarray(nodes)
+        if self.offset is not None and nodes.dtype.kind in 'iu':
+            positions = nodes.astype(np.int64) - self.offset
+            invalid = (positions < 0) | (positions >= len(self.nodes))
+        else:
+            # single nodes give a scalar, which cannot be assigned to
+            positions = np.asarray(np.searchsorted(self.nodes, nodes))
+            positions[positions == len(self.nodes)] = 0
+            invalid = self.nodes[positions] != nodes if len(self.nodes) \
+                else np.ones(nodes.shape, dtype=bool)
+        if np.any(invalid):
+            raise KeyError(nodes[invalid].flat[0].item())
+        return positions
@@ -0,0 +1,371 @@
+# -*- coding: utf-8 -*-
+import concurrent.futures
+import math
+import os
+import tempfile
+
+import numpy as np
+
+from . import nodes as N
+from . import utils
+
+
+__all__ = [
+    'pairwise_weights',
+    'compute_weights',
+    'TourTracer',
+    'trace_tours',
+    'score_tours',
+]
+
+
+#: Default number of weights computed per block of rows
+BLOCK_SIZE = 2 ** 20
+
+
+# state of each worker process, set once by the pool initializer
+_worker = {}
+
+
+def _init_worker(coords, func, path):
+    _worker['coords'] = coords
+    _worker['func'] = func
+    _worker['out'] = np.load(path, mmap_mode='r+')
+
+
+def _process_block(start, stop):
+    coords, func, out = _worker['coords'], _worker['func'], _worker['out']
+    out[start:stop] = func(coords[start:stop, None], coords[None, :])
+    out.flush()
+    return start, stop
+
+
+def _blocks(n, rows):
+    return [(start, min(start + rows, n)) for start in range(0, n, rows)]
+
+
+def pairwise_weights(coords, func, out=None, dtype=None, rows=None,
+                     workers=None, threads=False, progress=None):
+    """Return the weights between all pairs of coordinates.
+
+    The weight matrix is split into blocks of rows, which are computed by a
+    pool of worker processes. Each worker receives the coordinates once and
+    writes its blocks straight into a memory-mapped ``.npy`` file, so nothing
+    but block boundaries travels between processes. With ``threads=True`` the
+    blocks are computed by threads instead, which works well because NumPy
+    releases the GIL for large arrays.
+
+    The output can be a path to a ``.npy`` file to create, which keeps the
+    result on disk for problems too large to hold in memory, or an existing
+    array of the right shape. By default the result is returned as a regular
+    array.
+
+    The ``func`` must be an array distance function such as those found in
+    :data:`~tsplib95.distances.ARRAY_TYPES`. When using processes, it must
+    also be picklable.
+
+    The ``progress`` callable, if given, is called with the number of rows
+    done and the total number of rows each time a block completes.
+
+    :param coords: array of coordinates
+    :param callable func: array distance function
+    :param out: output filepath or array
+    :param dtype: data type of the weights (defaults to the type of the
+                  weights computed by ``func``)
+    :param int rows: number of rows per block
+    :param int workers: number of workers (defaults to the number of CPUs)
+    :param bool threads: use threads instead of processes
+    :param callable progress: progress callback
+    :return: weight matrix
+    :rtype: :class:`numpy.ndarray`
+    """
+    coords = np.asarray(coords, dtype=float)
+    n = len(coords)
+    if rows is None:
+        rows = max(1, BLOCK_SIZE // max(n, 1))
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if dtype is None:
+        # keep whatever type of weights the function computes, since special
+        # functions may well compute floats
+        sample = func(coords[:1, None], coords[None, :2])
+        dtype = np.result_type(sample) if n else np.int64
+
+    blocks = _blocks(n, rows)
+    workers = max(1, min(workers, len(blocks)))
+
+    if isinstance(out, (str, os.PathLike)):
+        result = np.lib.format.open_memmap(os.fspath(out), mode='w+',
+                                           dtype=dtype, shape=(n, n))
+        path = os.fspath(out)
+    elif out is None:
+        result, path = None, None
+    else:
+        if out.shape != (n, n):
+            error = f'out must have shape {(n, n)}, not {out.shape}'
+            raise ValueError(error)
+        result, path = out, None
+
+    done = 0
+
+    def report(start, stop):
+        nonlocal done
+        done += stop - start
+        if progress is not None:
+            progress(done, n)
+
+    # threads (and a single worker) share memory with us, so they can
+    # write directly into an ordinary array
+    if threads or workers == 1:
+        if result is None:
+            result = np.empty((n, n), dtype=dtype)
+
+        def compute(start, stop):
+            block = coords[start:stop, None]
+            result[start:stop] = func(block, coords[None, :])
+            return start, stop
+
+        if workers == 1:
+            for start, stop in blocks:
+                report(*compute(start, stop))
+        else:
+            with concurrent.futures.ThreadPoolExecutor(workers) as pool:
+                futures = [pool.submit(compute, *b) for b in blocks]
+                for future in concurrent.futures.as_completed(futures):
+                    report(*future.result())
+        if isinstance(result, np.memmap):
+            result.flush()
+        return result
+
+    # processes need a memory-mapped file to write into
+    scratch = path is None
+    if scratch:
+        fd, path = tempfile.mkstemp(suffix='.npy')
+        os.close(fd)
+        np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=(n, n))
+    else:
+        result.flush()
+
+    try:
+        with concurrent.futures.ProcessPoolExecutor(
+                workers, initializer=_init_worker,
+                initargs=(coords, func, path)) as pool:
+            futures = [pool.submit(_process_block, *b) for b in blocks]
+            for future in concurrent.futures.as_completed(futures):
+                report(*future.result())
+
+        if result is None:
+            return np.load(path)
+        if scratch:
+            result[...] = np.load(path, mmap_mode='r')
+        return result
+    finally:
+        if scratch:
+            os.remove(path)
+
+
+def compute_weights(problem, out=None, dtype=None, **kwargs):
+    """Return the weights between all pairs of nodes of a problem.
+
+    Rows and columns follow the order of
+    :meth:`~tsplib95.models.StandardProblem.get_nodes`. Unlike
+    :meth:`~tsplib95.models.StandardProblem.get_distance_matrix`, the result
+    is not cached on the problem and there is no memory budget, which makes
+    this suitable for very large problems when combined with a memory-mapped
+    output. Any other keyword arguments are passed to
+    :func:`pairwise_weights`.
+
+    :param problem: problem with a vectorized distance function
+    :type problem: :class:`~tsplib95.models.StandardProblem`
+    :param out: output filepath or array
+    :param dtype: data type of the weights (defaults to the type of the
+                  weights computed by the distance function)
+    :return: weight matrix
+    :rtype: :class:`numpy.ndarray`
+    :raises ValueError: if the problem has no vectorized distance function
+    """
+    coords, func = problem.get_array_metric()
+    return pairwise_weights(coords, func, out=out, dtype=dtype, **kwargs)
+
+
+class TourTracer:
+    """Computes the weights of arrays of tours.
+
+    The weights of the edges come from the ``weigher``, which is called with
+    two arrays of node positions within ``nodes`` and returns an array of
+    weights. Tracers can be pickled whenever their weigher can, which makes
+    them suitable for sending to worker processes.
+
+    :param nodes: sorted array of nodes or their index
+    :type nodes: :class:`~tsplib95.nodes.NodeIndex`
+    :param callable weigher: array edge weight function
+    """
+
+    def __init__(self, nodes, weigher):
+        if not isinstance(nodes, N.NodeIndex):
+            nodes = N.NodeIndex(np.asarray(nodes))
+        self.index = nodes
+        self.nodes = nodes.nodes
+        self.weigher = weigher
+
+    def trace(self, tours):
+        """Return the weights of a 2-D array of tours, one per row.
+
+        :param tours: array of tours
+        :return: one weight for each tour
+        :rtype: list
+        """
+        positions = self.index.positions(tours)
+        weights = self.weigher(positions, np.roll(positions, -1, axis=1))
+
+        # sum edge by edge, in the same order as the builtin sum
+        if weights.dtype.kind == 'f':
+            totals = np.zeros(len(weights))
+            for column in weights.T:
+                totals += column
+        else:
+            totals = weights.sum(axis=1)
+        return totals.tolist()
+
+
+def _init_tracer(tracer, problem):
+    _worker['tracer'] = tracer
+    _worker['problem'] = problem
+
+
+def _trace_chunk(tours, state=_worker):
+    if state['tracer'] is None:
+        return state['problem'].trace_tours(tours)
+    return state['tracer'].trace(tours)
+
+
+def _score_paths(paths, state=_worker):
+    from . import loaders
+
+    return [_trace_by_length(loaders.load(path).tours, state)
+            for path in paths]
+
+
+def _trace_by_length(tours, state):
+    if state['tracer'] is None:
+        return state['problem'].trace_tours(tours)
+
+    weights = [0] * len(tours)
+    for length, indexes in _group_by_length(tours).items():
+        if length:
+            array = np.array([tours[i] for i in indexes])
+            for i, weight in zip(indexes, state['tracer'].trace(array)):
+                weights[i] = weight
+    return weights
+
+
+def _group_by_length(tours):
+    groups = {}
+    for i, tour in enumerate(tours):
+        groups.setdefault(len(tour), []).append(i)
+    return groups
+
+
+def _run(problem, tracer, func, tasks, workers, mp_context):
+    # yield the key and result of calling func on the arguments of each task
+    # in worker processes that each receive the problem data once
+    if workers == 1:
+        state = {'tracer': tracer, 'problem': problem}
+        for key, args in tasks:
+            yield key, func(*args, state=state)
+        return
+
+    with concurrent.futures.ProcessPoolExecutor(
+            workers, mp_context=mp_context, initializer=_init_tracer,
+            initargs=(tracer, problem)) as pool:
+        # keep a bounded number of tasks in flight
+        pending = {}
+        for key, args in tasks:
+            if len(pending) >= 2 * workers:
+                done, __ = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    yield pending.pop(future), future.result()
+            pending[pool.submit(func, *args)] = key
+        for future in concurrent.futures.as_completed(pending):
+            yield pending[future], future.result()
+
+
+def trace_tours(problem, tours, workers=None, chunk_size=None,
+                mp_context=None):
+    """Return the weights of the given tours using worker processes.
+
+    The results are the same as those of
+    :meth:`~tsplib95.models.StandardProblem.trace_tours`. The weight data of
+    the problem is sent to each worker once. Tours are then streamed to the
+    workers in chunks of tours of the same length.
+
+    Workers are started with the default start method, which may require
+    the problem (and its special function) to be picklable. Where it is
+    safe to do so, passing ``multiprocessing.get_context('fork')`` as the
+    ``mp_context`` lets the workers share the weight data without copying.
+
+    :param problem: problem that provides the weights
+    :type problem: :class:`~tsplib95.models.StandardProblem`
+    :param list tours: one or more lists of node indices
+    :param int workers: number of workers (defaults to the number of CPUs)
+    :param int chunk_size: number of tours sent to a worker at once
+    :param mp_context: multiprocessing context used to start the workers
+    :return: one weight for each given tour
+    :rtype: list
+    """
+    tours = [utils.sized(tour) for tour in tours]
+    workers = workers or os.cpu_count() or 1
+    tracer = problem.get_tour_tracer()
+
+    def tasks():
+        for length, indexes in _group_by_length(tours).items():
+            if not length:
+                continue
+            size = chunk_size or max(1, min(
+                math.ceil(len(indexes) / (4 * workers)),
+                BLOCK_SIZE // length))
+            for start in range(0, len(indexes), size):
+                chunk = indexes[start:start + size]
+                batch = [tours[i] for i in chunk]
+                yield chunk, (batch if tracer is None else np.array(batch),)
+
+    weights = [0] * len(tours)
+    results = _run(problem, tracer, _trace_chunk, tasks(), workers,
+                   mp_context)
+    for chunk, chunk_weights in results:
+        for i, weight in zip(chunk, chunk_weights):
+            weights[i] = weight
+    return weights
+
+
+def score_tours(problem, tour_paths, workers=None, chunk_size=None,
+                mp_context=None):
+    """Return the weights of the tours in many tour files.
+
+    Each worker process loads and traces the tours of whole files, so
+    parsing the files happens in parallel as well. The weight data of the
+    problem is sent to each worker once. See :func:`trace_tours` for how
+    the workers are started.
+
+    :param problem: problem that provides the weights
+    :type problem: :class:`~tsplib95.models.StandardProblem`
+    :param list tour_paths: paths to tour files
+    :param int workers: number of workers (defaults to the number of CPUs)
+    :param int chunk_size: number of files sent to a worker at once
+    :param mp_context: multiprocessing context used to start the workers
+    :return: the weights of the tours in each file
+    :rtype: list
+    """
+    paths = [os.fspath(path) for path in tour_paths]
+    workers = workers or os.cpu_count() or 1
+    size = chunk_size or max(1, math.ceil(len(paths) / (4 * workers)))
+    tasks = ((start, (paths[start:start + size],))
+             for start in range(0, len(paths), size))
+
+    scores = [None] * len(paths)
+    tracer = problem.get_tour_tracer()
+    for start, results in _run(problem, tracer, _score_paths, tasks,
+                               workers, mp_context):
+        scores[start:start + len(results)] = results
+    return scores
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+import collections.abc
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from . import nodes as N
+
+
+__all__ = [
+    'SharedProblem',
+]
+
+
+def _open(name):
+    # attach to an existing segment without taking responsibility for it
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # before Python 3.13, attaching registers the segment with the
+        # resource tracker again, which is harmless for child processes
+        # since they share the tracker of the process that created it
+        return shared_memory.SharedMemory(name=name)
+
+
+class _Rows(collections.abc.Sequence):
+    # read-only list of lists backed by flattened values and row offsets
+    def __init__(self, values, offsets):
+        self.values = values
+        self.offsets = offsets
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(len(self))[index]]
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return self.values[start:end].tolist()
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __eq__(self, other):
+        return list(self) == other
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class _Coordinates(collections.abc.Mapping):
+    # read-only map of node to coordinates backed by an array of coordinates
+    # in node order
+    def __init__(self, index, coords):
+        self.index = index
+        self.coords = coords
+
+    def __getitem__(self, node):
+        return self.coords[self.index.position(node)].tolist()
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, node):
+        return node in self.index
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class SharedProblem:
+    """Handle to a problem whose arrays are kept in shared memory.
+
+    Handles are created by :meth:`~tsplib95.models.StandardProblem.share`
+    and are cheap to pickle, since they only hold the names of the shared
+    memory segments along with the small fields of the problem. Sending a
+    handle to another process and calling :meth:`attach` there creates a
+    problem that reads its node coordinates, edge weights, tours, and
+    distance matrix directly from shared memory, without copying them.
+
+    Shared values are read-only and numbers are converted to a common
+    type per array, so integer values that were mixed with floats come back
+    as floats.
+
+    The process that shares the problem owns the segments. They are removed
+    by :meth:`unlink`, or when leaving the ``with`` block of the handle::
+
+        with problem.share() as handle:
+            pool.map(work, [handle] * n)
+
+    :param problem_class: class of the shared problem
+    :param dict fields: values of the fields that are not shared
+    :param callable special: special distance function
+    """
+
+    def __init__(self, problem_class, fields, special=None):
+        self.problem_class = problem_class
+        self.fields = fields
+        self.special = special
+        self.condensed = False
+        self.specs = {}
+        self._segments = {}
+        self._created = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        self.unlink()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_segments'] = {}
+        state['_created'] = []
+        return state
+
+    def __repr__(self):
+        names = ', '.join(self.specs)
+        return f'{self.__class__.__name__}({self.problem_class.__name__}, ' \
+            f'[{names}])'
+
+    def put(self, name, array):
+        """Copy an array into a new shared memory segment.
+
+        :param str name: name of the array
+        :param array: array to share
+        """
+        array = np.ascontiguousarray(array)
+        size = max(array.nbytes, 1)
+        segment = shared_memory.SharedMemory(create=True, size=size)
+        view = np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)
+        view[...] = array
+        del view
+        self._segments[name] = segment
+        self._created.append(segment)
+        self.specs[name] = segment.name, array.shape, array.dtype.str
+
+    def put_rows(self, name, rows):
+        """Copy rows of varying length into shared memory.
+
+        The values are shared as one array and the offset of each row as
+        another, named with an ``_offsets`` suffix.
+
+        :param str name: name of the rows
+        :param list rows: lists of numbers
+        """
+        rows = list(rows)
+        offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum([len(row) for row in rows], out=offsets[1:])
+        self.put(name, np.array([value for row in rows for value in row]))
+        self.put(f'{name}_offsets', offsets)
+
+    def get(self, name):
+        """Return a read-only view of a shared array.
+
+        :param str name: name of the array
+        :return: the array or None if there is no array by that name
+        :rtype: :class:`numpy.ndarray`
+        """
+        if name not in self.specs:
+            return None
+        segment_name, shape, dtype = self.specs[name]
+        if name not in self._segments:
+            self._segments[name] = _open(segment_name)
+        buffer = self._segments[name].buf
+        array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=buffer)
+        array.flags.writeable = False
+        return array
+
+    def attach(self):
+        """Create a problem backed by the shared arrays.
+
+        The node coordinates, edge weights, and tours of the problem are
+        read-only views of the shared arrays. When a distance matrix was
+        shared, the problem uses it for all weights.
+
+        :return: problem instance
+        :rtype: :class:`~tsplib95.models.StandardProblem`
+        """
+        fields = dict(self.fields)
+        index = None
+        if 'nodes' in self.specs:
+            index = N.NodeIndex(self.get('nodes'))
+        if 'node_coords' in self.specs:
+            coords = self.get('node_coords')
+            fields['node_coords'] = _Coordinates(index, coords)
+        for name in ('edge_weights', 'tours'):
+            if name in self.specs:
+                fields[name] = _Rows(self.get(name),
+                                     self.get(f'{name}_offsets'))
+
+        problem = self.problem_class(special=self.special, **fields)
+        # the problem keeps the segments open for as long as it exists
+        problem._shared = self
+        if index is not None:
+            problem._node_index = index
+        if 'matrix' in self.specs:
+            problem._use_distance_matrix(self.get('matrix'), self.condensed)
+        return problem
+
+    def close(self):
+        """Stop using the shared segments in this process.
+
+        Segments still in use by an attached problem stay open until the
+        problem is gone.
+        """
+        for name, segment in list(self._segments.items()):
+            try:
+                segment.close()
+            except BufferError:
+                continue
+            del self._segments[name]
+
+    def unlink(self):
+        """Remove the shared segments.
+
+        Only the process that shared the problem can remove its segments.
+        Processes that have already attached can keep using them.
+        """
+        while self._created:
+            self._created.pop().unlink()
@@ -0,0 +1,363 @@
+# -*- coding: utf-8 -*-
+import itertools
+
+import numpy as np
+
+
+__all__ = [
+    'GridIndex',
+    'SpatialIndex',
+]
+
+
+def _distances(points, others, norm):
+    # unrounded distance between every point and every other point
+    deltas = np.abs(points[:, None, :] - others[None, :, :])
+    if norm == 1:
+        return deltas.sum(axis=-1)
+    if norm == np.inf:
+        return deltas.max(axis=-1)
+    return np.sqrt((deltas * deltas).sum(axis=-1))
+
+
+class GridIndex:
+    """Uniform grid of points for nearest neighbor queries.
+
+    The points are bucketed into equally sized square (or cubic) cells so
+    that a query only has to look at the cells surrounding it. By default
+    the cell size is chosen so that each cell holds a handful of points on
+    average.
+
+    Queries measure distance using one of three norms: Manhattan (``1``),
+    Euclidean (``2``), or maximum (``numpy.inf``). Every query result refers
+    to points by their position in the original array of points.
+
+    :param points: array of 2 or 3-dimensional points
+    :param float cell_size: width of each cell
+    """
+
+    #: Average number of points per cell used to choose the cell size
+    points_per_cell = 8
+
+    def __init__(self, points, cell_size=None):
+        self.points = np.asarray(points, dtype=float)
+        if self.points.ndim != 2 or len(self.points) == 0:
+            raise ValueError('points must be a non-empty array of coordinates')
+
+        self.lower = self.points.min(axis=0)
+        extent = self.points.max(axis=0) - self.lower
+        self.cell_size = cell_size or self._choose_cell_size(extent)
+
+        # integer cell coordinates of every point
+        cells = np.floor((self.points - self.lower) / self.cell_size)
+        cells = cells.astype(np.int64)
+        self.shape = tuple(cells.max(axis=0) + 1)
+
+        # points sorted by cell, with the position at which each cell starts
+        cell_ids = np.ravel_multi_index(cells.T, self.shape)
+        self.order = np.argsort(cell_ids, kind='stable')
+        sorted_ids = cell_ids[self.order]
+        self.starts = np.searchsorted(sorted_ids, np.arange(self.size + 1))
+        self.cells = cells
+
+    def __len__(self):
+        return len(self.points)
+
+    @property
+    def size(self):
+        """Number of cells in the grid."""
+        return int(np.prod(self.shape))
+
+    def _choose_cell_size(self, extent):
+        spread = extent[extent > 0]
+        if not len(spread):
+            return 1.0
+        volume = np.prod(spread) * self.points_per_cell / len(self.points)
+        return float(volume ** (1 / len(spread))) or 1.0
+
+    def _block(self, cell, radius):
+        # positions of all points in the cells within radius cells of cell
+        lower = [max(c - radius, 0) for c in cell]
+        upper = [min(c + radius, s - 1) for c, s in zip(cell, self.shape)]
+        covers_grid = all(lo == 0 for lo in lower) and \
+            all(hi == s - 1 for hi, s in zip(upper, self.shape))
+        return self._gather(lower, upper), covers_grid
+
+    def _gather(self, lower, upper):
+        # positions of all points in the cells between lower and upper
+        if any(lo > hi for lo, hi in zip(lower, upper)):
+            return np.empty(0, dtype=np.int64)
+
+        # cells along the last axis are contiguous, so take them in slices
+        slices = []
+        ranges = [range(lo, hi + 1) for lo, hi in zip(lower[:-1], upper[:-1])]
+        for prefix in itertools.product(*ranges):
+            first = np.ravel_multi_index((*prefix, lower[-1]), self.shape)
+            last = np.ravel_multi_index((*prefix, upper[-1]), self.shape)
+            slices.append(self.order[self.starts[first]:self.starts[last + 1]])
+        return np.concatenate(slices)
+
+    def _cell(self, point):
+        # cell coordinates of any point, even outside of the grid
+        point = np.asarray(point, dtype=float)
+        cell = np.floor((point - self.lower) / self.cell_size)
+        return point, cell.astype(np.int64)
+
+    def _initial_radius(self, k):
+        # number of cells in each direction likely to hold k points
+        dims = sum(s > 1 for s in self.shape) or 1
+        cells = max(k, 1) / self.points_per_cell
+        return max(1, int(np.ceil(cells ** (1 / dims) / 2)))
+
+    def _search(self, cell, queries, k, norm, exclude=None):
+        # return the positions and distances of the k nearest points to each
+        # query point, all of which lie in the given cell
+        # start no closer than the grid itself for points outside of it
+        gap = max(max(-c, c - s + 1) for c, s in zip(cell, self.shape))
+        radius = max(self._initial_radius(k), gap)
+        while True:
+            candidates, covers_grid = self._block(cell, radius)
+            enough = len(candidates) - (exclude is not None) >= k
+            if enough or covers_grid:
+                dists = _distances(queries, self.points[candidates], norm)
+                if exclude is not None:
+                    dists[candidates[None, :] == exclude[:, None]] = np.inf
+                count = min(k, len(candidates) - (exclude is not None))
+                if count > 0:
+                    part = np.argpartition(dists, count - 1, axis=1)
+                    nearest = part[:, :count]
+                    kth = np.take_along_axis(dists, nearest, 1).max(axis=1)
+                else:
+                    nearest = np.empty((len(queries), 0), dtype=np.int64)
+                    kth = np.zeros(len(queries))
+                # anything outside the block is at least radius cells away
+                if covers_grid or np.all(kth <= radius * self.cell_size):
+                    break
+            radius += 1
+
+        near_dists = np.take_along_axis(dists, nearest, 1)
+        order = np.argsort(near_dists, axis=1, kind='stable')
+        nearest = np.take_along_axis(nearest, order, 1)
+        return candidates[nearest], np.take_along_axis(near_dists, order, 1)
+
+    def neighbors(self, k, norm=2):
+        """Return the k nearest neighbors of every point.
+
+        Each point is excluded from its own neighbors. Row *i* of the results
+        holds the neighbors of point *i* ordered by increasing distance. If
+        there are fewer than ``k`` other points, all of them are returned.
+
+        :param int k: number of neighbors
+        :param norm: 1, 2, or ``numpy.inf``
+        :return: neighbor positions and distances
+        :rtype: tuple
+        """
+        n = len(self.points)
+        k = max(0, min(k, n - 1))
+        positions = np.empty((n, k), dtype=np.int64)
+        dists = np.empty((n, k), dtype=float)
+
+        for cell_id in np.flatnonzero(np.diff(self.starts)):
+            members = self.order[self.starts[cell_id]:self.starts[cell_id + 1]]
+            cell = self.cells[members[0]]
+            found, found_dists = self._search(cell, self.points[members], k,
+                                              norm, exclude=members)
+            positions[members] = found
+            dists[members] = found_dists
+
+        return positions, dists
+
+    def nearest(self, point, k, norm=2):
+        """Return the k nearest points to any point.
+
+        The point need not be one of the indexed points, nor lie within the
+        bounds of the grid.
+
+        :param point: query point
+        :param int k: number of points
+        :param norm: 1, 2, or ``numpy.inf``
+        :return: positions and distances of the nearest points
+        :rtype: tuple
+        """
+        point, cell = self._cell(point)
+        k = max(0, min(k, len(self.points)))
+        found, dists = self._search(cell, point[None, :], k, norm)
+        return found[0], dists[0]
+
+    def within(self, point, radius, norm=2):
+        """Return the points within a distance of any point.
+
+        The results are ordered by increasing distance.
+
+        :param point: query point
+        :param float radius: maximum distance (inclusive)
+        :param norm: 1, 2, or ``numpy.inf``
+        :return: positions and distances of the points within the radius
+        :rtype: tuple
+        """
+        point, cell = self._cell(point)
+        cells = int(np.ceil(radius / self.cell_size))
+        lower = [max(c - cells, 0) for c in cell]
+        upper = [min(c + cells, s - 1) for c, s in zip(cell, self.shape)]
+        candidates = self._gather(lower, upper)
+
+        dists = _distances(point[None, :], self.points[candidates], norm)[0]
+        keep = dists <= radius
+        candidates, dists = candidates[keep], dists[keep]
+        order = np.argsort(dists, kind='stable')
+        return candidates[order], dists[order]
+
+    def box(self, lower, upper):
+        """Return the points within a box.
+
+        The box includes its boundary.
+
+        :param lower: lowest corner of the box
+        :param upper: highest corner of the box
+        :return: positions of the points within the box
+        :rtype: :class:`numpy.ndarray`
+        """
+        lower, lower_cell = self._cell(lower)
+        upper, upper_cell = self._cell(upper)
+        lower_cell = np.maximum(lower_cell, 0)
+        upper_cell = np.minimum(upper_cell, np.array(self.shape) - 1)
+        candidates = self._gather(lower_cell.tolist(), upper_cell.tolist())
+
+        points = self.points[candidates]
+        inside = np.all((points >= lower) & (points <= upper), axis=1)
+        return np.sort(candidates[inside])
+
+
+class SpatialIndex:
+    """Spatial index of the nodes of a problem.
+
+    This wraps a :class:`GridIndex` of node coordinates so that queries use
+    node indices and the weights of the problem. Queries accept either a
+    node or an arbitrary point. When given a node, that node is excluded
+    from the results.
+
+    The ``metric`` is an array distance function used to compute the
+    weights, such as those found in
+    :data:`~tsplib95.distances.ARRAY_TYPES`. It must be a rounded form of
+    the ``norm`` scaled down by ``scale``. Without a ``metric``, the weights
+    are the plain distances measured by the norm.
+
+    Metrics that are not based on a norm are supported by passing
+    ``norm=None``, in which case queries compute the weights to every node.
+
+    When the coordinates have been converted before indexing them, such as
+    GEO coordinates converted to radians, ``transform`` converts query
+    points and box corners in the same way.
+
+    :param nodes: node indices
+    :param coords: coordinates of each node
+    :param callable metric: array distance function
+    :param norm: 1, 2, ``numpy.inf``, or None
+    :param float scale: factor by which the norm exceeds the metric
+    :param callable transform: conversion of points into coordinates
+    """
+
+    def __init__(self, nodes, coords, metric=None, norm=2, scale=1.0,
+                 transform=None):
+        if metric is None and norm is None:
+            raise ValueError('a metric is required without a norm')
+        self.nodes = np.asarray(nodes)
+        self.positions = {n: i for i, n in enumerate(self.nodes.tolist())}
+        self.grid = GridIndex(coords)
+        self.metric = metric
+        self.norm = norm
+        self.scale = scale
+        self.transform = transform
+
+    def __len__(self):
+        return len(self.nodes)
+
+    @property
+    def coords(self):
+        """Coordinates of the nodes."""
+        return self.grid.points
+
+    def _point(self, point):
+        # convert a point into the coordinates of the index
+        point = np.asarray(point, dtype=float)
+        if self.transform is not None:
+            point = self.transform(point)
+        return point
+
+    def _resolve(self, query):
+        # return the query point and the position of the query node, if any
+        if isinstance(query, (list, tuple, np.ndarray)):
+            return self._point(query), None
+        position = self.positions[query]
+        return self.coords[position], position
+
+    def _weights(self, point, positions, dists):
+        if self.metric is None:
+            return dists
+        return self.metric(point, self.coords[positions])
+
+    def _finish(self, positions, weights, exclude, dists=None):
+        # drop the query node and order by weight, breaking ties by distance
+        keep = positions != exclude
+        positions, weights = positions[keep], weights[keep]
+        keys = (positions, weights) if dists is None else \
+            (dists[keep], weights)
+        order = np.lexsort(keys)
+        return self.nodes[positions[order]], weights[order]
+
+    def nearest(self, query, k):
+        """Return the *k* nearest nodes to a node or point.
+
+        :param query: node or point
+        :param int k: number of nodes
+        :return: nodes and their weights ordered by weight
+        :rtype: tuple
+        """
+        point, exclude = self._resolve(query)
+        if self.norm is None:
+            positions = np.arange(len(self.nodes))
+            weights = self.metric(point, self.coords)
+            nodes, weights = self._finish(positions, weights, exclude)
+            return nodes[:k], weights[:k]
+
+        count = k + (exclude is not None)
+        positions, dists = self.grid.nearest(point, count, norm=self.norm)
+        weights = self._weights(point, positions, dists)
+        nodes, weights = self._finish(positions, weights, exclude, dists)
+        return nodes[:k], weights[:k]
+
+    def within(self, query, radius):
+        """Return the nodes within a weight of a node or point.
+
+        :param query: node or point
+        :param radius: maximum weight (inclusive)
+        :return: nodes and their weights ordered by weight
+        :rtype: tuple
+        """
+        point, exclude = self._resolve(query)
+        if self.norm is None:
+            positions = np.arange(len(self.nodes))
+            dists = None
+            weights = self.metric(point, self.coords)
+        else:
+            # search a little further to account for the rounding
+            margin = 0 if self.metric is None else 1
+            search = (radius + margin) * self.scale
+            positions, dists = self.grid.within(point, search, norm=self.norm)
+            weights = self._weights(point, positions, dists)
+
+        keep = weights <= radius
+        positions, weights = positions[keep], weights[keep]
+        dists = None if dists is None else dists[keep]
+        return self._finish(positions, weights, exclude, dists)
+
+    def box(self, lower, upper):
+        """Return the nodes whose coordinates lie within a box.
+
+        :param lower: lowest corner of the box
+        :param upper: highest corner of the box
+        :return: nodes in increasing order
+        :rtype: :class:`numpy.ndarray`
+        """
+        lower, upper = self._point(lower), self._point(upper)
+        return np.sort(self.nodes[self.grid.box(lower, upper)])
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+
+
+__all__ = [
+    'Tour',
+]
+
+
+class Tour:
+    """Tour backed by an array of nodes and an array of their positions.
+
+    Keeping the position of every node makes finding a node, its successor,
+    or its predecessor a constant time operation. Positions are stored in an
+    array indexed by node, so nodes must be integers. They need not start at
+    zero or one.
+
+    Tours behave like sequences of nodes and convert to arrays, so they can
+    be passed anywhere a list of nodes is accepted, including
+    :meth:`~tsplib95.models.StandardProblem.trace_tours` and the ``tours``
+    field.
+
+    When given a problem, the tour weighs itself against it. The weight is
+    cached until the tour changes.
+
+    :param nodes: nodes in tour order
+    :param problem: problem used to weigh the tour
+    :type problem: :class:`~tsplib95.models.StandardProblem`
+    :raises ValueError: if a node appears more than once
+    """
+
+    def __init__(self, nodes, problem=None):
+        self.nodes = np.array(nodes, dtype=np.int64).reshape(-1)
+        self.offset = int(self.nodes.min()) if len(self.nodes) else 0
+
+        size = int(self.nodes.max()) - self.offset + 1 if len(self) else 0
+        self.positions = np.full(size, -1, dtype=np.int64)
+        self.positions[self.nodes - self.offset] = np.arange(len(self))
+        # repeated nodes share a slot, leaving fewer positions than nodes
+        if np.count_nonzero(self.positions >= 0) != len(self):
+            raise ValueError('a tour cannot visit a node more than once')
+
+        self._problem = problem
+        self._cost = None
+
+    @classmethod
+    def from_field(cls, tours, problem=None):
+        """Create tours from the value of a ``tours`` field.
+
+        :param list tours: lists of nodes
+        :param problem: problem used to weigh the tours
+        :return: one tour for each list of nodes
+        :rtype: list
+        """
+        return [cls(tour, problem=problem) for tour in tours]
+
+    @staticmethod
+    def to_field(tours):
+        """Convert tours into the value of a ``tours`` field.
+
+        :param list tours: tours or lists of nodes
+        :return: lists of nodes
+        :rtype: list
+        """
+        return [list(tour) for tour in tours]
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __iter__(self):
+        return iter(self.nodes.tolist())
+
+    def __getitem__(self, index):
+        result = self.nodes[index]
+        return result.tolist() if isinstance(result, np.ndarray) else \
+            int(result)
+
+    def __contains__(self, node):
+        return self._find(node) is not None
+
+    def __eq__(self, other):
+        if not isinstance(other, Tour):
+            return NotImplemented
+        return np.array_equal(self.nodes, other.nodes)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.tolist()})'
+
+    def __array__(self, dtype=None, copy=None):
+        return np.array(self.nodes, dtype=dtype)
+
+    def tolist(self):
+        """Return the nodes as a list.
+
+        :return: nodes in tour order
+        :rtype: list
+        """
+        return self.nodes.tolist()
+
+    @property
+    def problem(self):
+        """Problem used to weigh the tour."""
+        return self._problem
+
+    @problem.setter
+    def problem(self, problem):
+        self._problem = problem
+        self._cost = None
+
+    @property
+    def cost(self):
+        """Weight of the tour in its problem.
+
+        :raises ValueError: if the tour has no problem
+        """
+        if self._cost is None:
+            if self._problem is None:
+                raise ValueError('tour has no problem to weigh it against')
+            self._cost = self._problem.trace_tours([self.nodes])[0]
+        return self._cost
+
+    def _find(self, node):
+        index = node - self.offset
+        if not 0 <= index < len(self.positions):
+            return None
+        position = self.positions[index]
+        return None if position < 0 else int(position)
+
+    def position(self, node):
+        """Return the position of a node in the tour.
+
+        :param int node: node
+        :return: position of the node
+        :rtype: int
+        :raises KeyError: if the node is not in the tour
+        """
+        position = self._find(node)
+        if position is None:
+            raise KeyError(node)
+        return position
+
+    def next(self, node):
+        """Return the node after the given node.
+
+        :param int node: node
+        :return: its successor
+        :rtype: int
+        """
+        return int(self.nodes[(self.position(node) + 1) % len(self)])
+
+    def prev(self, node):
+        """Return the node before the given node.
+
+        :param int node: node
+        :return: its predecessor
+        :rtype: int
+        """
+        return int(self.nodes[self.position(node) - 1])
+
+    def between(self, a, b, c):
+        """Return whether b is reached on the way from a to c.
+
+        The tour is followed forward from a, wrapping around as needed. The
+        nodes a and c themselves count as being between them.
+
+        :param int a: first node
+        :param int b: node to look for
+        :param int c: last node
+        :rtype: bool
+        """
+        i, j, k = self.position(a), self.position(b), self.position(c)
+        if i <= k:
+            return i <= j <= k
+        return j >= i or j <= k
+
+    def reverse(self, i, j):
+        """Reverse the nodes from position i through position j.
+
+        If i is after j, the segment wraps around the end of the tour.
+
+        :param int i: first position
+        :param int j: last position
+        """
+        n = len(self)
+        i, j = i % n, j % n
+        if i <= j:
+            segment = np.arange(i, j + 1)
+        else:
+            segment = np.concatenate([np.arange(i, n), np.arange(j + 1)])
+        self.nodes[segment] = self.nodes[segment[::-1]]
+        self.positions[self.nodes[segment] - self.offset] = segment
+        self._cost = None
+
+    def _update(self, first, nodes, change=None):
+        # replace the nodes from the first position onward, adjusting any
+        # cached weight by the given change
+        nodes = np.asarray(nodes, dtype=np.int64)
+        last = first + len(nodes)
+        self.nodes[first:last] = nodes
+        self.positions[nodes - self.offset] = np.arange(first, last)
+        if self._cost is not None and change is not None:
+            self._cost += change
+        else:
+            self._cost = None
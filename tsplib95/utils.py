@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 import math
 
+import numpy as np
+
 
 def parse_degrees(coord):
     """Parse an encoded geocoordinate value into real degrees.
@@ -24,6 +26,33 @@ def nint(x):
     return int(x + 0.5)
 
 
+def nint_array(x):
+    """Round an array of values to integers.
+
+    This is the array counterpart of :func:`nint` and produces exactly the
+    same results for each element.
+
+    :param x: original values
+    :type x: :class:`numpy.ndarray`
+    :return: rounded integers
+    :rtype: :class:`numpy.ndarray`
+    """
+    return np.trunc(np.add(x, 0.5)).astype(np.int64)
+
+
+def ceil_array(x):
+    """Round an array of values up to integers.
+
+    This is the array counterpart of :func:`math.ceil`.
+
+    :param x: original values
+    :type x: :class:`numpy.ndarray`
+    :return: rounded integers
+    :rtype: :class:`numpy.ndarray`
+    """
+    return np.ceil(x).astype(np.int64)
+
+
 def deltas(start, end):
     return (e - s for e, s in zip(end, start))
 
@@ -54,17 +83,21 @@ def integer_sum(n, m=None):
 
 
 def pairwise(indexes):
-    # double list double in case indexes is an iterator
+    # list in case indexes is an iterator
     starts = list(indexes)
-    ends = list(starts)
 
     # shift the ends by one, and make it circular
-    ends += [ends.pop(0)]
+    ends = starts[1:] + starts[:1]
 
     # pair up the neighbors
     return zip(starts, ends)
 
 
+def sized(items):
+    # list in case items is an iterator, but keep lists and arrays as they are
+    return items if hasattr(items, '__len__') else list(items)
+
+
 def friendly_join(items, limit=None):
     if not items:
         return ''